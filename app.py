@@ -1,45 +1,135 @@
-import logging
 import os
 
-from flask import Flask
-from extensions import db, migrate, jwt, ma
-from users import users
-from projects import projects
-from projects.models import Project, ProjectMember
-from dotenv import load_dotenv
+basedir = os.path.abspath(os.path.dirname(__file__))
 
-load_dotenv()
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="[%(asctime)s] %(levelname)s in %(module)s: %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
-)
+def config_from_env(environ=os.environ):
+    """Application settings read from the environment (and .env)."""
+    from storage import engine_options_from_env, sqlite_pragmas_from_env
+    from logs import sample_rates_from_env
 
-basedir = os.path.abspath(os.path.dirname(__file__))
+    return {
+        "SQLALCHEMY_DATABASE_URI": environ.get(
+            "SQLALCHEMY_DATABASE_URI",
+            "sqlite:///" + os.path.join(basedir, "data", "app.db"),
+        ),
+        "SQLALCHEMY_TRACK_MODIFICATIONS": False,
+        "SQLALCHEMY_ENGINE_OPTIONS": engine_options_from_env(environ),
+        "SQLITE_PRAGMAS": sqlite_pragmas_from_env(environ),
+        "LOG_LEVEL": environ.get("LOG_LEVEL", "INFO"),
+        "LOG_FORMAT": environ.get("LOG_FORMAT", "json"),
+        "LOG_SAMPLE_RATES": sample_rates_from_env(environ),
+        "PAGE_SIZE": int(environ.get("PAGE_SIZE", "50")),
+        "MAX_PAGE_SIZE": int(environ.get("MAX_PAGE_SIZE", "200")),
+        "PROJECTS_BATCH_MAX_SIZE": int(environ.get("PROJECTS_BATCH_MAX_SIZE", "10000")),
+        "MEMBERS_BATCH_MAX_SIZE": int(environ.get("MEMBERS_BATCH_MAX_SIZE", "1000")),
+        "EXPORT_BATCH_SIZE": int(environ.get("EXPORT_BATCH_SIZE", "1000")),
+        "JOB_WORKERS": int(environ.get("JOB_WORKERS", "0")),
+        "JOB_POLL_INTERVAL": float(environ.get("JOB_POLL_INTERVAL", "1")),
+        "JOB_LEASE_SECONDS": int(environ.get("JOB_LEASE_SECONDS", "300")),
+        "JOB_RETRY_BASE_SECONDS": float(environ.get("JOB_RETRY_BASE_SECONDS", "2")),
+        "JOB_RETRY_MAX_SECONDS": float(environ.get("JOB_RETRY_MAX_SECONDS", "300")),
+        "JWT_SECRET_KEY": environ.get("JWT_SECRET_KEY", "DEFAULT_JWT_SECRET_KEY"),
+        "IDENTITY_CACHE_SIZE": int(environ.get("IDENTITY_CACHE_SIZE", "1024")),
+        "IDENTITY_CACHE_TTL": int(environ.get("IDENTITY_CACHE_TTL", "60")),
+        "RESPONSE_CACHE_BACKEND": environ.get("RESPONSE_CACHE_BACKEND", "memory"),
+        "RESPONSE_CACHE_SIZE": int(environ.get("RESPONSE_CACHE_SIZE", "4096")),
+        "RESPONSE_CACHE_TTL": int(environ.get("RESPONSE_CACHE_TTL", "300")),
+        "RESPONSE_CACHE_PATH": environ.get(
+            "RESPONSE_CACHE_PATH", os.path.join(basedir, "data", "response_cache.db")
+        ),
+        "METRICS_DIR": environ.get("METRICS_DIR", ""),
+        "METRICS_FLUSH_INTERVAL": float(environ.get("METRICS_FLUSH_INTERVAL", "1")),
+        "SQL_PROFILE_SLOW_MS": int(environ.get("SQL_PROFILE_SLOW_MS", "500")),
+        "SQL_PROFILE_REPEAT_THRESHOLD": int(
+            environ.get("SQL_PROFILE_REPEAT_THRESHOLD", "5")
+        ),
+        "PASSWORD_HASH_METHOD": environ.get("PASSWORD_HASH_METHOD", "scrypt:32768:8:1"),
+        "PASSWORD_POOL_WORKERS": int(
+            environ.get("PASSWORD_POOL_WORKERS", str(os.cpu_count() or 1))
+        ),
+        "PASSWORD_POOL_QUEUE_SIZE": int(environ.get("PASSWORD_POOL_QUEUE_SIZE", "32")),
+        "PASSWORD_POOL_RETRY_AFTER": int(environ.get("PASSWORD_POOL_RETRY_AFTER", "1")),
+    }
+
+
+def create_app(config=None):
+    """Build the Flask application.
+
+    Settings come from the environment, overridden by `config`. Importing
+    this module is cheap: Flask, the extensions and the blueprints are
+    imported here, and Flask-Migrate (which pulls in alembic) is only set
+    up for `flask` CLI commands.
+    """
+    import click
+    from dotenv import load_dotenv
+    from flask import Flask, jsonify
+
+    from extensions import (
+        db,
+        jwt,
+        ma,
+        metrics,
+        password_pool,
+        response_cache,
+        sql_profiler,
+    )
+    from jobs import jobs
+    from jobs.runner import job_runner
+    from logs import configure_logging
+    from metrics import CONTENT_TYPE
+    from projects import projects
+    from query_audit import audit_queries_command
+    from storage import init_storage
+    from users import users
+    from users.identity import identity_cache
+
+    load_dotenv()
+
+    app = Flask(__name__)
+    app.config.from_mapping(config_from_env())
+    app.config.from_mapping(config or {})
+
+    configure_logging(
+        level=app.config["LOG_LEVEL"],
+        fmt=app.config["LOG_FORMAT"],
+        sample_rates=app.config["LOG_SAMPLE_RATES"],
+    )
+
+    db.init_app(app)
+    init_storage(app, db)
+    jwt.init_app(app)
+    ma.init_app(app)
+    password_pool.init_app(app)
+    identity_cache.init_app(app)
+    job_runner.init_app(app)
+    response_cache.init_app(app)
+    metrics.init_app(app)
+    sql_profiler.init_app(app)
 
+    if click.get_current_context(silent=True) is not None:
+        # Loaded by the `flask` CLI, where `flask db ...` needs migrations.
+        from flask_migrate import Migrate
 
-app = Flask(__name__)
-app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///" + os.path.join(
-    basedir,
-    "data",
-    "app.db",
-)
-app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+        Migrate(app, db)
 
-app.config["JWT_SECRET_KEY"] = os.getenv("JWT_SECRET_KEY", "DEFAULT_JWT_SECRET_KEY")
+    app.register_blueprint(users)
+    app.register_blueprint(projects)
+    app.register_blueprint(jobs)
 
-db.init_app(app)
-migrate.init_app(app, db)
-jwt.init_app(app)
-ma.init_app(app)
+    app.cli.add_command(audit_queries_command)
 
-app.register_blueprint(users)
-app.register_blueprint(projects)
+    @app.route("/")
+    def index():
+        return "Welcome to Solo. The Project management app"
 
-app.logger.info("Starting the Flask application...")
+    @app.route("/cache/stats")
+    def cache_stats():
+        return jsonify(response_cache.stats())
 
+    @app.route("/metrics")
+    def metrics_view():
+        return app.response_class(metrics.render(), content_type=CONTENT_TYPE)
 
-@app.route("/")
-def index():
-    return "Welcome to Solo. The Project management app"
+    app.logger.info("Starting the Flask application...")
+    return app
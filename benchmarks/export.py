@@ -0,0 +1,118 @@
+"""Peak memory of exporting projects: streamed vs materialised.
+
+    python -m benchmarks.export --rows 1000,100000 --batch-size 1000
+
+For each table size, GET /projects/export is read chunk by chunk and
+dropped, as a client writing to disk would, while tracemalloc records the
+peak Python allocation. "materialised" does what GET /projects used to:
+`.all()` then one `jsonify`. The streamed peak should not grow with the
+number of rows. Throughput is measured under tracemalloc, which slows
+allocation-heavy code several times over.
+"""
+import argparse
+import json
+import tempfile
+import time
+import tracemalloc
+
+
+def _measure(run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 2**20, 2), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--rows",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1000, 100_000],
+        help="comma-separated table sizes",
+    )
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    from flask import jsonify
+    from flask_jwt_extended import create_access_token
+    from sqlalchemy import delete, insert, select
+
+    from app import create_app
+    from extensions import db
+    from projects.models import Project
+    from users.models import User
+
+    report = {}
+    for rows in args.rows:
+        directory = tempfile.TemporaryDirectory()
+        app = create_app(
+            {
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{directory.name}/bench.db",
+                "EXPORT_BATCH_SIZE": args.batch_size,
+                "LOG_LEVEL": "WARNING",
+            }
+        )
+        with app.app_context():
+            db.create_all()
+            db.session.execute(
+                insert(User),
+                [{"username": "bench", "email": "b@example.com", "password_hash": "x"}],
+            )
+            chunk = 50_000
+            for first in range(0, rows, chunk):
+                db.session.execute(
+                    insert(Project),
+                    [
+                        {"name": f"Project {i}", "description": "d" * 80, "creator_id": 1}
+                        for i in range(first, min(first + chunk, rows))
+                    ],
+                )
+            db.session.commit()
+            token = create_access_token(identity="1")
+
+        client = app.test_client()
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def streamed():
+            response = client.get("/projects/export", headers=headers, buffered=False)
+            for _ in response.response:
+                pass
+            response.close()
+
+        def materialised():
+            with app.test_request_context():
+                projects = db.session.execute(
+                    select(Project).where(Project.creator_id == 1).order_by(Project.id)
+                ).scalars().all()
+                jsonify(
+                    [
+                        {"id": p.id, "name": p.name, "description": p.description}
+                        for p in projects
+                    ]
+                ).get_data()
+                db.session.remove()
+
+        client.get("/projects/export", headers=headers)  # warm up
+        stream_mb, stream_s = _measure(streamed)
+        full_mb, _ = _measure(materialised)
+        report[rows] = {
+            "streamed_peak_mb": stream_mb,
+            "materialised_peak_mb": full_mb,
+            "streamed_rows_per_s": round(rows / stream_s),
+        }
+
+        with app.app_context():
+            db.session.execute(delete(Project))
+            db.session.commit()
+            db.engine.dispose()
+        directory.cleanup()
+
+    print(json.dumps({"batch_size": args.batch_size, "rows": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,417 @@
+"""Load-test the HTTP API with a weighted mix of user and project requests.
+
+    python -m benchmarks.loadtest --concurrency 8 --duration 10
+    python -m benchmarks.loadtest --server gunicorn --mix write-heavy
+    python -m benchmarks.loadtest --url http://127.0.0.1:5000 --output run.json
+    python -m benchmarks.loadtest --baseline last-release.json --tolerance 0.2
+
+Each of --concurrency virtual users registers, logs in and seeds a few
+projects, then issues requests picked from --mix until --duration runs
+out. Requests go through the Flask test client in-process (the default),
+a server launched locally on a throwaway database (--server), or an
+already-running instance (--url). The JSON report has overall and
+per-endpoint throughput and p50/p95/p99 latency; with --baseline the run
+exits non-zero if any endpoint's p95 or throughput regressed by more than
+--tolerance.
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+# Relative weights of each operation; see `VirtualUser`.
+MIXES = {
+    "read-heavy": {
+        "me": 20,
+        "list_projects": 35,
+        "get_project": 25,
+        "create_project": 8,
+        "update_project": 6,
+        "delete_project": 3,
+        "login": 2,
+        "register": 1,
+    },
+    "write-heavy": {
+        "me": 10,
+        "list_projects": 15,
+        "get_project": 15,
+        "create_project": 25,
+        "update_project": 20,
+        "delete_project": 10,
+        "login": 3,
+        "register": 2,
+    },
+}
+
+EXPECTED_STATUS = {
+    "register": 201,
+    "login": 200,
+    "me": 200,
+    "list_projects": 200,
+    "get_project": 200,
+    "create_project": 201,
+    "update_project": 200,
+    "delete_project": 204,
+}
+
+
+def parse_mix(value):
+    """A MIXES name or a custom "op=weight,op=weight" list."""
+    if value in MIXES:
+        return MIXES[value]
+
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in EXPECTED_STATUS:
+            raise argparse.ArgumentTypeError(f"Unknown operation {name!r}")
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"Bad weight for {name!r}") from None
+    return mix
+
+
+class TestClientSession:
+    """Issues requests through a Flask test client, in this process."""
+
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = self.client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json(silent=True)
+
+    def close(self):
+        pass
+
+
+class HTTPSession:
+    """Issues requests over one keep-alive HTTP connection."""
+
+    def __init__(self, url):
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=30)
+
+    def request(self, method, path, body=None, token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        if body is not None:
+            body = json.dumps(body)
+            headers["Content-Type"] = "application/json"
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (http.client.HTTPException, OSError):
+            # Reconnect on the next request; the failure counts as an error.
+            self.conn.close()
+            return 0, None
+        try:
+            return response.status, json.loads(data) if data else None
+        except ValueError:
+            return response.status, None
+
+    def close(self):
+        self.conn.close()
+
+
+class Recorder:
+    """Latency samples per operation, owned by one virtual user's thread."""
+
+    def __init__(self):
+        self.latencies = {}
+        self.errors = {}
+
+    def timed(self, name, session, method, path, body=None, token=None):
+        start = time.perf_counter()
+        status, data = session.request(method, path, body, token)
+        elapsed = time.perf_counter() - start
+
+        self.latencies.setdefault(name, []).append(elapsed)
+        if status != EXPECTED_STATUS[name]:
+            self.errors[name] = self.errors.get(name, 0) + 1
+        return status, data
+
+
+class VirtualUser:
+    """One authenticated user issuing a random mix of requests."""
+
+    def __init__(self, session, prefix, index, seed_projects, rng):
+        self.session = session
+        self.prefix = prefix
+        self.username = f"{prefix}-user{index}"
+        self.password = f"pw-{index}"
+        self.seed_projects = seed_projects
+        self.rng = rng
+        self.token = None
+        self.project_ids = []
+        self.registered = 0
+
+    def setup(self):
+        """Register, log in and seed projects; not part of the measurement."""
+        recorder = Recorder()
+        self._register(recorder, self.username)
+        self.login(recorder)
+        for _ in range(self.seed_projects):
+            self.create_project(recorder)
+        if recorder.errors:
+            raise RuntimeError(f"Seeding {self.username} failed: {recorder.errors}")
+
+    def _register(self, recorder, username):
+        return recorder.timed(
+            "register",
+            self.session,
+            "POST",
+            "/register",
+            {
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": self.password,
+            },
+        )
+
+    def register(self, recorder):
+        self.registered += 1
+        self._register(recorder, f"{self.username}-extra{self.registered}")
+
+    def login(self, recorder):
+        status, data = recorder.timed(
+            "login",
+            self.session,
+            "POST",
+            "/login",
+            {"username": self.username, "password": self.password},
+        )
+        if status == 200:
+            self.token = data["data"]["access_token"]
+
+    def me(self, recorder):
+        recorder.timed("me", self.session, "GET", "/me", token=self.token)
+
+    def list_projects(self, recorder):
+        recorder.timed(
+            "list_projects", self.session, "GET", "/projects", token=self.token
+        )
+
+    def get_project(self, recorder):
+        if not self.project_ids:
+            return self.create_project(recorder)
+        project_id = self.rng.choice(self.project_ids)
+        recorder.timed(
+            "get_project",
+            self.session,
+            "GET",
+            f"/projects/{project_id}",
+            token=self.token,
+        )
+
+    def create_project(self, recorder):
+        status, data = recorder.timed(
+            "create_project",
+            self.session,
+            "POST",
+            "/projects",
+            {"name": f"{self.prefix} project", "description": "load test"},
+            token=self.token,
+        )
+        if status == 201:
+            self.project_ids.append(data["id"])
+
+    def update_project(self, recorder):
+        if not self.project_ids:
+            return self.create_project(recorder)
+        project_id = self.rng.choice(self.project_ids)
+        recorder.timed(
+            "update_project",
+            self.session,
+            "PUT",
+            f"/projects/{project_id}",
+            {"description": f"updated {self.rng.random()}"},
+            token=self.token,
+        )
+
+    def delete_project(self, recorder):
+        # Keep one project around so reads always have something to fetch.
+        if len(self.project_ids) < 2:
+            return self.create_project(recorder)
+        project_id = self.project_ids.pop(self.rng.randrange(len(self.project_ids)))
+        recorder.timed(
+            "delete_project",
+            self.session,
+            "DELETE",
+            f"/projects/{project_id}",
+            token=self.token,
+        )
+
+    def run(self, mix, deadline, recorder):
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        while time.monotonic() < deadline:
+            (name,) = self.rng.choices(names, weights)
+            getattr(self, name)(recorder)
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(recorders, elapsed):
+    merged = {}
+    errors = {}
+    for recorder in recorders:
+        for name, samples in recorder.latencies.items():
+            merged.setdefault(name, []).extend(samples)
+        for name, count in recorder.errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    endpoints = {}
+    for name in sorted(merged):
+        samples = sorted(merged[name])
+        endpoints[name] = {
+            "requests": len(samples),
+            "errors": errors.get(name, 0),
+            "rps": round(len(samples) / elapsed, 1),
+            "p50_ms": round(percentile(samples, 50) * 1000, 2),
+            "p95_ms": round(percentile(samples, 95) * 1000, 2),
+            "p99_ms": round(percentile(samples, 99) * 1000, 2),
+        }
+
+    total = sum(len(samples) for samples in merged.values())
+    return {
+        "duration_s": round(elapsed, 2),
+        "requests": total,
+        "errors": sum(errors.values()),
+        "rps": round(total / elapsed, 1),
+        "endpoints": endpoints,
+    }
+
+
+def regressions(report, baseline, tolerance):
+    """Endpoints whose p95 latency or throughput is worse than `baseline`."""
+    found = []
+    for name, current in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            found.append(
+                f"{name}: p95 {previous['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+        if current["rps"] < previous["rps"] * (1 - tolerance):
+            found.append(f"{name}: rps {previous['rps']} -> {current['rps']}")
+    return found
+
+
+@contextlib.contextmanager
+def sessions(args, directory):
+    """Yield a factory of per-thread sessions for the selected target."""
+    environ = {}
+    if args.hash_method:
+        environ["PASSWORD_HASH_METHOD"] = args.hash_method
+
+    if args.url:
+        yield lambda: HTTPSession(args.url)
+    elif args.server == "client":
+        from app import create_app
+        from extensions import db
+
+        app = create_app(
+            {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{directory}/loadtest.db", **environ}
+        )
+        with app.app_context():
+            db.create_all()
+        yield lambda: TestClientSession(app)
+    else:
+        from benchmarks.serving import launched
+
+        with launched(args.server, directory, environ) as port:
+            yield lambda: HTTPSession(f"http://127.0.0.1:{port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--mix", type=parse_mix, default="read-heavy")
+    parser.add_argument("--seed-projects", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--server", choices=("client", "flask_dev", "gunicorn"), default="client"
+    )
+    parser.add_argument("--url", help="target an already running server")
+    parser.add_argument(
+        "--hash-method",
+        help="PASSWORD_HASH_METHOD for in-process and launched servers",
+    )
+    parser.add_argument("--output", help="also write the report to this file")
+    parser.add_argument("--baseline", help="report from a previous run to compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    prefix = f"lt{os.getpid()}-{int(time.time())}"
+    with tempfile.TemporaryDirectory() as directory:
+        with sessions(args, directory) as new_session:
+            users = [
+                VirtualUser(
+                    new_session(),
+                    prefix,
+                    index,
+                    args.seed_projects,
+                    random.Random(args.seed + index),
+                )
+                for index in range(args.concurrency)
+            ]
+            for user in users:
+                user.setup()
+
+            recorders = [Recorder() for _ in users]
+            start = time.monotonic()
+            deadline = start + args.duration
+            threads = [
+                threading.Thread(target=user.run, args=(args.mix, deadline, recorder))
+                for user, recorder in zip(users, recorders)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - start
+
+            for user in users:
+                user.session.close()
+
+    report = {
+        "target": args.url or args.server,
+        "concurrency": args.concurrency,
+        "mix": args.mix,
+        **summarize(recorders, elapsed),
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(report, json.load(f), args.tolerance)
+        if found:
+            print("Regressions:\n  " + "\n  ".join(found), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Per-request cost of logging: synchronous text vs the queued JSON pipeline.
+
+    python -m benchmarks.logging_overhead --requests 5000 --repeat 5
+
+Drives the cached GET /projects path, which does no SQL and logs one INFO
+event per request. "off" runs with INFO disabled and is the baseline the
+others are compared to. Because request timings are noisy, the cost of
+the log call itself on the calling thread is reported too.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+
+    from app import create_app
+    from extensions import db
+    from logs import TEXT_DATEFMT, TEXT_FORMAT, configure_logging
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{directory.name}/bench.db",
+            "PASSWORD_HASH_METHOD": "pbkdf2:sha256:1000",
+        }
+    )
+
+    log_path = os.path.join(directory.name, "app.log")
+    log_file = open(log_path, "a")
+
+    def synchronous_text():
+        # What app.py did before: logging.basicConfig on the request thread.
+        configure_logging(level="WARNING", stream=log_file)
+        root = logging.getLogger()
+        root.handlers.clear()
+        handler = logging.StreamHandler(log_file)
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT, TEXT_DATEFMT))
+        root.addHandler(handler)
+        root.setLevel(logging.INFO)
+
+    scenarios = {
+        "off": lambda: configure_logging(level="WARNING", stream=log_file),
+        "sync_text": synchronous_text,
+        "queued_json": lambda: configure_logging(stream=log_file),
+        "queued_json_sampled": lambda: configure_logging(
+            sample_rates={"project.list.cached": 0.01}, stream=log_file
+        ),
+    }
+
+    with app.app_context():
+        db.create_all()
+    client = app.test_client()
+    user = {"username": "bench", "email": "bench@example.com", "password": "bench"}
+    client.post("/register", json=user)
+    token = client.post(
+        "/login", json={"username": "bench", "password": "bench"}
+    ).json["data"]["access_token"]
+    client.environ_base["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+    client.post("/projects", json={"name": "Bench", "description": ""})
+    client.get("/projects")  # prime the response cache
+
+    logger = logging.getLogger("projects.routes")
+
+    def log_call():
+        logger.info(
+            "[API] [Get Projects] Cache hit for user: %s",
+            1,
+            extra={"event": "project.list.cached"},
+        )
+
+    results = {}
+    call_cost = {}
+    for name, configure in scenarios.items():
+        configure()
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            log_call()
+        call_cost[name] = round((time.perf_counter() - start) / args.requests * 1e6, 2)
+
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                client.get("/projects")
+            timings.append((time.perf_counter() - start) / args.requests)
+        # Reconfiguring stops the listener, flushing what is still queued.
+        configure_logging(level="WARNING", stream=log_file)
+        results[name] = round(statistics.median(timings) * 1e6, 1)
+
+    baseline = results["off"]
+    report = {
+        "requests": args.requests,
+        "us_per_request": results,
+        "logging_overhead_us": {
+            name: round(value - baseline, 1)
+            for name, value in results.items()
+            if name != "off"
+        },
+        "log_call_us": call_cost,
+    }
+    log_file.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
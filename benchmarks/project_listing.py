@@ -0,0 +1,105 @@
+"""Serialize one 10k-row project page: ORM + marshmallow vs Core + compiled.
+
+    python -m benchmarks.project_listing --rows 10000 --repeat 5
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+
+    from flask import jsonify
+    from sqlalchemy import insert, select
+
+    from app import create_app
+    from extensions import db
+    from fieldsets import schema_for
+    from projects import queries
+    from projects.models import Project, ProjectMember
+    from projects.routes import _attach_members, _project_rows
+    from projects.schemas import ProjectSchema
+    from serializers import compile_serializer
+    from users.models import User
+
+    app = create_app(
+        {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{directory.name}/bench.db"}
+    )
+
+    with app.test_request_context():
+        db.create_all()
+        db.session.execute(
+            insert(User),
+            [
+                {
+                    "username": f"user{i}",
+                    "email": f"user{i}@example.com",
+                    "password_hash": "x",
+                }
+                for i in range(1, 4)
+            ],
+        )
+        db.session.execute(
+            insert(Project),
+            [
+                {"name": f"Project {i}", "description": "d" * 80, "creator_id": 1}
+                for i in range(args.rows)
+            ],
+        )
+        db.session.execute(
+            insert(ProjectMember),
+            [
+                {"project_id": project_id, "user_id": user_id}
+                for project_id in range(1, args.rows + 1)
+                for user_id in (2, 3)
+            ],
+        )
+        db.session.commit()
+
+        schema = schema_for(ProjectSchema, None, many=True)
+        serializer = compile_serializer(schema)
+
+        def orm_path():
+            projects = db.session.scalars(
+                select(Project)
+                .where(Project.creator_id == 1)
+                .options(*queries.loader_options())
+                .order_by(Project.id)
+                .limit(args.rows)
+            ).all()
+            body = jsonify(schema.dump(projects)).get_data()
+            db.session.expunge_all()
+            return body
+
+        def fast_path():
+            rows = _project_rows(1, args.rows, None, None, None)
+            _attach_members(rows)
+            return serializer.dumps(rows)
+
+        assert orm_path() == fast_path(), "fast path output differs"
+
+        results = {}
+        paths = (("orm_marshmallow", orm_path), ("core_compiled", fast_path))
+        for name, path in paths:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                path()
+                timings.append(time.perf_counter() - start)
+            results[name] = round(statistics.median(timings) * 1000, 1)
+
+    speedup = results["orm_marshmallow"] / results["core_compiled"]
+    report = {"rows": args.rows, "median_ms": results, "speedup": round(speedup, 1)}
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Project search: the FTS5 index vs LIKE '%term%' on a large table.
+
+    python -m benchmarks.search --rows 1000000 --repeat 5
+
+Seeds --rows projects, with names and descriptions drawn from a small
+vocabulary plus a tag that only a handful of projects share. One user
+owns nearly all of them; a second one created --few of them, spread
+through the table, and joined a few more. Times one 50-row page for
+common, rare and absent terms. The FTS path is the query behind
+GET /projects/search; the LIKE path is what the same search costs without
+the index, ordered by id since LIKE cannot rank. A term in most rows is
+the one case LIKE wins for the big user: it stops after one page, while
+ranking has to score every match. For the user with few projects only
+their own matches are ranked, but FTS5 still walks every match in the
+table.
+"""
+import argparse
+import json
+import random
+import statistics
+import tempfile
+import time
+
+WORDS = (
+    "alpha apollo backend budget client cloud data design launch marketing "
+    "migration mobile onboarding platform portal redesign release report "
+    "research roadmap sales security support website"
+).split()
+
+# How many projects share each rare tag.
+TAG_SIZE = 10
+
+
+def _project(i, rng, creator_id=1):
+    name = " ".join(rng.sample(WORDS, 2)).title()
+    description = " ".join(rng.choices(WORDS, k=12))
+    return {
+        "name": f"{name} {i}",
+        "description": f"{description} tag{i // TAG_SIZE}",
+        "creator_id": creator_id,
+    }
+
+
+def _timed(run, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = run()
+        timings.append(time.perf_counter() - start)
+    return round(statistics.median(timings) * 1000, 2), len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    parser.add_argument(
+        "--few", type=int, default=20, help="projects created by the second user"
+    )
+    args = parser.parse_args()
+
+    directory = tempfile.TemporaryDirectory()
+
+    from sqlalchemy import insert, or_
+
+    from app import create_app
+    from extensions import db
+    from projects import queries
+    from projects.models import Project, ProjectMember
+    from projects.search import match_expression
+    from users.models import User
+
+    app = create_app(
+        {
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{directory.name}/bench.db",
+            "LOG_LEVEL": "WARNING",
+        }
+    )
+
+    with app.app_context():
+        db.create_all()
+        db.session.execute(
+            insert(User),
+            [
+                {"username": name, "email": f"{name}@example.com", "password_hash": "x"}
+                for name in ("bench", "few")
+            ],
+        )
+
+        rng = random.Random(args.seed)
+        every = max(args.rows // args.few, 1)
+        start = time.perf_counter()
+        chunk = 50_000
+        for first in range(0, args.rows, chunk):
+            db.session.execute(
+                insert(Project),
+                [
+                    _project(i, rng, creator_id=2 if i % every == every // 2 else 1)
+                    for i in range(first, min(first + chunk, args.rows))
+                ],
+            )
+        db.session.execute(
+            insert(ProjectMember),
+            [{"project_id": i * every + 1, "user_id": 2} for i in range(5)],
+        )
+        db.session.commit()
+        seed_s = time.perf_counter() - start
+
+        def fts(user_id, term):
+            return db.session.execute(
+                queries.search_project_rows(user_id, match_expression(term), args.limit)
+            ).all()
+
+        def like(user_id, term):
+            pattern = f"%{term}%"
+            statement = (
+                queries.user_project_rows(user_id, args.limit)
+                .where(
+                    or_(Project.name.like(pattern), Project.description.like(pattern))
+                )
+            )
+            return db.session.execute(statement).all()
+
+        cases = {
+            "common": (1, "roadmap"),
+            "rare": (1, f"tag{args.rows // TAG_SIZE // 2}"),
+            "absent": (1, "nonexistent"),
+            "common_few_projects": (2, "roadmap"),
+        }
+        results = {}
+        for label, (user_id, term) in cases.items():
+            fts_ms, fts_rows = _timed(lambda: fts(user_id, term), args.repeat)
+            like_ms, like_rows = _timed(lambda: like(user_id, term), args.repeat)
+            results[label] = {
+                "user_id": user_id,
+                "term": term,
+                "fts_ms": fts_ms,
+                "like_ms": like_ms,
+                "rows": {"fts": fts_rows, "like": like_rows},
+                "speedup": round(like_ms / fts_ms, 1) if fts_ms else None,
+            }
+
+    print(
+        json.dumps(
+            {"rows": args.rows, "seed_s": round(seed_s, 1), "queries": results},
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
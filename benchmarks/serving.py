@@ -0,0 +1,163 @@
+"""Throughput of the Flask dev server vs the gunicorn production launcher.
+
+    python -m benchmarks.serving --clients 16 --seconds 5
+
+Both servers run against a throwaway SQLite database and are driven with
+keep-alive HTTP clients hitting GET / (pure framework overhead) and a
+cached GET /projects (a realistic authenticated read).
+"""
+import argparse
+import contextlib
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_up(port, timeout=20):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"server on port {port} did not start")
+
+
+def _request(conn, method, path, body=None, headers=None):
+    headers = dict(headers or {})
+    if body is not None:
+        body = json.dumps(body)
+        headers["Content-Type"] = "application/json"
+    conn.request(method, path, body=body, headers=headers)
+    response = conn.getresponse()
+    return response.status, response.read()
+
+
+def _token(port):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    user = {"username": "bench", "email": "bench@example.com", "password": "bench"}
+    _request(conn, "POST", "/register", user)
+    credentials = {"username": user["username"], "password": user["password"]}
+    _, body = _request(conn, "POST", "/login", credentials)
+    token = json.loads(body)["data"]["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    for i in range(20):
+        _request(conn, "POST", "/projects", {"name": f"P{i}", "description": ""}, headers)
+    conn.close()
+    return headers
+
+
+def _drive(port, path, headers, clients, seconds):
+    counts = []
+    deadline = time.monotonic() + seconds
+
+    def client():
+        conn = http.client.HTTPConnection("127.0.0.1", port)
+        done = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                status, _ = _request(conn, "GET", path, headers=headers)
+            except (http.client.HTTPException, OSError):
+                # Idle keep-alive timeouts and recycled workers drop the
+                # connection; reconnect like a real client would.
+                conn.close()
+                errors += 1
+                continue
+            done += status == 200
+        conn.close()
+        counts.append((done, errors))
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {
+        "rps": round(sum(done for done, _ in counts) / seconds, 1),
+        "errors": sum(errors for _, errors in counts),
+    }
+
+
+SERVERS = {
+    "flask_dev": [sys.executable, "-m", "flask", "run", "--port", "{port}"],
+    "gunicorn": [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "wsgi:app"],
+}
+
+
+@contextlib.contextmanager
+def launched(name, directory, environ=None):
+    """Run server `name` from SERVERS on a free port; yields the port.
+
+    The server gets a fresh, migrated SQLite database inside `directory`.
+    """
+    port = _free_port()
+    env = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{directory}/{name}.db",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_ACCESSLOG="/dev/null",
+        FLASK_APP="app",
+        **(environ or {}),
+    )
+    subprocess.run(
+        [sys.executable, "-m", "flask", "db", "upgrade"],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+    )
+    server = subprocess.Popen(
+        [arg.format(port=port) for arg in SERVERS[name]],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        _wait_until_up(port)
+        yield port
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def run(name, clients, seconds, directory):
+    with launched(name, directory) as port:
+        headers = _token(port)
+        return {
+            "server": name,
+            "index": _drive(port, "/", {}, clients, seconds),
+            "projects": _drive(port, "/projects", headers, clients, seconds),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            run(name, args.clients, args.seconds, directory) for name in SERVERS
+        ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Concurrent read/write throughput: SQLite defaults vs the production profile.
+
+    python -m benchmarks.sqlite_profile --writers 4 --readers 8 --seconds 5
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from storage import PROFILES, listen_sqlite_pragmas
+
+
+def run(profile, writers, readers, seconds, directory):
+    path = os.path.join(directory, f"{profile}.db")
+    engine = create_engine(f"sqlite:///{path}", pool_size=writers + readers)
+    listen_sqlite_pragmas(engine, PROFILES[profile])
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE project (id INTEGER PRIMARY KEY, creator_id INTEGER,"
+                " name TEXT, description TEXT)"
+            )
+        )
+        conn.execute(text("CREATE INDEX ix_project_creator_id ON project (creator_id)"))
+
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    lock = threading.Lock()
+    deadline = time.monotonic() + seconds
+
+    def writer(worker_id):
+        done = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text(
+                            "INSERT INTO project (creator_id, name, description)"
+                            " VALUES (:creator_id, :name, :description)"
+                        ),
+                        {"creator_id": worker_id, "name": "p", "description": "x" * 200},
+                    )
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts["writes"] += done
+            counts["errors"] += errors
+
+    def reader(worker_id):
+        done = errors = 0
+        while time.monotonic() < deadline:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text(
+                            "SELECT * FROM project WHERE creator_id = :creator_id"
+                            " ORDER BY id DESC LIMIT 50"
+                        ),
+                        {"creator_id": worker_id % max(writers, 1)},
+                    ).all()
+                done += 1
+            except OperationalError:
+                errors += 1
+        with lock:
+            counts["reads"] += done
+            counts["errors"] += errors
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    engine.dispose()
+
+    return {
+        "profile": profile,
+        "writes_per_s": round(counts["writes"] / seconds, 1),
+        "reads_per_s": round(counts["reads"] / seconds, 1),
+        "errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = [
+            run(profile, args.writers, args.readers, args.seconds, directory)
+            for profile in ("default", "production")
+        ]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Cold start and import-time budget for a fresh worker process.
+
+    python -m benchmarks.startup --repeat 5 --max-startup-ms 1500 --max-import-ms 1000
+
+Each run starts a new interpreter that imports `app` and calls
+`create_app()`, the work a respawned gunicorn worker or a new container
+does before serving. `python -X importtime` attributes the import cost to
+top-level packages. Exits non-zero when the median cold start or the
+total import time is over budget.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STARTUP = "from app import create_app; create_app()"
+
+
+def _run(args, env):
+    return subprocess.run(
+        [sys.executable, *args],
+        cwd=ROOT,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+
+
+def cold_start_ms(env):
+    start = time.perf_counter()
+    _run(["-c", STARTUP], env)
+    return (time.perf_counter() - start) * 1000
+
+
+def import_times(env):
+    """Cumulative import time in ms per top-level module, from -X importtime."""
+    result = _run(["-X", "importtime", "-c", STARTUP], env)
+    totals = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time: <self us> | <cumulative us> | <indent><module>"
+        _, cumulative_us, name = line.split("|")
+        if not name.startswith("  "):  # only top-level imports
+            totals[name.strip()] = int(cumulative_us) / 1000
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-startup-ms", type=float, default=1500)
+    parser.add_argument("--max-import-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        env = dict(
+            os.environ,
+            SQLALCHEMY_DATABASE_URI=f"sqlite:///{directory}/startup.db",
+            LOG_LEVEL="WARNING",
+        )
+        _run(["-c", STARTUP], env)  # warm the bytecode cache
+        startups = [cold_start_ms(env) for _ in range(args.repeat)]
+        imports = import_times(env)
+
+    import_ms = sum(imports.values())
+    report = {
+        "startup_ms": {
+            "median": round(statistics.median(startups), 1),
+            "max": round(max(startups), 1),
+            "budget": args.max_startup_ms,
+        },
+        "import_ms": {"total": round(import_ms, 1), "budget": args.max_import_ms},
+        "slowest_imports_ms": {
+            name: round(ms, 1)
+            for name, ms in sorted(imports.items(), key=lambda item: -item[1])[
+                : args.top
+            ]
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if report["startup_ms"]["median"] > args.max_startup_ms:
+        failures.append(f"cold start {report['startup_ms']['median']}ms")
+    if import_ms > args.max_import_ms:
+        failures.append(f"imports {round(import_ms, 1)}ms")
+    if failures:
+        print("Over budget: " + ", ".join(failures), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Per-request validation overhead: marshmallow load vs compiled validators.
+
+    python -m benchmarks.validation --number 20000
+"""
+import argparse
+import json
+import timeit
+
+from marshmallow import INCLUDE
+
+from projects.schemas import ProjectSchema
+from users.schemas import UserLoginSchema, UserSchema
+from validation import compile_validator
+
+REGISTER = {"username": "alice", "email": "alice@example.com", "password": "secret"}
+LOGIN = {"username": "alice", "password": "secret"}
+CREATE = {"name": "Project", "description": "Description"}
+UPDATE = {"status": "Completed"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20_000)
+    args = parser.parse_args()
+
+    project_schema = ProjectSchema()
+    cases = {
+        # Baselines mirror the handlers before compilation, including the
+        # schema built per request in register_user and login.
+        "register": (
+            lambda: UserSchema().load(REGISTER),
+            compile_validator(UserSchema()).load,
+            REGISTER,
+        ),
+        "login": (
+            lambda: UserLoginSchema().load(LOGIN),
+            compile_validator(UserLoginSchema()).load,
+            LOGIN,
+        ),
+        "create_project": (
+            lambda: project_schema.load(CREATE),
+            compile_validator(project_schema).load,
+            CREATE,
+        ),
+        "update_project": (
+            lambda: project_schema.load(UPDATE, partial=True, unknown=INCLUDE),
+            compile_validator(project_schema, partial=True, unknown=INCLUDE).load,
+            UPDATE,
+        ),
+    }
+
+    results = {}
+    for name, (baseline, validator, payload) in cases.items():
+        before = timeit.timeit(baseline, number=args.number) / args.number
+        after = timeit.timeit(lambda: validator(payload), number=args.number)
+        after /= args.number
+        results[name] = {
+            "marshmallow_us": round(before * 1e6, 2),
+            "compiled_us": round(after * 1e6, 2),
+            "speedup": round(before / after, 1),
+        }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
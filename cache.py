@@ -0,0 +1,287 @@
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask import current_app
+
+CachedResponse = namedtuple("CachedResponse", ["body", "etag", "headers"])
+
+
+class NullBackend:
+    """Caches nothing; used when RESPONSE_CACHE_BACKEND is "none"."""
+
+    def get(self, key):
+        return None
+
+    def set(self, key, entry, tags):
+        pass
+
+    def invalidate(self, tag):
+        pass
+
+    def clear(self):
+        pass
+
+
+class MemoryBackend:
+    """In-process LRU with a TTL per entry and a tag -> keys index."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+
+            expires_at, entry, _tags = item
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry, tags):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, entry, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, tag):
+        with self._lock:
+            for key in self._tags.pop(tag, ()):
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+class SQLiteBackend:
+    """Cache shared by every worker process through a local SQLite file."""
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            body BLOB NOT NULL,
+            etag TEXT NOT NULL,
+            headers TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS cache_tags (
+            tag TEXT NOT NULL,
+            key TEXT NOT NULL,
+            PRIMARY KEY (tag, key)
+        );
+        CREATE INDEX IF NOT EXISTS ix_cache_tags_key ON cache_tags (key);
+        CREATE INDEX IF NOT EXISTS ix_cache_entries_expires_at
+            ON cache_entries (expires_at);
+    """
+
+    # Trimming to maxsize needs a COUNT, so only do it every so often.
+    _TRIM_EVERY = 100
+
+    def __init__(self, path, maxsize, ttl):
+        self.path = path
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._local = threading.local()
+        self._writes = itertools.count(1)
+
+    def _connection(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self._SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = (
+            self._connection()
+            .execute(
+                "SELECT body, etag, headers FROM cache_entries"
+                " WHERE key = ? AND expires_at >= ?",
+                (key, time.time()),
+            )
+            .fetchone()
+        )
+        if row is None:
+            return None
+        return CachedResponse(row[0], row[1], json.loads(row[2]))
+
+    def set(self, key, entry, tags):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "INSERT OR REPLACE INTO cache_entries VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    entry.body,
+                    entry.etag,
+                    json.dumps(entry.headers),
+                    time.time() + self.ttl,
+                ),
+            )
+            conn.execute("DELETE FROM cache_tags WHERE key = ?", (key,))
+            conn.executemany(
+                "INSERT OR IGNORE INTO cache_tags VALUES (?, ?)",
+                [(tag, key) for tag in tags],
+            )
+            if next(self._writes) % self._TRIM_EVERY == 0:
+                self._trim(conn)
+
+    def _trim(self, conn):
+        conn.execute("DELETE FROM cache_entries WHERE expires_at < ?", (time.time(),))
+        (count,) = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()
+        if count > self.maxsize:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key IN"
+                " (SELECT key FROM cache_entries ORDER BY expires_at LIMIT ?)",
+                (count - self.maxsize,),
+            )
+        conn.execute(
+            "DELETE FROM cache_tags WHERE key NOT IN (SELECT key FROM cache_entries)"
+        )
+
+    def invalidate(self, tag):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute(
+                "DELETE FROM cache_entries WHERE key IN"
+                " (SELECT key FROM cache_tags WHERE tag = ?)",
+                (tag,),
+            )
+            conn.execute("DELETE FROM cache_tags WHERE tag = ?", (tag,))
+
+    def clear(self):
+        conn = self._connection()
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("DELETE FROM cache_tags")
+
+
+class _CacheState:
+    """One app's backend, with its hit and invalidation counters."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+
+class ResponseCache:
+    """Pluggable cache of rendered GET responses, invalidated by tag.
+
+    RESPONSE_CACHE_BACKEND selects "memory" (per process, the default),
+    "sqlite" (shared by all workers through RESPONSE_CACHE_PATH) or "none".
+    Only a single process may use "memory": invalidations do not reach the
+    caches of other processes. gunicorn.conf.py and run.sh default to
+    "sqlite".
+    Every entry carries tags; writes call `invalidate` with the tags they
+    affect so only those entries are dropped.
+
+    Each app gets a backend of its own in `app.extensions`; the methods
+    use the one of `current_app`.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("RESPONSE_CACHE_BACKEND", "memory")
+        app.config.setdefault("RESPONSE_CACHE_SIZE", 4096)
+        app.config.setdefault("RESPONSE_CACHE_TTL", 300)
+        app.config.setdefault(
+            "RESPONSE_CACHE_PATH",
+            os.path.join(app.instance_path, "response_cache.db"),
+        )
+
+        name = app.config["RESPONSE_CACHE_BACKEND"]
+        maxsize = app.config["RESPONSE_CACHE_SIZE"]
+        ttl = app.config["RESPONSE_CACHE_TTL"]
+        if name == "memory":
+            backend = MemoryBackend(maxsize, ttl)
+        elif name == "sqlite":
+            path = app.config["RESPONSE_CACHE_PATH"]
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            backend = SQLiteBackend(path, maxsize, ttl)
+        elif name == "none":
+            backend = NullBackend()
+        else:
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {name!r}")
+        app.extensions["response_cache"] = _CacheState(backend)
+
+    @staticmethod
+    def _state():
+        return current_app.extensions["response_cache"]
+
+    @property
+    def backend(self):
+        return self._state().backend
+
+    def get(self, key):
+        state = self._state()
+        entry = state.backend.get(key)
+        # Unlocked counters: a racing increment may be lost now and then,
+        # which is fine for sizing the cache.
+        if entry is None:
+            state.misses += 1
+        else:
+            state.hits += 1
+        return entry
+
+    def set(self, key, entry, tags):
+        self._state().backend.set(key, entry, tags)
+
+    def invalidate(self, *tags):
+        state = self._state()
+        for tag in tags:
+            state.invalidations += 1
+            state.backend.invalidate(tag)
+
+    def clear(self):
+        self._state().backend.clear()
+
+    def stats(self):
+        state = self._state()
+        lookups = state.hits + state.misses
+        return {
+            "backend": type(state.backend).__name__,
+            "hits": state.hits,
+            "misses": state.misses,
+            "hit_ratio": round(state.hits / lookups, 4) if lookups else None,
+            "invalidations": state.invalidations,
+        }
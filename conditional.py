@@ -0,0 +1,21 @@
+import hashlib
+
+from flask import current_app, request
+
+
+def make_etag(*parts):
+    """A strong ETag over `parts`, e.g. row ids, `updated_at` and query args."""
+    return hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+def not_modified(etag):
+    """Return a bodiless 304 if the request's If-None-Match matches `etag`.
+
+    Returns None otherwise, so handlers can build the full response.
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    return response
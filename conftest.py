@@ -1,12 +1,23 @@
+import contextlib
+
 import pytest
-from app import app as flask_app, db
+from app import create_app
+from extensions import db, metrics, response_cache, sql_profiler
 from werkzeug.security import generate_password_hash
 from users.models import User
 
 
 @pytest.fixture(scope="session")
-def app():
-    return flask_app
+def app(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("data")
+    return create_app(
+        {
+            "TESTING": True,
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{directory}/app.db",
+            "RESPONSE_CACHE_PATH": str(directory / "response_cache.db"),
+            "JOB_WORKERS": 0,
+        }
+    )
 
 
 @pytest.fixture
@@ -20,6 +31,25 @@ def db_session(app):
         db.create_all()
         yield db.session
         db.drop_all()
+        response_cache.clear()
+        metrics.reset()
+
+
+@pytest.fixture
+def assert_max_queries():
+    """Context manager failing the test if the block runs more than `n` queries.
+
+        with assert_max_queries(2):
+            client.get("/projects")
+    """
+
+    @contextlib.contextmanager
+    def check(n):
+        with sql_profiler.profile() as profile:
+            yield profile
+        assert profile.count <= n, f"Query budget of {n} exceeded: {profile.report()}"
+
+    return check
 
 
 @pytest.fixture
@@ -1,9 +1,15 @@
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_marshmallow import Marshmallow
+from cache import ResponseCache
+from metrics import Metrics
+from passwords import PasswordPool
+from sqlprofile import SQLProfiler
 
 db = SQLAlchemy()
-migrate = Migrate()
 jwt = JWTManager()
 ma = Marshmallow()
+password_pool = PasswordPool()
+response_cache = ResponseCache()
+metrics = Metrics()
+sql_profiler = SQLProfiler()
@@ -0,0 +1,32 @@
+from functools import lru_cache
+
+from flask import request
+
+
+class FieldsetError(ValueError):
+    """Raised when `?fields=` names a field the schema does not dump."""
+
+
+def requested_fields(schema):
+    """Parse `?fields=a,b` against the dump fields of `schema`.
+
+    Returns None when the parameter is absent, meaning "every field".
+    """
+    raw = request.args.get("fields")
+    if raw is None:
+        return None
+
+    fields = frozenset(name.strip() for name in raw.split(",") if name.strip())
+    if not fields:
+        raise FieldsetError("fields must name at least one field")
+
+    unknown = fields - set(schema.dump_fields)
+    if unknown:
+        raise FieldsetError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return fields
+
+
+@lru_cache(maxsize=256)
+def schema_for(schema_class, fields=None, many=False):
+    """A shared `schema_class` instance limited to `fields` (None for all)."""
+    return schema_class(only=fields, many=many)
@@ -0,0 +1,85 @@
+"""Gunicorn settings for serving Solo in production.
+
+Every setting can be overridden from the environment. Send SIGHUP to the
+master to gracefully replace all workers (new configuration, fresh
+processes); because the app is preloaded, deploying new code needs the
+USR2 + QUIT binary upgrade or a container restart.
+"""
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Preload the app in the master so workers fork with it already imported:
+# fast respawns and copy-on-write shared memory.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+
+workers = int(
+    os.getenv("GUNICORN_WORKERS")
+    or os.getenv("WEB_CONCURRENCY")
+    or multiprocessing.cpu_count() * 2 + 1
+)
+
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+
+# App settings for the workers, unless set explicitly. Gunicorn puts raw_env
+# into the environment before it preloads the app, so reading this file
+# leaves os.environ alone. (`gunicorn -e` replaces the whole list.)
+_app_env = {}
+
+# Workers are separate processes, so a write in one can only invalidate
+# what the others serve through a cache they share. Likewise a scrape
+# reaches one worker, which reports all of them from files the workers
+# share; see metrics.Metrics.
+if workers > 1:
+    _app_env["RESPONSE_CACHE_BACKEND"] = "sqlite"
+    _app_env["METRICS_DIR"] = os.path.join(
+        tempfile.gettempdir(), f"solo-metrics-{os.getpid()}"
+    )
+
+# The app sizes these per process; each worker gets its share of a budget
+# for the whole server. With fewer CPUs than workers there are no hashing
+# processes and each worker hashes inline. Either way the queue admits one
+# hash per request thread, so a login is not refused while a thread is free.
+password_workers = multiprocessing.cpu_count() // workers
+_app_env["PASSWORD_POOL_WORKERS"] = str(password_workers)
+_app_env["PASSWORD_POOL_QUEUE_SIZE"] = str(
+    max(32 // workers if password_workers else 0, threads - 1)
+)
+
+raw_env = [
+    f"{name}={value}" for name, value in _app_env.items() if name not in os.environ
+]
+
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Recycle workers after N requests (with jitter so they don't all restart
+# at once) to bound the effect of slow leaks and fragmentation.
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+errorlog = "-"
+
+
+def on_starting(server):
+    # Counters start from zero with the server, not from a previous run's.
+    directory = os.environ.get("METRICS_DIR")
+    if directory:
+        for path in glob.glob(os.path.join(directory, "*.json")):
+            os.remove(path)
+
+
+def post_fork(server, worker):
+    # Connections opened in the master must not be shared with workers.
+    from wsgi import app
+    from extensions import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
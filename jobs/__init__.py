@@ -0,0 +1,5 @@
+from .routes import jobs
+from . import commands  # noqa: F401  registers `flask jobs ...` commands
+
+
+__all__ = ["jobs"]
@@ -0,0 +1,48 @@
+import time
+
+import click
+from flask import current_app
+
+from cache import MemoryBackend
+from extensions import response_cache
+from jobs.routes import jobs
+from jobs.runner import job_runner
+
+
+@jobs.cli.command("work")
+@click.option("--once", is_flag=True, help="Run the jobs that are due, then exit.")
+@click.option(
+    "--workers",
+    type=int,
+    help="Jobs to run at once. Defaults to JOB_WORKERS, or 2 if that is 0.",
+)
+def work_command(once, workers):
+    """Run queued jobs in this process until interrupted.
+
+    Web servers only run jobs themselves when JOB_WORKERS is set, so by
+    default this is the one process running them, and per-type limits
+    hold across the deployment.
+    """
+    if isinstance(response_cache.backend, MemoryBackend):
+        click.echo(
+            "Warning: RESPONSE_CACHE_BACKEND is memory, so reads cached by the"
+            " web servers are not invalidated by the jobs run here",
+            err=True,
+        )
+
+    if once:
+        ran = job_runner.run_pending()
+        click.echo(f"Ran {ran} jobs")
+        return
+
+    config = current_app.config
+    config["JOB_WORKERS"] = workers or config["JOB_WORKERS"] or 2
+    job_runner.start()
+    click.echo(f"Running jobs with {config['JOB_WORKERS']} workers")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        click.echo("Waiting for running jobs to finish")
+    finally:
+        job_runner.stop()
@@ -0,0 +1,35 @@
+from datetime import datetime, timezone
+
+from extensions import db
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class Job(db.Model):
+    # Claiming scans due jobs by status and time; see `queries.claim_job`.
+    __table_args__ = (db.Index("ix_job_status_run_at", "status", "run_at"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(64), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    # queued -> running -> succeeded | failed; failed attempts that may be
+    # retried go back to queued with a later run_at.
+    status = db.Column(db.String(16), nullable=False, default="queued")
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    max_attempts = db.Column(db.Integer, nullable=False, default=3)
+    run_at = db.Column(db.DateTime, nullable=False, default=_utcnow)
+    # A running job whose lease has expired was abandoned by a worker that
+    # died or restarted, and may be claimed again.
+    lease_expires_at = db.Column(db.DateTime)
+    result = db.Column(db.JSON)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=_utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), index=True)
+
+    def __repr__(self):
+        return f"<Job {self.id} {self.type} {self.status}>"
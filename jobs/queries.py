@@ -0,0 +1,84 @@
+from datetime import datetime
+
+from sqlalchemy import or_, select, update
+
+from jobs.models import Job
+from query_audit import audited
+
+
+@audited({"types": ["projects.delete"], "now": datetime(2026, 1, 1)})
+def due_job(types, now):
+    """The id of the next due job of one of `types`, without claiming it.
+
+    Due means queued with `run_at` reached, or running with an expired
+    lease. A plain read, so idle workers can poll without taking SQLite's
+    write lock.
+    """
+    due = or_(
+        (Job.status == "queued") & (Job.run_at <= now),
+        (Job.status == "running") & (Job.lease_expires_at < now),
+    )
+    return (
+        select(Job.id)
+        .where(Job.type.in_(types) & due)
+        .order_by(Job.run_at, Job.id)
+        .limit(1)
+    )
+
+
+@audited(
+    {
+        "types": ["projects.delete"],
+        "now": datetime(2026, 1, 1),
+        "lease_until": datetime(2026, 1, 1, 0, 5),
+    }
+)
+def claim_job(types, now, lease_until):
+    """UPDATE ... RETURNING that claims the next due job of one of `types`.
+
+    The claim happens in a single statement under SQLite's write lock, so
+    two workers, even in different processes, never claim the same job.
+    """
+    return (
+        update(Job)
+        .where(Job.id == due_job(types, now).scalar_subquery())
+        .values(
+            status="running",
+            attempts=Job.attempts + 1,
+            started_at=now,
+            lease_expires_at=lease_until,
+        )
+        .returning(
+            Job.id,
+            Job.type,
+            Job.payload,
+            Job.user_id,
+            Job.attempts,
+            Job.max_attempts,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+@audited({"job_id": 1, "attempts": 1, "lease_until": datetime(2026, 1, 1, 0, 5)})
+def renew_lease(job_id, attempts, lease_until):
+    """Extend the lease of attempt `attempts` of a running job.
+
+    Matches nothing once another worker has reclaimed the job.
+    """
+    return (
+        update(Job)
+        .where(
+            (Job.id == job_id)
+            & (Job.attempts == attempts)
+            & (Job.status == "running")
+        )
+        .values(lease_expires_at=lease_until)
+        .execution_options(synchronize_session=False)
+    )
+
+
+@audited({"user_id": 1, "job_id": 1})
+def user_job(user_id, job_id):
+    """A single job, only if it was enqueued by `user_id`."""
+    return select(Job).where((Job.id == job_id) & (Job.user_id == user_id))
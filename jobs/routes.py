@@ -0,0 +1,72 @@
+import logging
+
+from flask import Blueprint, jsonify, request, url_for
+from flask_jwt_extended import current_user, jwt_required
+from marshmallow.exceptions import ValidationError
+
+from extensions import db
+from jobs import queries
+from jobs.runner import job_runner
+from jobs.schemas import JobRequestSchema, JobSchema
+
+_logger = logging.getLogger(__name__)
+jobs = Blueprint("jobs", __name__)
+job_schema = JobSchema()
+job_request_schema = JobRequestSchema()
+
+
+def accepted(job):
+    """202 response for a queued `job`, pointing at its status endpoint."""
+    response = job_schema.jsonify(job)
+    response.status_code = 202
+    response.headers["Location"] = url_for("jobs.get_job", job_id=job.id)
+    return response
+
+
+@jobs.route("/jobs", methods=["POST"])
+@jwt_required()
+def enqueue_job():
+    """Queue a job to run in the background"""
+    try:
+        data = job_request_schema.load(request.json)
+    except ValidationError as err:
+        _logger.error("[API] [Enqueue Job] Validation error: %s", err.messages)
+        return jsonify(err.messages), 400
+
+    job_type = data["type"]
+    schema = job_runner.payload_schema(job_type)
+    if schema is None:
+        _logger.warning("[API] [Enqueue Job] Unknown job type: %s", job_type)
+        return jsonify({"error": f"Unknown job type: {job_type}"}), 400
+
+    try:
+        payload = schema.load(data["payload"])
+    except ValidationError as err:
+        _logger.error("[API] [Enqueue Job] Invalid %s payload: %s", job_type, err.messages)
+        return jsonify({"payload": err.messages}), 400
+
+    current_user_id = current_user.id
+    job = job_runner.enqueue(job_type, payload, current_user_id)
+    _logger.info(
+        "[API] [Enqueue Job] Queued job: %s (%s) for user: %s",
+        job.id,
+        job_type,
+        current_user_id,
+        extra={"event": "job.enqueue"},
+    )
+    return accepted(job)
+
+
+@jobs.route("/jobs/<int:job_id>", methods=["GET"])
+@jwt_required()
+def get_job(job_id):
+    """Get the status of a job the current user queued"""
+    current_user_id = current_user.id
+    job = db.session.scalars(queries.user_job(current_user_id, job_id)).first()
+    if job is None:
+        _logger.warning(
+            "[API] [Get Job] Job not found: %s for user: %s", job_id, current_user_id
+        )
+        return jsonify({"msg": "Job not found"}), 404
+
+    return job_schema.jsonify(job), 200
@@ -0,0 +1,334 @@
+import atexit
+import contextlib
+import logging
+import os
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import update
+
+from extensions import db
+from jobs import queries
+from jobs.models import Job
+
+_logger = logging.getLogger(__name__)
+
+
+class JobFailed(Exception):
+    """Raised by a handler for a failure that retrying will not fix."""
+
+
+class _Handler:
+    def __init__(self, fn, concurrency, max_attempts, schema):
+        self.fn = fn
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.schema = schema
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
+
+class _RunnerState:
+    """One app's dispatcher thread, worker pool and running jobs per type."""
+
+    def __init__(self, app):
+        self.app = app
+        self.running = Counter()
+        self.pid = None
+        self.executor = None
+        self.dispatcher = None
+        self.lock = threading.Lock()
+        self.wake = threading.Event()
+        self.stopping = threading.Event()
+
+
+class JobRunner:
+    """Run background jobs stored in the `job` table on a thread pool.
+
+    `enqueue` commits a row, so queued work survives restarts. A
+    dispatcher thread claims due jobs and runs up to JOB_WORKERS at once,
+    and at most `concurrency` of any one type. Failed jobs are retried with
+    exponential backoff from JOB_RETRY_BASE_SECONDS, capped at
+    JOB_RETRY_MAX_SECONDS, until their handler's `max_attempts` are used up.
+    A claimed job holds a lease of JOB_LEASE_SECONDS, renewed while its
+    handler runs, so only jobs whose worker died are claimed again.
+
+    `flask jobs work` runs a dispatcher. Processes serving requests only
+    start one when JOB_WORKERS is set above its default of 0. Otherwise
+    they just enqueue, and with one process running every job the
+    per-type limits hold across the deployment.
+
+    Handlers are registered on the runner; each app's dispatcher lives in
+    `app.extensions["job_runner"]`, keyed by runner.
+    """
+
+    def __init__(self, app=None):
+        self._handlers = {}
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("JOB_WORKERS", 0)
+        app.config.setdefault("JOB_POLL_INTERVAL", 1.0)
+        app.config.setdefault("JOB_LEASE_SECONDS", 300)
+        app.config.setdefault("JOB_RETRY_BASE_SECONDS", 2.0)
+        app.config.setdefault("JOB_RETRY_MAX_SECONDS", 300.0)
+
+        app.extensions.setdefault("job_runner", {})[self] = _RunnerState(app)
+
+        if app.config["JOB_WORKERS"]:
+            # Started on first request so prefork servers start the
+            # threads in each worker rather than in the master.
+            app.before_request(self._ensure_started)
+
+    def _state(self):
+        return current_app.extensions["job_runner"][self]
+
+    def handler(self, job_type, concurrency=1, max_attempts=3, schema=None):
+        """Register the decorated function as the handler of `job_type`.
+
+        It is called as `fn(payload, user_id)` in an app context and returns
+        a JSON-serializable result. Raise `JobFailed` to fail without
+        retrying. Types with a payload `schema` may be enqueued by clients
+        through POST /jobs.
+        """
+
+        def decorator(fn):
+            self._handlers[job_type] = _Handler(fn, concurrency, max_attempts, schema)
+            return fn
+
+        return decorator
+
+    def payload_schema(self, job_type):
+        """The schema clients' payloads for `job_type` are loaded with, or None."""
+        handler = self._handlers.get(job_type)
+        return handler.schema if handler is not None else None
+
+    def enqueue(self, job_type, payload=None, user_id=None, run_at=None):
+        """Commit a new job and wake the dispatcher; returns the `Job`."""
+        job = Job(
+            type=job_type,
+            payload=payload or {},
+            user_id=user_id,
+            max_attempts=self._handlers[job_type].max_attempts,
+            run_at=run_at or _utcnow(),
+        )
+        db.session.add(job)
+        db.session.commit()
+        self._state().wake.set()
+        return job
+
+    def backoff(self, attempts):
+        """Seconds to wait before retrying a job that failed `attempts` times."""
+        config = current_app.config
+        return min(
+            config["JOB_RETRY_MAX_SECONDS"],
+            config["JOB_RETRY_BASE_SECONDS"] * 2 ** (attempts - 1),
+        )
+
+    def run_pending(self):
+        """Run due jobs one after another on this thread; return how many ran."""
+        app = current_app._get_current_object()
+        ran = 0
+        while (job := self._claim(app, list(self._handlers))) is not None:
+            self._execute(app, job)
+            ran += 1
+        return ran
+
+    def start(self):
+        """Start the dispatcher thread and the worker pool for the current app."""
+        state = self._state()
+        state.pid = os.getpid()
+        state.running = Counter()
+        state.stopping.clear()
+        state.executor = ThreadPoolExecutor(
+            max_workers=max(state.app.config["JOB_WORKERS"], 1),
+            thread_name_prefix="job-worker",
+        )
+        state.dispatcher = threading.Thread(
+            target=self._dispatch, args=(state,), name="job-dispatcher", daemon=True
+        )
+        state.dispatcher.start()
+        atexit.register(self._stop, state)
+
+    def stop(self):
+        """Stop claiming jobs and wait for the running ones to finish."""
+        self._stop(self._state())
+
+    def _stop(self, state):
+        state.stopping.set()
+        state.wake.set()
+        if state.dispatcher is not None:
+            state.dispatcher.join()
+            state.dispatcher = None
+        if state.executor is not None:
+            state.executor.shutdown()
+            state.executor = None
+        state.pid = None
+
+    def _ensure_started(self):
+        # Threads do not survive fork, so a forked child starts its own.
+        state = self._state()
+        if state.pid != os.getpid():
+            with state.lock:
+                if state.pid != os.getpid():
+                    self.start()
+
+    def _free_types(self, state):
+        with state.lock:
+            if sum(state.running.values()) >= max(state.app.config["JOB_WORKERS"], 1):
+                return []
+            return [
+                job_type
+                for job_type, handler in self._handlers.items()
+                if state.running[job_type] < handler.concurrency
+            ]
+
+    def _dispatch(self, state):
+        while not state.stopping.is_set():
+            # Cleared before claiming, so a job enqueued meanwhile is not missed.
+            state.wake.clear()
+            job = None
+            if types := self._free_types(state):
+                try:
+                    job = self._claim(state.app, types)
+                except Exception:
+                    _logger.exception("[Jobs] [Dispatch] Could not claim a job")
+
+            if job is None:
+                state.wake.wait(state.app.config["JOB_POLL_INTERVAL"])
+                continue
+
+            with state.lock:
+                state.running[job.type] += 1
+            state.executor.submit(self._run_claimed, state, job)
+
+    def _run_claimed(self, state, job):
+        try:
+            self._execute(state.app, job)
+        finally:
+            with state.lock:
+                state.running[job.type] -= 1
+            state.wake.set()
+
+    def _claim(self, app, types):
+        with app.app_context():
+            now = _utcnow()
+            # Poll with a read: the UPDATE would take SQLite's write lock
+            # from request handlers even when nothing is due.
+            if db.session.execute(queries.due_job(types, now)).first() is None:
+                return None
+            lease = timedelta(seconds=app.config["JOB_LEASE_SECONDS"])
+            job = db.session.execute(
+                queries.claim_job(types, now, now + lease)
+            ).first()
+            db.session.commit()
+            return job
+
+    def _execute(self, app, job):
+        with app.app_context():
+            if job.attempts > job.max_attempts:
+                # Reclaimed after its lease ran out on the last attempt.
+                values = self._failed(job, "Abandoned by its worker", retry=False)
+            else:
+                try:
+                    with self._renewing_lease(app, job):
+                        result = self._handlers[job.type].fn(job.payload, job.user_id)
+                except Exception as err:
+                    db.session.rollback()
+                    values = self._failed(
+                        job,
+                        f"{type(err).__name__}: {err}",
+                        retry=not isinstance(err, JobFailed),
+                    )
+                else:
+                    values = {"status": "succeeded", "result": result}
+                    _logger.info(
+                        "[Jobs] [Run] Job %s (%s) succeeded on attempt %s",
+                        job.id,
+                        job.type,
+                        job.attempts,
+                        extra={"event": "job.succeeded"},
+                    )
+
+            if values["status"] != "queued":
+                values["finished_at"] = _utcnow()
+            # If the lease ran out and another worker claimed the job, that
+            # worker's attempt is the one recorded.
+            db.session.execute(
+                update(Job)
+                .where((Job.id == job.id) & (Job.attempts == job.attempts))
+                .values(lease_expires_at=None, **values)
+                .execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+
+    @contextlib.contextmanager
+    def _renewing_lease(self, app, job):
+        """Keep extending the job's lease while the block runs.
+
+        Without this, a job running longer than JOB_LEASE_SECONDS would be
+        reclaimed and run a second time alongside the first.
+        """
+        lease = app.config["JOB_LEASE_SECONDS"]
+        done = threading.Event()
+
+        def renew():
+            while not done.wait(lease / 3):
+                lease_until = _utcnow() + timedelta(seconds=lease)
+                with app.app_context():
+                    try:
+                        db.session.execute(
+                            queries.renew_lease(job.id, job.attempts, lease_until)
+                        )
+                        db.session.commit()
+                    except Exception:
+                        _logger.exception(
+                            "[Jobs] [Lease] Could not renew the lease of job %s",
+                            job.id,
+                        )
+
+        heartbeat = threading.Thread(
+            target=renew, name=f"job-{job.id}-lease", daemon=True
+        )
+        heartbeat.start()
+        try:
+            yield
+        finally:
+            done.set()
+            heartbeat.join()
+
+    def _failed(self, job, error, retry):
+        if retry and job.attempts < job.max_attempts:
+            delay = self.backoff(job.attempts)
+            _logger.warning(
+                "[Jobs] [Run] Job %s (%s) failed on attempt %s, retrying in %ss: %s",
+                job.id,
+                job.type,
+                job.attempts,
+                delay,
+                error,
+            )
+            return {
+                "status": "queued",
+                "run_at": _utcnow() + timedelta(seconds=delay),
+                "last_error": error,
+            }
+
+        _logger.error(
+            "[Jobs] [Run] Job %s (%s) failed after %s attempts: %s",
+            job.id,
+            job.type,
+            job.attempts,
+            error,
+        )
+        return {"status": "failed", "last_error": error}
+
+
+job_runner = JobRunner()
@@ -0,0 +1,21 @@
+from flask_marshmallow import Schema
+from marshmallow.fields import DateTime, Dict, Integer, Raw, String
+
+
+class JobSchema(Schema):
+    id = Integer(dump_only=True)
+    type = String(dump_only=True)
+    status = String(dump_only=True)
+    attempts = Integer(dump_only=True)
+    max_attempts = Integer(dump_only=True)
+    run_at = DateTime(dump_only=True)
+    created_at = DateTime(dump_only=True)
+    started_at = DateTime(dump_only=True)
+    finished_at = DateTime(dump_only=True)
+    last_error = String(dump_only=True)
+    result = Raw(dump_only=True)
+
+
+class JobRequestSchema(Schema):
+    type = String(required=True)
+    payload = Dict(load_default=dict)
@@ -0,0 +1,136 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+TEXT_FORMAT = "[%(asctime)s] %(levelname)s in %(module)s: %(message)s"
+TEXT_DATEFMT = "%Y-%m-%d %H:%M:%S"
+
+# LogRecord attributes that aren't user supplied `extra` fields.
+_RESERVED = frozenset(
+    logging.LogRecord("", 0, "", 0, "", (), None).__dict__
+) | {"message", "asctime", "taskName"}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and extras."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of chatty INFO/DEBUG events.
+
+    Records logged with `extra={"event": name}` are kept with probability
+    `rates[name]` (1.0 when absent). Warnings and errors always pass.
+    """
+
+    def __init__(self, rates=None):
+        super().__init__()
+        self.rates = dict(rates or {})
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+        rate = self.rates.get(getattr(record, "event", None), 1.0)
+        return rate >= 1.0 or random.random() < rate
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue records as they are, leaving formatting to the listener.
+
+    The stock `prepare` renders the message on the calling thread, which
+    is the work we want off the request path. Records stay in process, so
+    they needn't be made picklable.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+_listener = None
+
+
+def configure_logging(level="INFO", fmt="json", sample_rates=None, stream=None):
+    """Route the root logger through a queue drained by a background thread.
+
+    Request threads only filter and enqueue records; a `QueueListener`
+    formats them (as JSON, or the classic text format when `fmt` is
+    "text") and writes them to `stream`, stderr by default.
+    """
+    global _listener
+    _stop()
+
+    if fmt == "json":
+        formatter = JSONFormatter()
+    elif fmt == "text":
+        formatter = logging.Formatter(TEXT_FORMAT, TEXT_DATEFMT)
+    else:
+        raise ValueError(f"Unknown LOG_FORMAT {fmt!r}")
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(formatter)
+
+    handler = DeferredQueueHandler(queue.SimpleQueue())
+    handler.addFilter(SamplingFilter(sample_rates))
+
+    root = logging.getLogger()
+    for existing in root.handlers[:]:
+        if not _is_pytest_handler(existing):
+            root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    return handler
+
+
+def sample_rates_from_env(environ=os.environ):
+    """Read LOG_SAMPLE_RATES as a JSON object, e.g. '{"user.me": 0.01}'."""
+    return json.loads(environ.get("LOG_SAMPLE_RATES", "{}"))
+
+
+def _is_pytest_handler(handler):
+    # Keep the capture handlers pytest installs on the root logger.
+    return type(handler).__module__.startswith("_pytest")
+
+
+def _stop():
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def _restart_in_child():
+    # A forked worker (e.g. gunicorn) inherits the queue but not the
+    # listener thread, so it would never drain. Give it its own.
+    global _listener
+    if _listener is None:
+        return
+    _listener = QueueListener(
+        _listener.queue, *_listener.handlers, respect_handler_level=True
+    )
+    _listener.start()
+
+
+atexit.register(_stop)
+os.register_at_fork(after_in_child=_restart_in_child)
@@ -0,0 +1,383 @@
+import atexit
+import fcntl
+import glob
+import json
+import os
+import secrets
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Prometheus' default latency buckets, in seconds.
+DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0
+)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Shard:
+    """Counters written by a single thread, so updates need no lock."""
+
+    def __init__(self, buckets):
+        self.thread = threading.current_thread()
+        self.size = len(buckets) + 1
+        self.started = 0
+        self.finished = 0
+        self.requests = {}
+        self.latency = {}
+        self.db_time = {}
+        # DB time of the request this thread is serving; None between
+        # requests so queries from CLI commands or startup aren't counted.
+        self.current_db_time = None
+
+    def observe(self, histograms, key, index, value):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = [0] * self.size + [0.0]
+        histogram[index] += 1
+        histogram[-1] += value
+
+    def merge_into(self, other):
+        other.started += self.started
+        other.finished += self.finished
+        for key, count in self.requests.copy().items():
+            other.requests[key] = other.requests.get(key, 0) + count
+        for name in ("latency", "db_time"):
+            target = getattr(other, name)
+            for key, histogram in getattr(self, name).copy().items():
+                totals = target.setdefault(key, [0] * self.size + [0.0])
+                for i, value in enumerate(list(histogram)):
+                    totals[i] += value
+
+    def to_json(self):
+        return {
+            "started": self.started,
+            "finished": self.finished,
+            "requests": [[*key, count] for key, count in self.requests.items()],
+            "latency": [[*key, histogram] for key, histogram in self.latency.items()],
+            "db_time": [[*key, histogram] for key, histogram in self.db_time.items()],
+        }
+
+    @classmethod
+    def from_json(cls, buckets, data):
+        shard = cls(buckets)
+        shard.started = data["started"]
+        shard.finished = data["finished"]
+        shard.requests = {tuple(item[:-1]): item[-1] for item in data["requests"]}
+        for name in ("latency", "db_time"):
+            setattr(shard, name, {tuple(item[:-1]): item[-1] for item in data[name]})
+        return shard
+
+
+class _Recorder:
+    """One app's shards, and the file they are flushed to under METRICS_DIR."""
+
+    def __init__(self, buckets, directory, flush_interval):
+        self.buckets = buckets
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._local = threading.local()
+        self._shards = []
+        self._retired = _Shard(self.buckets)
+        # Guards the shard list: taken once per new thread and per scrape,
+        # never per request.
+        self._lock = threading.Lock()
+        self._path = None
+        self._pid = None
+        self._flushed = None
+
+    def shard(self):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = _Shard(self.buckets)
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def current_shard(self):
+        """This thread's shard, if it has recorded anything yet."""
+        return getattr(self._local, "shard", None)
+
+    def _snapshot(self):
+        with self._lock:
+            live = []
+            for shard in self._shards:
+                if shard.thread.is_alive():
+                    live.append(shard)
+                else:
+                    shard.merge_into(self._retired)
+            self._shards = live
+
+            total = _Shard(self.buckets)
+            self._retired.merge_into(total)
+            for shard in live:
+                shard.merge_into(total)
+        return total
+
+    def start_flushing(self):
+        # Started on first request, so each forked worker writes its own file.
+        if self.directory is None or self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._path = os.path.join(
+                self.directory, f"{self._pid}-{secrets.token_hex(4)}.json"
+            )
+        threading.Thread(target=self._flush_forever, daemon=True).start()
+        atexit.register(self.flush)
+
+    def _flush_forever(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Write this process's totals to its file in METRICS_DIR."""
+        if self._path is None:
+            return
+        total = self._snapshot()
+        counts = (total.started, total.finished)
+        if counts == self._flushed:
+            return
+        _write_json(self._path, total.to_json())
+        self._flushed = counts
+
+    def _collect(self, total):
+        """Add the totals other processes wrote to METRICS_DIR to `total`."""
+        archive_path = os.path.join(self.directory, "archive.json")
+        with open(os.path.join(self.directory, ".lock"), "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            archive = _Shard(self.buckets)
+            if os.path.exists(archive_path):
+                archive = _Shard.from_json(self.buckets, _read_json(archive_path))
+
+            exited = []
+            for path in glob.glob(os.path.join(self.directory, "*-*.json")):
+                if path == self._path:
+                    continue
+                shard = _Shard.from_json(self.buckets, _read_json(path))
+                if _is_running(int(os.path.basename(path).split("-")[0])):
+                    shard.merge_into(total)
+                else:
+                    # Requests it had in flight will never finish.
+                    shard.started = shard.finished = 0
+                    shard.merge_into(archive)
+                    exited.append(path)
+
+            if exited:
+                _write_json(archive_path, archive.to_json())
+                for path in exited:
+                    os.remove(path)
+        archive.merge_into(total)
+
+    def reset(self):
+        with self._lock:
+            for shard in self._shards:
+                shard.started = shard.finished = 0
+                shard.requests.clear()
+                shard.latency.clear()
+                shard.db_time.clear()
+            self._retired = _Shard(self.buckets)
+
+    def render(self):
+        total = self._snapshot()
+        if self.directory is not None:
+            self._collect(total)
+        lines = [
+            "# HELP http_requests_total Requests handled, by endpoint, method and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (endpoint, method, status), count in sorted(total.requests.items()):
+            labels = _labels(endpoint=endpoint, method=method, status=status)
+            lines.append(f"http_requests_total{{{labels}}} {count}")
+
+        lines += [
+            "# HELP http_requests_in_flight Requests currently being handled.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {total.started - total.finished}",
+        ]
+        lines += self._histogram(
+            "http_request_duration_seconds",
+            "Request latency, by endpoint and method.",
+            total.latency,
+        )
+        lines += self._histogram(
+            "http_request_db_seconds",
+            "Time spent executing SQL per request, by endpoint and method.",
+            total.db_time,
+        )
+        return "\n".join(lines) + "\n"
+
+    def _histogram(self, name, help_text, histograms):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        bounds = [_number(bound) for bound in self.buckets] + ["+Inf"]
+        for (endpoint, method), histogram in sorted(histograms.items()):
+            labels = _labels(endpoint=endpoint, method=method)
+            cumulative = 0
+            for bound, count in zip(bounds, histogram):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f"{name}_sum{{{labels}}} {histogram[-1]!r}")
+            lines.append(f"{name}_count{{{labels}}} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """Per-endpoint request metrics rendered in Prometheus text format.
+
+    Every thread records into its own shard, so the request path takes no
+    locks; `render` sums the shards when /metrics is scraped and folds the
+    shards of finished threads into a retired total.
+
+    Without METRICS_DIR the numbers are those of this process. With it,
+    every process writes its totals to a file of its own in that directory
+    every METRICS_FLUSH_INTERVAL seconds, and `render` adds up all of them,
+    so any gunicorn worker answering a scrape reports the whole server.
+    Files of processes that exited are folded into `archive.json` so their
+    counts are kept.
+
+    Each app records into its own `_Recorder` in `app.extensions`.
+    """
+
+    def __init__(self, app=None, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("METRICS_DIR", None)
+        app.config.setdefault("METRICS_FLUSH_INTERVAL", 1.0)
+
+        directory = app.config["METRICS_DIR"] or None
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        app.extensions["metrics"] = _Recorder(
+            self.buckets, directory, app.config["METRICS_FLUSH_INTERVAL"]
+        )
+
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor):
+            event.listen(Engine, "before_cursor_execute", _before_cursor)
+            event.listen(Engine, "after_cursor_execute", _after_cursor)
+
+    @staticmethod
+    def _recorder():
+        return current_app.extensions["metrics"]
+
+    def _before_request(self):
+        recorder = self._recorder()
+        recorder.start_flushing()
+        shard = recorder.shard()
+        shard.started += 1
+        shard.current_db_time = 0.0
+        g._metrics_start = time.perf_counter()
+
+    def _after_request(self, response):
+        g._metrics_status = response.status_code
+        return response
+
+    def _teardown_request(self, exc):
+        start = g.pop("_metrics_start", None)
+        if start is None:
+            return
+        elapsed = time.perf_counter() - start
+        recorder = self._recorder()
+        shard = recorder.shard()
+        db_time, shard.current_db_time = shard.current_db_time, None
+
+        endpoint = request.endpoint or "none"
+        method = request.method
+        status = g.pop("_metrics_status", 500)
+
+        key = (endpoint, method, status)
+        shard.requests[key] = shard.requests.get(key, 0) + 1
+        shard.observe(
+            shard.latency,
+            (endpoint, method),
+            bisect_left(recorder.buckets, elapsed),
+            elapsed,
+        )
+        shard.observe(
+            shard.db_time,
+            (endpoint, method),
+            bisect_left(recorder.buckets, db_time),
+            db_time,
+        )
+        shard.finished += 1
+
+    def flush(self):
+        """Write this process's totals to its file in METRICS_DIR."""
+        self._recorder().flush()
+
+    def reset(self):
+        """Drop all recorded values (used between tests)."""
+        self._recorder().reset()
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format."""
+        return self._recorder().render()
+
+
+def _read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path, data):
+    # Written aside and renamed over, so readers never see half a file.
+    temporary = f"{path}.{threading.get_ident()}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f)
+    os.replace(temporary, path)
+
+
+def _is_running(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if not has_app_context():
+        return
+    recorder = current_app.extensions.get("metrics")
+    shard = recorder.current_shard() if recorder is not None else None
+    if shard is not None and shard.current_db_time is not None:
+        shard.current_db_time += elapsed
+
+
+def _labels(**labels):
+    return ",".join(
+        f'{name}="{_escape(str(value))}"' for name, value in labels.items()
+    )
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    return repr(float(value))
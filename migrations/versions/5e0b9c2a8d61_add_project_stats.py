@@ -0,0 +1,75 @@
+"""add project stats
+
+Revision ID: 5e0b9c2a8d61
+Revises: d4a7f6b93e15
+Create Date: 2026-10-18 16:47:12.904318
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5e0b9c2a8d61'
+down_revision = 'd4a7f6b93e15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_stats',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=32), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('user_id', 'status')
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_stats_ai AFTER INSERT ON project
+        WHEN new.creator_id IS NOT NULL AND new.status IS NOT NULL
+        BEGIN
+            INSERT INTO project_stats (user_id, status, count)
+            VALUES (new.creator_id, new.status, 1)
+            ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_stats_ad AFTER DELETE ON project BEGIN
+            UPDATE project_stats SET count = count - 1
+            WHERE user_id = old.creator_id AND status = old.status;
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_stats_au AFTER UPDATE OF status, creator_id ON project
+        WHEN old.status IS NOT new.status OR old.creator_id IS NOT new.creator_id
+        BEGIN
+            UPDATE project_stats SET count = count - 1
+            WHERE user_id = old.creator_id AND status = old.status;
+            INSERT INTO project_stats (user_id, status, count)
+            SELECT new.creator_id, new.status, 1
+            WHERE new.creator_id IS NOT NULL AND new.status IS NOT NULL
+            ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+        END
+        """
+    )
+    # Count the projects that already exist.
+    op.execute(
+        """
+        INSERT INTO project_stats (user_id, status, count)
+        SELECT creator_id, status, COUNT(*) FROM project
+        WHERE creator_id IS NOT NULL AND status IS NOT NULL
+        GROUP BY creator_id, status
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS project_stats_au")
+    op.execute("DROP TRIGGER IF EXISTS project_stats_ad")
+    op.execute("DROP TRIGGER IF EXISTS project_stats_ai")
+    op.drop_table('project_stats')
@@ -0,0 +1,63 @@
+"""add project full-text index
+
+Revision ID: 8c1e5a7d2f40
+Revises: 3f9d2b7c41e8
+Create Date: 2026-10-18 10:24:37.118204
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8c1e5a7d2f40'
+down_revision = '3f9d2b7c41e8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE VIRTUAL TABLE project_fts USING fts5(
+            name, description,
+            content='project', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2'
+        )
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_fts_ai AFTER INSERT ON project BEGIN
+            INSERT INTO project_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_fts_ad AFTER DELETE ON project BEGIN
+            INSERT INTO project_fts (project_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER project_fts_au AFTER UPDATE OF name, description ON project
+        BEGIN
+            INSERT INTO project_fts (project_fts, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO project_fts (rowid, name, description)
+            VALUES (new.id, new.name, new.description);
+        END
+        """
+    )
+    # Index the projects that already exist.
+    op.execute("INSERT INTO project_fts (project_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS project_fts_au")
+    op.execute("DROP TRIGGER IF EXISTS project_fts_ad")
+    op.execute("DROP TRIGGER IF EXISTS project_fts_ai")
+    op.execute("DROP TABLE IF EXISTS project_fts")
@@ -0,0 +1,42 @@
+"""unique project members
+
+Revision ID: d4a7f6b93e15
+Revises: 8c1e5a7d2f40
+Create Date: 2026-10-18 14:02:51.630457
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4a7f6b93e15'
+down_revision = '8c1e5a7d2f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the earliest row of any duplicated membership so the unique
+    # indexes can be built.
+    op.execute(
+        """
+        DELETE FROM project_members
+        WHERE id NOT IN (
+            SELECT MIN(id) FROM project_members GROUP BY project_id, user_id
+        )
+        """
+    )
+    with op.batch_alter_table('project_members', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_project_members_user_id'))
+        batch_op.drop_index(batch_op.f('ix_project_members_project_id'))
+        batch_op.create_index('ix_project_members_project_id_user_id', ['project_id', 'user_id'], unique=True)
+        batch_op.create_index('ix_project_members_user_id_project_id', ['user_id', 'project_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('project_members', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_members_user_id_project_id')
+        batch_op.drop_index('ix_project_members_project_id_user_id')
+        batch_op.create_index(batch_op.f('ix_project_members_project_id'), ['project_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_members_user_id'), ['user_id'], unique=False)
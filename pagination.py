@@ -0,0 +1,87 @@
+import base64
+import binascii
+import json
+
+from flask import current_app, request, url_for
+
+
+class PaginationError(ValueError):
+    """Raised when the client sends a page size or cursor we cannot use."""
+
+
+def encode_cursor(**key):
+    """Encode a keyset position as an opaque, URL-safe token."""
+    raw = json.dumps(key, separators=(",", ":"), sort_keys=True).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token):
+    """Decode a token produced by `encode_cursor` back into its key dict."""
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise PaginationError("Invalid cursor")
+
+    if not isinstance(key, dict):
+        raise PaginationError("Invalid cursor")
+    return key
+
+
+def page_args():
+    """Read `limit` and `after` from the query string.
+
+    `limit` defaults to PAGE_SIZE and may never exceed MAX_PAGE_SIZE, so a
+    single page costs the same no matter how many rows sit behind it.
+    """
+    default_size = current_app.config["PAGE_SIZE"]
+    max_size = current_app.config["MAX_PAGE_SIZE"]
+
+    raw_limit = request.args.get("limit")
+    if raw_limit is None:
+        limit = default_size
+    else:
+        try:
+            limit = int(raw_limit)
+        except ValueError:
+            raise PaginationError("limit must be an integer")
+        if limit < 1:
+            raise PaginationError("limit must be a positive integer")
+        limit = min(limit, max_size)
+
+    after = request.args.get("after")
+    return limit, decode_cursor(after) if after else None
+
+
+def cursor_id(after):
+    """Return the integer `id` stored in a decoded cursor, or None."""
+    if after is None:
+        return None
+    value = after.get("id")
+    if not isinstance(value, int):
+        raise PaginationError("Invalid cursor")
+    return value
+
+
+def cursor_offset(after):
+    """Return the row offset stored in a decoded cursor, or 0."""
+    if after is None:
+        return 0
+    value = after.get("offset")
+    if not isinstance(value, int) or value < 0:
+        raise PaginationError("Invalid cursor")
+    return value
+
+
+def set_next_cursor(response, next_cursor):
+    """Advertise the next page on `response` via `X-Next-Cursor` and `Link`."""
+    if next_cursor is None:
+        return response
+
+    args = request.args.to_dict()
+    args["after"] = next_cursor
+    next_url = url_for(request.endpoint, **(request.view_args or {}), **args)
+
+    response.headers["X-Next-Cursor"] = next_cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response
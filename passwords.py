@@ -0,0 +1,149 @@
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import bcrypt
+from flask import current_app
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+def hash_password(method, password):
+    """Hash `password` with a policy method string such as "bcrypt:12"."""
+    algorithm, _, cost = method.partition(":")
+    if algorithm == "bcrypt":
+        salt = bcrypt.gensalt(rounds=int(cost or 12))
+        return bcrypt.hashpw(password.encode(), salt).decode()
+    return generate_password_hash(password, method=method)
+
+
+def verify_password(password_hash, password):
+    """Check `password` against a bcrypt or werkzeug hash."""
+    if password_hash.startswith("$2"):
+        return bcrypt.checkpw(password.encode(), password_hash.encode())
+    return check_password_hash(password_hash, password)
+
+
+class HashPolicy:
+    """The algorithm and cost used for new password hashes.
+
+    `method` is "bcrypt:<rounds>" or any werkzeug method string, e.g.
+    "scrypt:32768:8:1" or "pbkdf2:sha256:600000". Stored hashes made with
+    anything else are considered outdated.
+    """
+
+    def __init__(self, method):
+        self.method = method
+        self._prefix = None
+
+    def __repr__(self):
+        return f"<HashPolicy {self.method}>"
+
+    @property
+    def prefix(self):
+        """The part of a hash that identifies its algorithm and cost."""
+        if self._prefix is None:
+            # Hash once so defaults werkzeug fills in ("scrypt" ->
+            # "scrypt:32768:8:1") compare equal to what it stores.
+            self._prefix = self._prefix_of(hash_password(self.method, ""))
+        return self._prefix
+
+    @staticmethod
+    def _prefix_of(password_hash):
+        if password_hash.startswith("$2"):
+            return password_hash[:7]
+        return password_hash.partition("$")[0]
+
+    def hash(self, password):
+        return hash_password(self.method, password)
+
+    def needs_rehash(self, password_hash):
+        return self._prefix_of(password_hash) != self.prefix
+
+
+class PasswordPoolFull(Exception):
+    """Raised when every hashing slot is taken and the caller should back off."""
+
+    def __init__(self, retry_after):
+        super().__init__("Password hashing queue is full")
+        self.retry_after = retry_after
+
+
+class _PoolState:
+    """One app's hashing policy, slots and (lazily started) process pool."""
+
+    def __init__(self, policy, workers, queue_size, retry_after):
+        self.policy = policy
+        self.workers = workers
+        self.retry_after = retry_after
+        self.slots = threading.BoundedSemaphore(max(workers, 1) + queue_size)
+        self.executor = None
+        self.lock = threading.Lock()
+
+    def get_executor(self):
+        # Started on first use so prefork servers don't inherit the workers.
+        if self.executor is None:
+            with self.lock:
+                if self.executor is None:
+                    self.executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                    atexit.register(self.executor.shutdown, cancel_futures=True)
+        return self.executor
+
+
+class PasswordPool:
+    """Run password hashing and verification on a bounded process pool.
+
+    Password KDFs are deliberately slow, so they run in worker processes
+    instead of on the request thread. At most PASSWORD_POOL_WORKERS jobs run
+    at once and PASSWORD_POOL_QUEUE_SIZE more may wait; beyond that
+    `PasswordPoolFull` is raised so the request can fail fast.
+    PASSWORD_POOL_WORKERS = 0 hashes inline, still bounded by the queue.
+    New hashes follow the PASSWORD_HASH_METHOD `HashPolicy`. Each app has a
+    pool of its own in `app.extensions`.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("PASSWORD_HASH_METHOD", "scrypt:32768:8:1")
+        app.config.setdefault("PASSWORD_POOL_WORKERS", os.cpu_count() or 1)
+        app.config.setdefault("PASSWORD_POOL_QUEUE_SIZE", 32)
+        app.config.setdefault("PASSWORD_POOL_RETRY_AFTER", 1)
+
+        app.extensions["password_pool"] = _PoolState(
+            HashPolicy(app.config["PASSWORD_HASH_METHOD"]),
+            app.config["PASSWORD_POOL_WORKERS"],
+            app.config["PASSWORD_POOL_QUEUE_SIZE"],
+            app.config["PASSWORD_POOL_RETRY_AFTER"],
+        )
+
+    @staticmethod
+    def _state():
+        return current_app.extensions["password_pool"]
+
+    def _run(self, fn, *args):
+        state = self._state()
+        if not state.slots.acquire(blocking=False):
+            raise PasswordPoolFull(state.retry_after)
+
+        try:
+            if not state.workers:
+                return fn(*args)
+            return state.get_executor().submit(fn, *args).result()
+        finally:
+            state.slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, self._state().policy.method, password)
+
+    def verify(self, password_hash, password):
+        return self._run(verify_password, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        return self._state().policy.needs_rehash(password_hash)
@@ -1,5 +1,6 @@
 from .routes import projects
+from . import commands  # noqa: F401  registers `flask projects ...` commands
+from . import jobs  # noqa: F401  registers the projects.* job handlers
 
 
 __all__ = ["projects"]
-
@@ -0,0 +1,117 @@
+from datetime import datetime, timezone
+
+from flask import current_app
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from cache import CachedResponse
+from conditional import not_modified
+from extensions import response_cache
+from projects.models import Project, ProjectMember
+from users.models import User
+
+
+def _fields_key(fields):
+    return ",".join(sorted(fields)) if fields else "*"
+
+
+def list_key(user_id, status, limit, after_id, fields):
+    fields_key = _fields_key(fields)
+    return f"projects:{user_id}:{status or ''}:{limit}:{after_id}:{fields_key}"
+
+
+def detail_key(user_id, project_id, fields):
+    return f"project:{user_id}:{project_id}:{_fields_key(fields)}"
+
+
+def user_projects_tag(user_id):
+    """Tag of every cached response embedding projects created by `user_id`."""
+    return f"user-projects:{user_id}"
+
+
+def project_tag(project_id):
+    return f"project:{project_id}"
+
+
+def user_tag(user_id):
+    """Tag of every cached response embedding `user_id`'s username or email."""
+    return f"user:{user_id}"
+
+
+def store(key, response, etag, tags):
+    """Cache a rendered 200 `response` under `key`."""
+    headers = {
+        name: response.headers[name]
+        for name in ("X-Next-Cursor", "Link")
+        if name in response.headers
+    }
+    response_cache.set(key, CachedResponse(response.get_data(), etag, headers), tags)
+
+
+def respond(entry):
+    """Serve a cached entry, honouring If-None-Match."""
+    response = not_modified(entry.etag)
+    if response is None:
+        response = current_app.response_class(
+            entry.body,
+            mimetype=current_app.json.mimetype,
+            headers=entry.headers,
+        )
+        response.set_etag(entry.etag)
+    return response
+
+
+def invalidate_project(project_id, creator_id):
+    """Drop cached reads that include `project_id`, including its listings."""
+    response_cache.invalidate(project_tag(project_id), user_projects_tag(creator_id))
+
+
+def invalidate_user_projects(user_id):
+    response_cache.invalidate(user_projects_tag(user_id))
+
+
+def _invalidate_on_commit(session, *tags):
+    # Invalidating during the flush would let a concurrent read re-cache the
+    # old rows before this transaction commits.
+    session.info.setdefault("invalidate_tags", set()).update(tags)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    if tags := session.info.pop("invalidate_tags", None):
+        response_cache.invalidate(*tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("invalidate_tags", None)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_user(_mapper, connection, target):
+    state = inspect(target)
+    if not any(
+        state.attrs[name].history.has_changes() for name in ("username", "email")
+    ):
+        return
+    # Project ETags cover the viewer's details and `updated_at`, not the
+    # members', so move `updated_at` on for the projects this user is in.
+    connection.execute(
+        update(Project)
+        .where(
+            Project.id.in_(
+                select(ProjectMember.project_id).where(
+                    ProjectMember.user_id == target.id
+                )
+            )
+        )
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+    _invalidate_on_commit(state.session, user_tag(target.id))
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(_mapper, _connection, target):
+    _invalidate_on_commit(
+        inspect(target).session, user_tag(target.id), user_projects_tag(target.id)
+    )
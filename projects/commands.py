@@ -0,0 +1,52 @@
+import click
+from flask import current_app
+from sqlalchemy import func, select
+
+from extensions import db
+from projects import queries
+from projects.export import MIMETYPES, export_chunks
+from projects.models import ProjectStat
+from projects.routes import projects
+
+
+@projects.cli.command("rebuild-stats")
+def rebuild_stats_command():
+    """Recount the per-user project statistics from the project table.
+
+    The counters are kept up to date by triggers; this repairs them after
+    writes that bypassed the triggers, such as a restore from a dump.
+    """
+    for statement in queries.rebuild_stats():
+        db.session.execute(statement)
+    db.session.commit()
+
+    counters = db.session.scalar(select(func.count()).select_from(ProjectStat))
+    click.echo(f"Rebuilt {counters} project counters")
+
+
+@projects.cli.command("export")
+@click.argument("destination", type=click.File("w", encoding="utf-8"), default="-")
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(sorted(MIMETYPES)),
+    help="Output format. Defaults to the file extension.",
+)
+@click.option("--user", "user_id", type=int, help="Only export this user's projects.")
+@click.option(
+    "--batch-size", type=int, help="Rows per batch. Defaults to EXPORT_BATCH_SIZE."
+)
+def export_projects_command(destination, fmt, user_id, batch_size):
+    """Stream every project, or one user's, to DESTINATION as CSV or NDJSON.
+
+    DESTINATION defaults to stdout. Rows are read and written `batch_size`
+    at a time, so memory use does not grow with the number of projects.
+    """
+    if fmt is None:
+        fmt = "csv" if destination.name.endswith(".csv") else "ndjson"
+    if batch_size is None:
+        batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+
+    result = db.session.execute(queries.export_rows(batch_size, user_id))
+    for chunk in export_chunks(result, fmt):
+        destination.write(chunk)
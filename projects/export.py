@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+
+# Flat project columns, in CSV column order. Members are not exported.
+EXPORT_COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "status",
+    "created_at",
+    "updated_at",
+    "creator_id",
+)
+
+MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+
+def _value(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _ndjson(rows):
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, map(_value, row))), separators=(",", ":"))
+        + "\n"
+        for row in rows
+    )
+
+
+def _csv(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_value(value) for value in row] for row in rows)
+    return buffer.getvalue()
+
+
+def export_chunks(result, fmt):
+    """Encode a `yield_per` result as text chunks, one per fetched batch.
+
+    Only one batch of rows is held at a time, so memory stays flat however
+    many rows `result` has. CSV output starts with a header row.
+    """
+    encode = _csv if fmt == "csv" else _ndjson
+    if fmt == "csv":
+        yield encode([EXPORT_COLUMNS])
+    for partition in result.partitions():
+        yield encode(partition)
@@ -0,0 +1,42 @@
+from flask_marshmallow import Schema
+from marshmallow.fields import Integer
+from sqlalchemy import delete
+
+from extensions import db
+from jobs.runner import JobFailed, job_runner
+from projects import caching, queries
+from projects.models import Project, ProjectMember
+
+
+class ProjectJobSchema(Schema):
+    project_id = Integer(required=True, strict=True)
+
+
+@job_runner.handler(
+    "projects.delete", concurrency=2, max_attempts=5, schema=ProjectJobSchema()
+)
+def delete_project_job(payload, user_id):
+    """Delete a project and all of its memberships with set-based statements."""
+    project_id = payload["project_id"]
+    project = db.session.scalars(queries.project_by_id(project_id)).first()
+    if project is None:
+        return {"deleted": False}
+    if user_id is not None and project.creator_id != user_id:
+        raise JobFailed("You are not authorized to delete this project")
+
+    members = db.session.execute(
+        delete(ProjectMember).where(ProjectMember.project_id == project_id)
+    ).rowcount
+    db.session.execute(delete(Project).where(Project.id == project_id))
+    db.session.commit()
+    caching.invalidate_project(project_id, project.creator_id)
+    return {"deleted": True, "members_removed": members}
+
+
+@job_runner.handler("projects.rebuild_stats", schema=Schema())
+def rebuild_stats_job(payload, user_id):
+    """Recount the project statistics of `user_id`, or of everyone."""
+    for statement in queries.rebuild_stats(user_id):
+        db.session.execute(statement)
+    db.session.commit()
+    return {"user_id": user_id}
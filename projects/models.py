@@ -1,31 +1,59 @@
 from extensions import db
 from datetime import datetime, timezone
 
+from sqlalchemy import DDL, event
+
+
+def _utcnow():
+    return datetime.now(timezone.utc)
+
 
 class ProjectMember(db.Model):
     __tablename__ = "project_members"
+    # A user belongs to a project at most once. Each index leads with the
+    # column one side of the relationship looks rows up by: the members of
+    # a project, and the projects a user belongs to.
+    __table_args__ = (
+        db.Index(
+            "ix_project_members_project_id_user_id",
+            "project_id",
+            "user_id",
+            unique=True,
+        ),
+        db.Index(
+            "ix_project_members_user_id_project_id",
+            "user_id",
+            "project_id",
+            unique=True,
+        ),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey("project.id"), index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), index=True)
-    joined_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
+    project_id = db.Column(db.Integer, db.ForeignKey("project.id"))
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    joined_at = db.Column(db.DateTime, default=_utcnow)
 
 
 class Project(db.Model):
+    __table_args__ = (
+        db.Index("ix_project_creator_id_status_id", "creator_id", "status", "id"),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(128), index=True)
     description = db.Column(db.Text)
     status = db.Column(db.String(32), default="Active")
     created_at = db.Column(
         db.DateTime,
-        default=datetime.now(timezone.utc),
+        default=_utcnow,
     )
     updated_at = db.Column(
         db.DateTime,
-        default=datetime.now(timezone.utc),
-        onupdate=datetime.now(timezone.utc),
+        default=_utcnow,
+        onupdate=_utcnow,
     )
 
-    creator_id = db.Column(db.Integer, db.ForeignKey("user.id"))
+    creator_id = db.Column(db.Integer, db.ForeignKey("user.id"), index=True)
     creator = db.relationship(
         "User",
         backref=db.backref("created_projects", lazy="dynamic"),
@@ -34,8 +62,110 @@ class Project(db.Model):
     members = db.relationship(
         "User",
         secondary="project_members",
+        order_by="ProjectMember.id",
         backref=db.backref("projects", lazy="dynamic"),
     )
 
     def __repr__(self):
         return f"<Project {self.name}>"
+
+
+class ProjectStat(db.Model):
+    # How many projects `user_id` has created with each `status`.
+    __tablename__ = "project_stats"
+    user_id = db.Column(db.Integer, db.ForeignKey("user.id"), primary_key=True)
+    status = db.Column(db.String(32), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+
+# Full-text index over name and description for GET /projects/search. It is
+# an external-content FTS5 table (it stores only the index, reading the text
+# back from `project`) kept in sync by triggers, so Core bulk inserts and
+# raw SQL are indexed as well as ORM writes. Status-only updates leave the
+# index alone. Migration 8c1e5a7d2f40 creates the same objects.
+PROJECT_FTS_DDL = (
+    """
+    CREATE VIRTUAL TABLE project_fts USING fts5(
+        name, description,
+        content='project', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER project_fts_ai AFTER INSERT ON project BEGIN
+        INSERT INTO project_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+    """
+    CREATE TRIGGER project_fts_ad AFTER DELETE ON project BEGIN
+        INSERT INTO project_fts (project_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+    END
+    """,
+    """
+    CREATE TRIGGER project_fts_au AFTER UPDATE OF name, description ON project
+    BEGIN
+        INSERT INTO project_fts (project_fts, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO project_fts (rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+    END
+    """,
+)
+
+for _statement in PROJECT_FTS_DDL:
+    event.listen(
+        Project.__table__,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+event.listen(
+    Project.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS project_fts").execute_if(dialect="sqlite"),
+)
+
+
+# Keep project_stats in step with project from inside the writing
+# statement, so every create, status change and delete (ORM, Core bulk
+# insert or raw SQL) moves the counters in the same transaction. Rows
+# without a creator or status are not counted. Migration 5e0b9c2a8d61
+# creates the same triggers; `flask projects rebuild-stats` recounts.
+PROJECT_STATS_DDL = (
+    """
+    CREATE TRIGGER project_stats_ai AFTER INSERT ON project
+    WHEN new.creator_id IS NOT NULL AND new.status IS NOT NULL
+    BEGIN
+        INSERT INTO project_stats (user_id, status, count)
+        VALUES (new.creator_id, new.status, 1)
+        ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+    END
+    """,
+    """
+    CREATE TRIGGER project_stats_ad AFTER DELETE ON project BEGIN
+        UPDATE project_stats SET count = count - 1
+        WHERE user_id = old.creator_id AND status = old.status;
+    END
+    """,
+    """
+    CREATE TRIGGER project_stats_au AFTER UPDATE OF status, creator_id ON project
+    WHEN old.status IS NOT new.status OR old.creator_id IS NOT new.creator_id
+    BEGIN
+        UPDATE project_stats SET count = count - 1
+        WHERE user_id = old.creator_id AND status = old.status;
+        INSERT INTO project_stats (user_id, status, count)
+        SELECT new.creator_id, new.status, 1
+        WHERE new.creator_id IS NOT NULL AND new.status IS NOT NULL
+        ON CONFLICT (user_id, status) DO UPDATE SET count = count + 1;
+    END
+    """,
+)
+
+# The triggers touch both tables, so create them once all tables exist.
+for _statement in PROJECT_STATS_DDL:
+    event.listen(
+        db.metadata,
+        "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
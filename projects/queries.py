@@ -0,0 +1,297 @@
+from sqlalchemy import (
+    case,
+    delete,
+    exists,
+    func,
+    literal,
+    literal_column,
+    or_,
+    select,
+    table,
+    true,
+    union_all,
+)
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import joinedload, load_only, selectinload
+
+from projects.export import EXPORT_COLUMNS
+from projects.models import Project, ProjectMember, ProjectStat
+from query_audit import audited
+from users.models import User
+
+_USER_COLUMNS = (User.id, User.username, User.email)
+
+# The FTS5 index created alongside `project`; see projects/models.py.
+_project_fts = table("project_fts")
+
+# Searches by users who created and joined at most this many projects each
+# check matches against a list of their project ids; see search_project_rows.
+_SEARCH_ID_LIST_MAX = 10_000
+
+# How to load each relationship ProjectSchema nests: the creator is one row
+# per project and rides along in the same SELECT, members are fetched for
+# the whole page with a single IN query.
+_EAGER_LOADS = {
+    "creator": lambda: joinedload(Project.creator).load_only(*_USER_COLUMNS),
+    "members": lambda: selectinload(Project.members).load_only(*_USER_COLUMNS),
+}
+
+
+# Columns every query needs whatever the client asked for: the keyset
+# cursor is built from `id`, ownership checks read `creator_id` and ETags
+# are derived from `updated_at`.
+_KEY_COLUMNS = ("id", "creator_id", "updated_at")
+
+
+def loader_options(fields=None, members=True):
+    """Loader options fetching only what serializing `fields` needs.
+
+    `None` means every field ProjectSchema dumps. Otherwise columns outside
+    `fields` are left unloaded and unrequested relationships are skipped.
+    With `members=False` the members are left to load lazily on access.
+    """
+    options = [
+        loader()
+        for name, loader in _EAGER_LOADS.items()
+        if (fields is None or name in fields) and (members or name != "members")
+    ]
+    if fields is not None:
+        columns = Project.__table__.columns.keys()
+        names = set(_KEY_COLUMNS) | {name for name in fields if name in columns}
+        options.append(load_only(*(getattr(Project, name) for name in names)))
+    return options
+
+
+@audited(
+    {"user_id": 1, "limit": 50},
+    {"user_id": 1, "limit": 50, "after_id": 100},
+    {"user_id": 1, "limit": 50, "status": "Active"},
+    {"user_id": 1, "limit": 50, "status": "Active", "after_id": 100},
+    {"user_id": 1, "limit": 50, "fields": frozenset({"id", "name"})},
+)
+def user_project_rows(user_id, limit, status=None, after_id=None, fields=None):
+    """Projects created by `user_id`, one keyset page ordered by id.
+
+    Returns plain Core rows for the ORM-free read path. Selects only the
+    Project columns among `fields`, plus the creator's username and email
+    (as `creator_username`/`creator_email`) when `creator` is requested;
+    the creator's id is `creator_id`. Members come from `member_rows`.
+    """
+    query = _project_row_select(Project.__table__, fields)
+    return _user_projects_page(query, user_id, limit, status, after_id)
+
+
+@audited(
+    {"user_id": 1, "match": '"roadmap"*', "limit": 50},
+    {"user_id": 1, "match": '"q3" "roadmap"*', "limit": 50, "offset": 100},
+    {"user_id": 1, "match": '"roadmap"*', "limit": 50, "fields": frozenset({"id"})},
+)
+def search_project_rows(user_id, match, limit, offset=0, fields=None):
+    """Projects `user_id` created or is a member of whose text matches `match`.
+
+    `match` is an FTS5 expression (see `search.match_expression`). Rows are
+    shaped like `user_project_rows` and ordered by bm25 relevance, with a
+    hit in the name worth ten times one in the description. Ranking needs
+    every match anyway, so pages are plain offsets into that order.
+
+    FTS5 walks every match in the instance, so what each one costs decides
+    the query's cost. For a user with few projects, each match is looked up
+    in a list of their project ids, and only the matches they can see are
+    joined to `project` and ranked. For a user with more projects than
+    _SEARCH_ID_LIST_MAX, building that list would cost more than it saves,
+    so visibility is checked on the joined row instead. SQLite picks the
+    branch once per query.
+    """
+    created = select(Project.id).where(Project.creator_id == user_id)
+    joined = select(ProjectMember.project_id).where(ProjectMember.user_id == user_id)
+    few = (
+        created.limit(1).offset(_SEARCH_ID_LIST_MAX).scalar_subquery().is_(None)
+        & joined.limit(1).offset(_SEARCH_ID_LIST_MAX).scalar_subquery().is_(None)
+    )
+    # The unary + stops SQLite from handing the IN to FTS5, which would
+    # rerun the MATCH, and its ranking statistics, once per id.
+    listed = literal_column("+project_fts.rowid").in_(union_all(created, joined))
+    visible = or_(
+        Project.creator_id == user_id,
+        exists().where(
+            (ProjectMember.project_id == Project.id)
+            & (ProjectMember.user_id == user_id)
+        ),
+    )
+    matches = _project_fts.join(
+        Project.__table__, Project.id == literal_column("project_fts.rowid")
+    )
+    return (
+        _project_row_select(matches, fields)
+        .where(literal_column("project_fts").op("MATCH")(match))
+        # Two terms, so the list is checked before the join to `project`.
+        .where(case((few, listed), else_=true()))
+        .where(case((few, true()), else_=visible))
+        .order_by(func.bm25(literal_column("project_fts"), 10.0, 1.0), Project.id)
+        .limit(limit)
+        .offset(offset)
+    )
+
+
+@audited(
+    {"user_id": 1, "limit": 50},
+    {"user_id": 1, "limit": 50, "after_id": 100},
+    {"user_id": 1, "limit": 50, "fields": frozenset({"id", "name"})},
+)
+def joined_project_rows(user_id, limit, after_id=None, fields=None):
+    """Projects `user_id` is a member of, one keyset page ordered by id.
+
+    Rows are shaped like `user_project_rows`. The page is read in order
+    from the (user_id, project_id) index of project_members.
+    """
+    memberships = Project.__table__.join(
+        ProjectMember, ProjectMember.project_id == Project.id
+    )
+    query = _project_row_select(memberships, fields).where(
+        ProjectMember.user_id == user_id
+    )
+    if after_id is not None:
+        query = query.where(ProjectMember.project_id > after_id)
+    return query.order_by(ProjectMember.project_id).limit(limit)
+
+
+@audited({"project_id": 1, "user_ids": [2, 3], "joined_at": None})
+def add_members(project_id, user_ids, joined_at):
+    """INSERT every missing membership of `user_ids` in `project_id`.
+
+    A single INSERT ... SELECT: ids without a user are skipped by the
+    SELECT and existing members by ON CONFLICT. Returns the user ids that
+    were added.
+    """
+    users = select(
+        literal(project_id), User.id, literal(joined_at, ProjectMember.joined_at.type)
+    ).where(User.id.in_(user_ids))
+    return (
+        insert(ProjectMember)
+        .from_select(["project_id", "user_id", "joined_at"], users)
+        .on_conflict_do_nothing()
+        .returning(ProjectMember.user_id)
+    )
+
+
+@audited({"project_id": 1, "user_ids": [2, 3]})
+def remove_members(project_id, user_ids):
+    """DELETE the memberships of `user_ids` in `project_id`.
+
+    Returns the user ids that were removed.
+    """
+    return (
+        delete(ProjectMember)
+        .where(
+            (ProjectMember.project_id == project_id)
+            & ProjectMember.user_id.in_(user_ids)
+        )
+        .returning(ProjectMember.user_id)
+    )
+
+
+@audited({"user_id": 1})
+def user_stats(user_id):
+    """(status, count) of every status `user_id` has projects in.
+
+    Reads the counters maintained by triggers on `project`, one primary
+    key range however many projects the user has.
+    """
+    return (
+        select(ProjectStat.status, ProjectStat.count)
+        .where((ProjectStat.user_id == user_id) & (ProjectStat.count > 0))
+        .order_by(ProjectStat.status)
+    )
+
+
+def rebuild_stats(user_id=None):
+    """Statements that recount `project_stats` from `project`, in order.
+
+    Only `user_id`'s counters are rebuilt when given, otherwise everyone's.
+    """
+    counts = (
+        select(Project.creator_id, Project.status, func.count())
+        .where(Project.creator_id.is_not(None) & Project.status.is_not(None))
+        .group_by(Project.creator_id, Project.status)
+    )
+    stale = delete(ProjectStat)
+    if user_id is not None:
+        counts = counts.where(Project.creator_id == user_id)
+        stale = stale.where(ProjectStat.user_id == user_id)
+    return (
+        stale,
+        insert(ProjectStat).from_select(["user_id", "status", "count"], counts),
+    )
+
+
+@audited({"user_id": 1, "batch_size": 1000})
+def export_rows(batch_size, user_id=None):
+    """Every project of `user_id`, or of everyone when None, ordered by id.
+
+    The columns are `export.EXPORT_COLUMNS`. Rows are streamed from the
+    cursor `batch_size` at a time instead of being fetched up front.
+    """
+    query = select(*(getattr(Project, name) for name in EXPORT_COLUMNS))
+    if user_id is not None:
+        query = query.where(Project.creator_id == user_id)
+    return query.order_by(Project.id).execution_options(yield_per=batch_size)
+
+
+def _project_row_select(source, fields):
+    """SELECT the row columns of `user_project_rows` from `source`."""
+    query = select(
+        *(
+            column
+            for column in Project.__table__.columns
+            if fields is None or column.key in fields or column.key in _KEY_COLUMNS
+        )
+    )
+    if fields is None or "creator" in fields:
+        source = source.outerjoin(User, User.id == Project.creator_id)
+        query = query.add_columns(
+            User.username.label("creator_username"),
+            User.email.label("creator_email"),
+        )
+    return query.select_from(source)
+
+
+def _user_projects_page(query, user_id, limit, status, after_id):
+    query = query.where(Project.creator_id == user_id)
+
+    if status:
+        query = query.where(Project.status == status)
+    if after_id is not None:
+        query = query.where(Project.id > after_id)
+
+    return query.order_by(Project.id).limit(limit)
+
+
+@audited({"project_ids": [1, 2, 3]})
+def member_rows(project_ids):
+    """(project_id, id, username, email) of every member of `project_ids`."""
+    return (
+        select(ProjectMember.project_id, *_USER_COLUMNS)
+        .join(User, User.id == ProjectMember.user_id)
+        .where(ProjectMember.project_id.in_(project_ids))
+        .order_by(ProjectMember.project_id, ProjectMember.id)
+    )
+
+
+@audited({"user_id": 1, "project_id": 1})
+def user_project(user_id, project_id, fields=None, members=True):
+    """A single project, only if it was created by `user_id`.
+
+    Pass `members=False` to decide on a conditional request from this one
+    SELECT; the members are then only queried if they are serialized.
+    """
+    return (
+        select(Project)
+        .where((Project.id == project_id) & (Project.creator_id == user_id))
+        .options(*loader_options(fields, members))
+    )
+
+
+@audited({"project_id": 1})
+def project_by_id(project_id):
+    """A single project regardless of owner."""
+    return select(Project).where(Project.id == project_id)
@@ -1,17 +1,40 @@
 import logging
-from flask import Blueprint, jsonify, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from datetime import datetime, timezone
+from flask import Blueprint, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import current_user, jwt_required
 from marshmallow.exceptions import ValidationError
 from marshmallow import INCLUDE
-from extensions import db
-from projects.schemas import ProjectSchema
+from sqlalchemy import insert
+from extensions import db, response_cache
+from conditional import make_etag, not_modified
+from fieldsets import FieldsetError, requested_fields, schema_for
+from serializers import compile_serializer
+from validation import compile_validator
+from pagination import (
+    PaginationError,
+    cursor_id,
+    cursor_offset,
+    encode_cursor,
+    page_args,
+    set_next_cursor,
+)
+from jobs.routes import accepted
+from jobs.runner import job_runner
+from projects import caching, queries
+from projects.export import MIMETYPES, export_chunks
+from projects.schemas import ProjectMembersSchema, ProjectSchema
 from projects.models import Project
-from users.models import User
+from projects.search import SearchError, match_expression
 
 _logger = logging.getLogger(__name__)
 projects = Blueprint("projects", __name__)
 project_schema = ProjectSchema()
 projects_schema = ProjectSchema(many=True)
+members_schema = ProjectMembersSchema()
+_create_validator = compile_validator(project_schema)
+_update_validator = compile_validator(
+    project_schema, partial=True, unknown=INCLUDE
+)
 
 
 @projects.route("/projects", methods=["POST"])
@@ -19,13 +42,15 @@ projects_schema = ProjectSchema(many=True)
 def create_project():
     """Create a new project"""
     try:
-        data = project_schema.load(request.json)
+        data = _create_validator.load(request.json)
     except ValidationError as err:
-        msg = f"[API] [Create Project] Validation error during project creation: {err.messages}"
-        _logger.error(msg)
+        _logger.error(
+            "[API] [Create Project] Validation error during project creation: %s",
+            err.messages,
+        )
         return jsonify(err.messages), 400
 
-    current_user_id = get_jwt_identity()
+    current_user_id = current_user.id
     project = Project(
         name=data["name"],
         description=data["description"],
@@ -33,84 +58,448 @@ def create_project():
     )
     db.session.add(project)
     db.session.commit()
+    caching.invalidate_user_projects(current_user_id)
 
     _logger.info(
-        f"[API] [Create Project] New project created: {project.name} by user: {current_user_id}"
+        "[API] [Create Project] New project created: %s by user: %s",
+        project.name,
+        current_user_id,
+        extra={"event": "project.create"},
     )
     return project_schema.jsonify(project), 201
 
 
+@projects.route("/projects/batch", methods=["POST"])
+@jwt_required()
+def create_projects_batch():
+    """Create many projects in one transaction, reporting a result per item"""
+    items = request.json
+    if not isinstance(items, list) or not items:
+        _logger.error("[API] [Batch Create Projects] Expected a non-empty list")
+        return jsonify({"error": "Expected a non-empty list of projects"}), 400
+
+    max_size = current_app.config["PROJECTS_BATCH_MAX_SIZE"]
+    if len(items) > max_size:
+        _logger.error(
+            "[API] [Batch Create Projects] Batch of %s exceeds %s",
+            len(items),
+            max_size,
+        )
+        return jsonify({"error": f"At most {max_size} projects per batch"}), 413
+
+    try:
+        loaded = projects_schema.load(items)
+        errors = {}
+    except ValidationError as err:
+        loaded = err.valid_data
+        errors = err.messages
+
+    current_user_id = current_user.id
+    valid_indexes = [i for i in range(len(items)) if i not in errors]
+    rows = [
+        {
+            "name": loaded[i]["name"],
+            "description": loaded[i].get("description"),
+            "creator_id": current_user_id,
+        }
+        for i in valid_indexes
+    ]
+
+    ids = []
+    if rows:
+        # sort_by_parameter_order has no sentinel to use on SQLite and falls
+        # back to one INSERT per row. Project.id is a rowid alias without
+        # AUTOINCREMENT, so SQLite gives each row max(rowid) + 1 in VALUES
+        # order, and the batched INSERTs run in order inside one write
+        # transaction. The sorted ids therefore line up with `rows`; the
+        # assumption is pinned by test_create_projects_batch_keeps_input_order.
+        ids = sorted(
+            db.session.scalars(insert(Project).returning(Project.id), rows).all()
+        )
+        db.session.commit()
+        caching.invalidate_user_projects(current_user_id)
+
+    results = [
+        {"index": i, "status": 400, "errors": messages}
+        for i, messages in errors.items()
+    ]
+    results.extend(
+        {"index": i, "status": 201, "id": project_id}
+        for i, project_id in zip(valid_indexes, ids)
+    )
+    results.sort(key=lambda result: result["index"])
+
+    _logger.info(
+        "[API] [Batch Create Projects] Created %s projects, rejected %s for user: %s",
+        len(ids),
+        len(errors),
+        current_user_id,
+        extra={"event": "project.batch_create"},
+    )
+    if not ids:
+        status_code = 400
+    elif errors:
+        status_code = 207
+    else:
+        status_code = 201
+    body = {"created": len(ids), "failed": len(errors), "results": results}
+    return jsonify(body), status_code
+
+
 @projects.route("/projects", methods=["GET"])
 @jwt_required()
 def get_projects():
-    """Get all projects for the current user"""
-    current_user_id = get_jwt_identity()
-    user = db.session.get(User, current_user_id)
+    """Get a page of projects for the current user, ordered by id"""
+    current_user_id = current_user.id
 
-    if not user:
-        _logger.warning(f"[API] [Get Projects] User not found: {current_user_id}")
-        return jsonify({"error": "User not found"}), 404
+    try:
+        limit, after = page_args()
+        after_id = cursor_id(after)
+        fields = requested_fields(project_schema)
+    except (PaginationError, FieldsetError) as err:
+        _logger.warning("[API] [Get Projects] Invalid query arguments: %s", err)
+        return jsonify({"error": str(err)}), 400
 
     status_filter = request.args.get("status")
-    query = user.created_projects
+    cache_key = caching.list_key(
+        current_user_id, status_filter, limit, after_id, fields
+    )
+    if cached := response_cache.get(cache_key):
+        _logger.info(
+            "[API] [Get Projects] Cache hit for user: %s",
+            current_user_id,
+            extra={"event": "project.list.cached"},
+        )
+        return caching.respond(cached)
+
+    # Fetch one extra row to learn whether another page exists.
+    user_projects = _project_rows(
+        current_user_id, limit + 1, status_filter, after_id, fields
+    )
+
+    etag = make_etag(
+        "projects",
+        current_user.username,
+        current_user.email,
+        status_filter,
+        limit,
+        after_id,
+        sorted(fields) if fields else None,
+        [(item["id"], item["updated_at"]) for item in user_projects],
+    )
+    if response := not_modified(etag):
+        _logger.info(
+            "[API] [Get Projects] Not modified for user: %s",
+            current_user_id,
+            extra={"event": "project.list.not_modified"},
+        )
+        return response
+
+    next_cursor = None
+    if len(user_projects) > limit:
+        user_projects = user_projects[:limit]
+        next_cursor = encode_cursor(id=user_projects[-1]["id"])
+    if fields is None or "members" in fields:
+        _attach_members(user_projects)
+
+    _logger.info(
+        "[API] [Get Projects] Retrieved %s projects for user: %s",
+        len(user_projects),
+        current_user_id,
+        extra={"event": "project.list"},
+    )
+    serializer = compile_serializer(schema_for(ProjectSchema, fields, many=True))
+    response = set_next_cursor(serializer.response(user_projects), next_cursor)
+    response.set_etag(etag)
+    tags = [
+        caching.user_projects_tag(current_user_id),
+        caching.user_tag(current_user_id),
+    ]
+    tags.extend(
+        caching.user_tag(member["id"])
+        for item in user_projects
+        for member in item.get("members", ())
+    )
+    caching.store(cache_key, response, etag, tags)
+    return response, 200
+
+
+def _project_rows(user_id, limit, status, after_id, fields):
+    """One page of projects as dicts shaped like ProjectSchema, without the ORM.
+
+    Members are not included; see `_attach_members`.
+    """
+    return _row_items(
+        db.session.execute(
+            queries.user_project_rows(user_id, limit, status, after_id, fields)
+        ),
+        fields,
+    )
+
+
+def _row_items(result, fields):
+    """Dicts shaped like ProjectSchema from `user_project_rows`-style rows."""
+    rows = result.mappings()
+    with_creator = fields is None or "creator" in fields
+    items = []
+    for row in rows:
+        item = dict(row)
+        if with_creator:
+            username = item.pop("creator_username")
+            email = item.pop("creator_email")
+            item["creator"] = None
+            if username is not None:
+                item["creator"] = {
+                    "id": item["creator_id"],
+                    "username": username,
+                    "email": email,
+                }
+        items.append(item)
+    return items
+
+
+def _attach_members(items):
+    """Fill in `members` for every item with a single query."""
+    members = {item["id"]: [] for item in items}
+    if members:
+        for row in db.session.execute(queries.member_rows(list(members))):
+            members[row.project_id].append(
+                {"id": row.id, "username": row.username, "email": row.email}
+            )
+    for item in items:
+        item["members"] = members[item["id"]]
+
+
+@projects.route("/projects/search", methods=["GET"])
+@jwt_required()
+def search_projects():
+    """Search the projects the current user created or is a member of.
+
+    Matches words in the name and description, best matches first.
+    """
+    current_user_id = current_user.id
 
-    if status_filter:
-        query = query.filter_by(status=status_filter)
+    try:
+        match = match_expression(request.args.get("q"))
+        limit, after = page_args()
+        offset = cursor_offset(after)
+        fields = requested_fields(project_schema)
+    except (SearchError, PaginationError, FieldsetError) as err:
+        _logger.warning("[API] [Search Projects] Invalid query arguments: %s", err)
+        return jsonify({"error": str(err)}), 400
+
+    # Fetch one extra row to learn whether another page exists.
+    results = _row_items(
+        db.session.execute(
+            queries.search_project_rows(
+                current_user_id, match, limit + 1, offset, fields
+            )
+        ),
+        fields,
+    )
+
+    next_cursor = None
+    if len(results) > limit:
+        results = results[:limit]
+        next_cursor = encode_cursor(offset=offset + limit)
+    if fields is None or "members" in fields:
+        _attach_members(results)
+
+    _logger.info(
+        "[API] [Search Projects] Found %s projects for user: %s",
+        len(results),
+        current_user_id,
+        extra={"event": "project.search"},
+    )
+    serializer = compile_serializer(schema_for(ProjectSchema, fields, many=True))
+    return set_next_cursor(serializer.response(results), next_cursor), 200
 
-    user_projects = query.all()
+
+@projects.route("/projects/export", methods=["GET"])
+@jwt_required()
+def export_projects():
+    """Stream every project of the current user as NDJSON or CSV"""
+    current_user_id = current_user.id
+    fmt = request.args.get("format", "ndjson")
+    if fmt not in MIMETYPES:
+        _logger.warning("[API] [Export Projects] Unknown format: %s", fmt)
+        return jsonify({"error": "format must be one of: csv, ndjson"}), 400
+
+    result = db.session.execute(
+        queries.export_rows(current_app.config["EXPORT_BATCH_SIZE"], current_user_id)
+    )
     _logger.info(
-        f"[API] [Get Projects] Retrieved {len(user_projects)} projects for user: {current_user_id}"
+        "[API] [Export Projects] Exporting %s for user: %s",
+        fmt,
+        current_user_id,
+        extra={"event": "project.export"},
     )
-    return jsonify(projects_schema.dump(user_projects)), 200
+    # Rows are encoded while the response is being sent, one batch at a time.
+    response = current_app.response_class(
+        stream_with_context(export_chunks(result, fmt)), mimetype=MIMETYPES[fmt]
+    )
+    response.headers["Content-Disposition"] = f'attachment; filename="projects.{fmt}"'
+    return response
+
+
+@projects.route("/projects/stats", methods=["GET"])
+@jwt_required()
+def get_project_stats():
+    """Count the current user's projects per status"""
+    current_user_id = current_user.id
+    by_status = dict(db.session.execute(queries.user_stats(current_user_id)).all())
+
+    _logger.info(
+        "[API] [Get Project Stats] Retrieved stats for user: %s",
+        current_user_id,
+        extra={"event": "project.stats"},
+    )
+    return jsonify({"total": sum(by_status.values()), "by_status": by_status}), 200
+
+
+@projects.route("/projects/joined", methods=["GET"])
+@jwt_required()
+def get_joined_projects():
+    """Get a page of projects the current user is a member of, ordered by id"""
+    current_user_id = current_user.id
+
+    try:
+        limit, after = page_args()
+        after_id = cursor_id(after)
+        fields = requested_fields(project_schema)
+    except (PaginationError, FieldsetError) as err:
+        _logger.warning("[API] [Get Joined Projects] Invalid query arguments: %s", err)
+        return jsonify({"error": str(err)}), 400
+
+    # Fetch one extra row to learn whether another page exists.
+    joined = _row_items(
+        db.session.execute(
+            queries.joined_project_rows(current_user_id, limit + 1, after_id, fields)
+        ),
+        fields,
+    )
+
+    next_cursor = None
+    if len(joined) > limit:
+        joined = joined[:limit]
+        next_cursor = encode_cursor(id=joined[-1]["id"])
+    if fields is None or "members" in fields:
+        _attach_members(joined)
+
+    _logger.info(
+        "[API] [Get Joined Projects] Retrieved %s projects for user: %s",
+        len(joined),
+        current_user_id,
+        extra={"event": "project.list.joined"},
+    )
+    serializer = compile_serializer(schema_for(ProjectSchema, fields, many=True))
+    return set_next_cursor(serializer.response(joined), next_cursor), 200
 
 
 @projects.route("/projects/<int:project_id>", methods=["GET"])
 @jwt_required()
 def get_project(project_id):
     """Get a specific project by ID"""
-    current_user_id = get_jwt_identity()
-    project = Project.query.filter(
-        (Project.id == project_id) & (Project.creator_id == current_user_id)
+    current_user_id = current_user.id
+    try:
+        fields = requested_fields(project_schema)
+    except FieldsetError as err:
+        _logger.warning("[API] [Get Project] Invalid query arguments: %s", err)
+        return jsonify({"error": str(err)}), 400
+
+    cache_key = caching.detail_key(current_user_id, project_id, fields)
+    if cached := response_cache.get(cache_key):
+        _logger.info(
+            "[API] [Get Project] Cache hit: %s for user: %s",
+            project_id,
+            current_user_id,
+            extra={"event": "project.get.cached"},
+        )
+        return caching.respond(cached)
+
+    # Members are loaded after the ETag check, so a 304 costs one SELECT.
+    project = db.session.scalars(
+        queries.user_project(current_user_id, project_id, fields=fields, members=False)
     ).first()
 
     if not project:
         _logger.warning(
-            f"[API] [Get Project] Project not found: {project_id} for user: {current_user_id}"
+            "[API] [Get Project] Project not found: %s for user: %s",
+            project_id,
+            current_user_id,
         )
         return jsonify({"msg": "Project not found"}), 404
 
+    etag = make_etag(
+        "project",
+        project.id,
+        project.updated_at,
+        current_user.username,
+        current_user.email,
+        sorted(fields) if fields else None,
+    )
+    if response := not_modified(etag):
+        _logger.info(
+            "[API] [Get Project] Not modified: %s for user: %s",
+            project_id,
+            current_user_id,
+            extra={"event": "project.get.not_modified"},
+        )
+        return response
+
     _logger.info(
-        f"[API] [Get Project] Retrieved project: {project_id} for user: {current_user_id}"
+        "[API] [Get Project] Retrieved project: %s for user: %s",
+        project_id,
+        current_user_id,
+        extra={"event": "project.get"},
     )
-    return project_schema.jsonify(project), 200
+    response = schema_for(ProjectSchema, fields).jsonify(project)
+    response.set_etag(etag)
+    tags = [
+        caching.project_tag(project_id),
+        caching.user_projects_tag(current_user_id),
+        caching.user_tag(current_user_id),
+    ]
+    if fields is None or "members" in fields:
+        tags.extend(caching.user_tag(member.id) for member in project.members)
+    caching.store(cache_key, response, etag, tags)
+    return response, 200
 
 
 @projects.route("/projects/<int:project_id>", methods=["PUT"])
 @jwt_required()
 def update_project(project_id):
     """Update a specific project by ID"""
-    current_user_id = int(get_jwt_identity())
-    project = Project.query.get_or_404(project_id)
+    current_user_id = current_user.id
+    project = db.first_or_404(queries.project_by_id(project_id))
 
     if project.creator_id != current_user_id:
         _logger.warning(
-            f"[API] [Update Project] Unauthorized access attempt for project: {project_id} by user: {current_user_id}"
+            "[API] [Update Project] Unauthorized access attempt for project: %s by user: %s",
+            project_id,
+            current_user_id,
         )
         return jsonify({"error": "You are not authorized to edit this project"}), 403
 
     try:
-        data = project_schema.load(request.json, partial=True, unknown=INCLUDE)
+        data = _update_validator.load(request.json)
     except ValidationError as err:
-        msg = f"[API] [Update Project] Validation error during project update: {err.messages}"
-        _logger.error(msg)
+        _logger.error(
+            "[API] [Update Project] Validation error during project update: %s",
+            err.messages,
+        )
         return jsonify(err.messages), 400
 
     for key, value in data.items():
         setattr(project, key, value)
 
     db.session.commit()
+    caching.invalidate_project(project_id, current_user_id)
     _logger.info(
-        f"[API] [Update Project] Updated project: {project_id} by user: {current_user_id}"
+        "[API] [Update Project] Updated project: %s by user: %s",
+        project_id,
+        current_user_id,
+        extra={"event": "project.update"},
     )
     return project_schema.jsonify(project), 200
 
@@ -118,19 +507,122 @@ def update_project(project_id):
 @projects.route("/projects/<int:project_id>", methods=["DELETE"])
 @jwt_required()
 def delete_project(project_id):
-    """Delete a specific project by ID"""
-    current_user_id = int(get_jwt_identity())
-    project = Project.query.get_or_404(project_id)
+    """Delete a specific project by ID
+
+    With `Prefer: respond-async` the deletion runs as a background job and
+    the response is 202 with the job's status URL in `Location`.
+    """
+    current_user_id = current_user.id
+    project = db.first_or_404(queries.project_by_id(project_id))
 
     if project.creator_id != current_user_id:
         _logger.warning(
-            f"[API] [Delete Project] Unauthorized access attempt for project: {project_id} by user: {current_user_id}"
+            "[API] [Delete Project] Unauthorized access attempt for project: %s by user: %s",
+            project_id,
+            current_user_id,
         )
         return jsonify({"error": "You are not authorized to delete this project"}), 403
 
+    if "respond-async" in request.headers.get("Prefer", ""):
+        job = job_runner.enqueue(
+            "projects.delete", {"project_id": project_id}, current_user_id
+        )
+        _logger.info(
+            "[API] [Delete Project] Queued deletion of project: %s by user: %s",
+            project_id,
+            current_user_id,
+            extra={"event": "project.delete.queued"},
+        )
+        return accepted(job)
+
     db.session.delete(project)
     db.session.commit()
+    caching.invalidate_project(project_id, current_user_id)
     _logger.info(
-        f"[API] [Delete Project] Deleted project: {project_id} by user: {current_user_id}"
+        "[API] [Delete Project] Deleted project: %s by user: %s",
+        project_id,
+        current_user_id,
+        extra={"event": "project.delete"},
     )
     return "", 204
+
+
+@projects.route("/projects/<int:project_id>/members", methods=["POST"])
+@jwt_required()
+def add_project_members(project_id):
+    """Add users to a project; existing members and unknown ids are ignored"""
+    return _change_members(
+        project_id,
+        "Add Members",
+        lambda user_ids, now: queries.add_members(project_id, user_ids, now),
+        "added",
+    )
+
+
+@projects.route("/projects/<int:project_id>/members", methods=["DELETE"])
+@jwt_required()
+def remove_project_members(project_id):
+    """Remove users from a project; ids that are not members are ignored"""
+    return _change_members(
+        project_id,
+        "Remove Members",
+        lambda user_ids, now: queries.remove_members(project_id, user_ids),
+        "removed",
+    )
+
+
+def _change_members(project_id, section, statement, outcome):
+    """Apply a bulk membership change to `project_id` with one statement.
+
+    `statement(user_ids, now)` builds the INSERT or DELETE; it must return
+    the user ids it changed. Responds with those ids under `outcome` and
+    the rest of the request's ids under `ignored`.
+    """
+    current_user_id = current_user.id
+    project = db.first_or_404(queries.project_by_id(project_id))
+
+    if project.creator_id != current_user_id:
+        _logger.warning(
+            "[API] [%s] Unauthorized access attempt for project: %s by user: %s",
+            section,
+            project_id,
+            current_user_id,
+        )
+        return (
+            jsonify({"error": "You are not authorized to manage this project's members"}),
+            403,
+        )
+
+    try:
+        user_ids = members_schema.load(request.json)["user_ids"]
+    except ValidationError as err:
+        _logger.error("[API] [%s] Validation error: %s", section, err.messages)
+        return jsonify(err.messages), 400
+
+    max_size = current_app.config["MEMBERS_BATCH_MAX_SIZE"]
+    if len(user_ids) > max_size:
+        _logger.error(
+            "[API] [%s] Batch of %s exceeds %s", section, len(user_ids), max_size
+        )
+        return jsonify({"error": f"At most {max_size} user ids per request"}), 413
+
+    now = datetime.now(timezone.utc)
+    changed = sorted(db.session.scalars(statement(user_ids, now)).all())
+    if changed:
+        # Members are part of the project's representation and its ETag.
+        project.updated_at = now
+    db.session.commit()
+    if changed:
+        caching.invalidate_project(project_id, current_user_id)
+
+    _logger.info(
+        "[API] [%s] %s %s users for project: %s by user: %s",
+        section,
+        outcome.capitalize(),
+        len(changed),
+        project_id,
+        current_user_id,
+        extra={"event": f"project.members.{outcome}"},
+    )
+    ignored = sorted(set(user_ids) - set(changed))
+    return jsonify({outcome: changed, "ignored": ignored}), 200
@@ -1,5 +1,6 @@
 from flask_marshmallow import Schema
-from marshmallow.fields import String, Integer, DateTime, Nested
+from marshmallow.fields import String, Integer, DateTime, List, Nested
+from marshmallow.validate import Length
 
 
 class ProjectSchema(Schema):
@@ -22,3 +23,7 @@ class ProjectSchema(Schema):
         only=("id", "username", "email"),
         dump_only=True,
     )
+
+
+class ProjectMembersSchema(Schema):
+    user_ids = List(Integer(strict=True), required=True, validate=Length(min=1))
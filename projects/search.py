@@ -0,0 +1,24 @@
+import re
+
+_WORD = re.compile(r"\w+")
+
+
+class SearchError(ValueError):
+    """Raised when the client sends a search query we cannot use."""
+
+
+def match_expression(q):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word must appear in the name or description, and the last one
+    may be a prefix so results show up while the user is still typing.
+    Words are quoted, so FTS5 operators and punctuation in `q` are taken
+    literally instead of failing the query with a syntax error.
+    """
+    words = _WORD.findall(q or "")
+    if not words:
+        raise SearchError("q must contain at least one word")
+
+    terms = [f'"{word}"' for word in words]
+    terms[-1] += "*"
+    return " ".join(terms)
@@ -0,0 +1,71 @@
+import re
+
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import text
+
+from extensions import db
+
+_audited_queries = []
+
+# "SCAN project" is a full table scan; "SCAN project USING INDEX ..." walks
+# an index and "SEARCH ..." seeks one, so neither grows with the table.
+# SQLite before 3.36 prints "SCAN TABLE project [AS alias]" instead.
+_FULL_SCAN = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW)(\S+)(?: AS \S+)?$")
+
+
+def audited(*samples):
+    """Register a statement builder with `flask audit-queries`.
+
+    Each sample is a dict of keyword arguments the builder is called with
+    to produce a representative statement for EXPLAIN QUERY PLAN.
+    """
+
+    def decorator(builder):
+        name = f"{builder.__module__}.{builder.__name__}"
+        for sample in samples or ({},):
+            _audited_queries.append((name, builder, sample))
+        return builder
+
+    return decorator
+
+
+def explain(statement):
+    """Return the EXPLAIN QUERY PLAN detail lines for `statement`."""
+    compiled = statement.compile(
+        dialect=db.engine.dialect,
+        compile_kwargs={"literal_binds": True},
+    )
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    return [row.detail for row in rows]
+
+
+def full_scans(plan):
+    """Return the plan lines that read an entire table."""
+    return [line for line in plan if _FULL_SCAN.match(line)]
+
+
+def audit():
+    """EXPLAIN every registered query; return (name, sample, plan, scans)."""
+    results = []
+    for name, builder, sample in _audited_queries:
+        plan = explain(builder(**sample))
+        results.append((name, sample, plan, full_scans(plan)))
+    return results
+
+
+@click.command("audit-queries")
+@with_appcontext
+def audit_queries_command():
+    """Fail if any query issued by the blueprints does a full table scan."""
+    failures = 0
+    for name, sample, plan, scans in audit():
+        status = "FAIL" if scans else "ok"
+        click.echo(f"[{status}] {name} {sample}")
+        for line in plan:
+            click.echo(f"        {line}")
+        failures += bool(scans)
+
+    if failures:
+        raise click.ClickException(f"{failures} queries do a full table scan")
+    click.echo("No full table scans found.")
@@ -1,7 +1,19 @@
 #!/bin/sh
 
 # This script runs database migrations and then starts the Flask application.
+# Set FLASK_DEBUG=1 to use the development server instead of gunicorn.
+
+# Every process started from here must share the response cache, or a
+# write in one leaves stale reads cached in the others.
+export RESPONSE_CACHE_BACKEND="${RESPONSE_CACHE_BACKEND:-sqlite}"
 
 flask db upgrade
 
-flask run --host 0.0.0.0
+# A single process runs the background jobs; restart it if it exits.
+(while true; do flask jobs work; sleep 1; done) &
+
+if [ "$FLASK_DEBUG" = "1" ]; then
+    exec flask run --host 0.0.0.0
+fi
+
+exec gunicorn -c gunicorn.conf.py wsgi:app
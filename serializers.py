@@ -0,0 +1,109 @@
+from functools import lru_cache
+
+from flask import current_app, jsonify
+from json.encoder import encode_basestring_ascii
+
+from marshmallow.fields import DateTime, Integer, Nested, String
+from marshmallow.utils import ensure_text_type
+
+
+class UnsupportedField(TypeError):
+    """Raised when a schema uses a field type the compiler can't specialise."""
+
+
+def _string(value):
+    if type(value) is not str:
+        value = ensure_text_type(value)
+    return encode_basestring_ascii(value)
+
+
+def _datetime(value):
+    return f'"{value.isoformat()}"'
+
+
+def _integer(value):
+    return str(int(value))
+
+
+def _scalar_encoder(field):
+    if isinstance(field, DateTime):
+        if field.format not in (None, "iso"):
+            raise UnsupportedField(f"DateTime format {field.format!r}")
+        return _datetime
+    if isinstance(field, Integer):
+        if field.as_string:
+            raise UnsupportedField("Integer(as_string=True)")
+        return _integer
+    if isinstance(field, String):
+        return _string
+    raise UnsupportedField(type(field).__name__)
+
+
+def _compile_object(schema):
+    """Generate a function encoding one mapping as `schema` would dump it.
+
+    Keys are emitted sorted, ASCII-escaped and without whitespace, which is
+    what Flask's `jsonify` produces outside debug mode.
+    """
+    namespace = {}
+    parts = []
+    fields = sorted(
+        schema.dump_fields.items(),
+        key=lambda item: item[1].data_key or item[0],
+    )
+    for index, (name, field) in enumerate(fields):
+        key = encode_basestring_ascii(field.data_key or name)
+        attribute = field.attribute or name
+        encoder = f"_e{index}"
+
+        if isinstance(field, Nested):
+            nested = compile_serializer(field.schema)
+            namespace[encoder] = nested.encode_many if field.many else nested.encode
+        else:
+            namespace[encoder] = _scalar_encoder(field)
+
+        parts.append(
+            f"{key + ':'!r} + ('null' if (v := row[{attribute!r}]) is None"
+            f" else {encoder}(v))"
+        )
+
+    body = " + ',' + ".join(parts) if parts else "''"
+    source = f"def encode(row):\n    return '{{' + {body} + '}}'\n"
+    exec(compile(source, f"<serializer {type(schema).__name__}>", "exec"), namespace)
+    return namespace["encode"]
+
+
+class CompiledSerializer:
+    """JSON encoder specialised once for a marshmallow schema instance.
+
+    Reads plain mappings (e.g. Core `RowMapping`s or dicts) keyed by
+    attribute name, nested fields holding a mapping or a list of them, and
+    writes the same bytes as `jsonify(schema.dump(...))`.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self.many = schema.many
+        self.encode = _compile_object(schema)
+
+    def encode_many(self, rows):
+        return "[" + ",".join(map(self.encode, rows)) + "]"
+
+    def dumps(self, data):
+        """Return the response body for `data`, including jsonify's newline."""
+        text = self.encode_many(data) if self.many else self.encode(data)
+        return (text + "\n").encode()
+
+    def response(self, data):
+        """A JSON response for `data`, byte-identical to `jsonify(dump(data))`."""
+        json = current_app.json
+        if json.compact is False or (json.compact is None and current_app.debug):
+            # Pretty-printed output is for humans; take the generic path.
+            return jsonify(self.schema.dump(data))
+        return current_app.response_class(self.dumps(data), mimetype=json.mimetype)
+
+
+@lru_cache(maxsize=256)
+def compile_serializer(schema):
+    """Compile (once per schema instance) a `CompiledSerializer`."""
+    return CompiledSerializer(schema)
@@ -0,0 +1,149 @@
+import contextlib
+import logging
+import re
+import threading
+import time
+from collections import Counter
+
+from flask import current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_logger = logging.getLogger(__name__)
+
+# "IN (?, ?, ?)" and executemany batches differ only in arity.
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement):
+    """`statement` with whitespace and placeholder lists normalised."""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    return _PLACEHOLDER_LIST.sub("?", shape)
+
+
+class QueryProfile:
+    """The SQL statements executed while the profile was active."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    @property
+    def sql_time(self):
+        return sum(elapsed for _, elapsed in self.statements)
+
+    def shapes(self):
+        return Counter(statement_shape(statement) for statement, _ in self.statements)
+
+    def repeated(self, threshold=2):
+        """Statement shapes run at least `threshold` times; the N+1 signal."""
+        return {
+            shape: count
+            for shape, count in self.shapes().most_common()
+            if count >= threshold
+        }
+
+    def report(self):
+        """A readable breakdown: totals, then each shape by frequency."""
+        lines = [f"{self.count} queries, {self.sql_time * 1000:.1f}ms SQL"]
+        for shape, count in self.shapes().most_common():
+            lines.append(f"  {count}x {shape}")
+        return "\n".join(lines)
+
+
+class SQLProfiler:
+    """Records the statements each request runs and flags expensive ones.
+
+    A request is logged with its query breakdown when it takes longer than
+    SQL_PROFILE_SLOW_MS, or when one statement shape repeats at least
+    SQL_PROFILE_REPEAT_THRESHOLD times (usually a lazy load in a loop).
+    `profile()` collects statements for any block of code, e.g. in tests.
+    Each app keeps the active profiles of every thread in `app.extensions`.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("SQL_PROFILE_SLOW_MS", 500)
+        app.config.setdefault("SQL_PROFILE_REPEAT_THRESHOLD", 5)
+        app.extensions["sql_profiler"] = threading.local()
+
+        app.before_request(self._before_request)
+        app.teardown_request(self._teardown_request)
+
+        if not event.contains(Engine, "before_cursor_execute", _before_cursor):
+            event.listen(Engine, "before_cursor_execute", _before_cursor)
+            event.listen(Engine, "after_cursor_execute", _after_cursor)
+
+    @contextlib.contextmanager
+    def profile(self):
+        """Collect the statements this thread runs inside the block."""
+        profile = QueryProfile()
+        active = _active()
+        active.append(profile)
+        try:
+            yield profile
+        finally:
+            active.remove(profile)
+
+    def _before_request(self):
+        profile = QueryProfile()
+        _active().append(profile)
+        g._sql_profile = (profile, time.perf_counter())
+
+    def _teardown_request(self, exc):
+        item = g.pop("_sql_profile", None)
+        if item is None:
+            return
+        profile, start = item
+        _active().remove(profile)
+
+        slow_ms = current_app.config["SQL_PROFILE_SLOW_MS"]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        repeated = profile.repeated(current_app.config["SQL_PROFILE_REPEAT_THRESHOLD"])
+        if elapsed_ms < slow_ms and not repeated:
+            return
+
+        reason = "Slow request" if elapsed_ms >= slow_ms else "Repeated queries"
+        _logger.warning(
+            "[SQL] [%s] %s %s took %.1fms, %s",
+            reason,
+            request.method,
+            request.path,
+            elapsed_ms,
+            profile.report(),
+        )
+
+
+def _active(create=True):
+    """The profiles this thread is collecting for the current app."""
+    if not has_app_context():
+        return None
+    local = current_app.extensions.get("sql_profiler")
+    if local is None:
+        return None
+    active = getattr(local, "profiles", None)
+    if active is None and create:
+        active = local.profiles = []
+    return active
+
+
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    if _active(create=False):
+        conn.info.setdefault("sqlprofile_start", []).append(time.perf_counter())
+
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    active = _active(create=False)
+    starts = conn.info.get("sqlprofile_start")
+    if not active or not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    for profile in active:
+        profile.statements.append((statement, elapsed))
@@ -0,0 +1,71 @@
+import json
+import os
+
+from sqlalchemy import event
+
+# PRAGMAs for a file-backed SQLite database serving concurrent requests:
+# WAL lets readers proceed while a writer commits, NORMAL sync is durable
+# across application crashes in WAL mode, and busy_timeout makes writers
+# wait for the lock instead of failing with "database is locked".
+PRODUCTION_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": 5000,
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,
+    "temp_store": "MEMORY",
+}
+
+PROFILES = {
+    "default": {},
+    "production": PRODUCTION_PRAGMAS,
+}
+
+
+def sqlite_pragmas_from_env(environ=os.environ):
+    """Build the PRAGMA set from SQLITE_PROFILE plus SQLITE_<PRAGMA> overrides."""
+    profile = environ.get("SQLITE_PROFILE", "production")
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown SQLITE_PROFILE {profile!r}")
+
+    pragmas = dict(PROFILES[profile])
+    for name in PRODUCTION_PRAGMAS:
+        value = environ.get(f"SQLITE_{name.upper()}")
+        if value is not None:
+            pragmas[name] = value
+    return pragmas
+
+
+def engine_options_from_env(environ=os.environ):
+    """Read SQLALCHEMY_ENGINE_OPTIONS as a JSON object, e.g. '{"pool_size": 10}'."""
+    return json.loads(environ.get("SQLALCHEMY_ENGINE_OPTIONS", "{}"))
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if name not in PRODUCTION_PRAGMAS:
+                raise ValueError(f"Unsupported SQLite PRAGMA {name!r}")
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def listen_sqlite_pragmas(engine, pragmas):
+    """Apply `pragmas` to every new DBAPI connection `engine` opens."""
+    if engine.dialect.name != "sqlite" or not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, _connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+
+def init_storage(app, db):
+    """Hook the SQLITE_PRAGMAS profile into the engines of `db`."""
+    app.config.setdefault("SQLITE_PRAGMAS", PRODUCTION_PRAGMAS)
+
+    with app.app_context():
+        for engine in db.engines.values():
+            listen_sqlite_pragmas(engine, app.config["SQLITE_PRAGMAS"])
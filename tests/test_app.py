@@ -0,0 +1,109 @@
+import multiprocessing
+import os
+import runpy
+import subprocess
+import sys
+
+import click
+
+from app import config_from_env, create_app
+from extensions import response_cache
+from jobs.runner import job_runner
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_create_app_builds_isolated_apps(tmp_path):
+    first = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/a.db"})
+    second = create_app(
+        {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/b.db", "PAGE_SIZE": 5}
+    )
+
+    assert first is not second
+    assert first.config["PAGE_SIZE"] == 50
+    assert second.config["PAGE_SIZE"] == 5
+    assert first.test_client().get("/").status_code == 200
+    # Without JOB_WORKERS, serving requests starts no job dispatcher.
+    assert first.extensions["job_runner"][job_runner].dispatcher is None
+
+    # Building the second app leaves the first one's extensions alone.
+    for name in ("response_cache", "password_pool", "identity_cache", "metrics"):
+        assert first.extensions[name] is not second.extensions[name]
+    with first.app_context():
+        response_cache.set("key", "entry", ["tag"])
+        assert response_cache.get("key") == "entry"
+    with second.app_context():
+        assert response_cache.get("key") is None
+    assert 'endpoint="index"' in first.test_client().get("/metrics").text
+    assert 'endpoint="index"' not in second.test_client().get("/metrics").text
+
+
+def test_migrations_are_only_set_up_for_the_cli(app, tmp_path):
+    assert "migrate" not in app.extensions
+
+    with click.Context(click.Command("flask")):
+        cli_app = create_app({"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/c.db"})
+    assert "migrate" in cli_app.extensions
+
+
+def test_importing_app_is_cheap():
+    code = (
+        "import sys, app; "
+        "print(sorted({'flask', 'sqlalchemy', 'alembic'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+def _gunicorn_config(monkeypatch, workers, cpus, **environ):
+    """App settings as seen by gunicorn workers, after gunicorn.conf.py ran."""
+    for name in (
+        "RESPONSE_CACHE_BACKEND",
+        "PASSWORD_POOL_WORKERS",
+        "PASSWORD_POOL_QUEUE_SIZE",
+        "JOB_WORKERS",
+        "METRICS_DIR",
+    ):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in environ.items():
+        monkeypatch.setenv(name, value)
+    monkeypatch.setenv("GUNICORN_WORKERS", str(workers))
+    monkeypatch.setattr(multiprocessing, "cpu_count", lambda: cpus)
+
+    before = dict(os.environ)
+    settings = runpy.run_path(os.path.join(ROOT, "gunicorn.conf.py"))
+    assert dict(os.environ) == before
+    raw_env = dict(item.split("=", 1) for item in settings["raw_env"])
+    return config_from_env({**os.environ, **raw_env})
+
+
+def test_gunicorn_splits_per_process_budgets(monkeypatch):
+    config = _gunicorn_config(monkeypatch, workers=4, cpus=8)
+    assert config["PASSWORD_POOL_WORKERS"] == 2
+    assert config["PASSWORD_POOL_QUEUE_SIZE"] == 8
+    assert config["JOB_WORKERS"] == 0
+    assert config["RESPONSE_CACHE_BACKEND"] == "sqlite"
+    assert config["METRICS_DIR"]
+
+    # More workers than CPUs: hash inline, one password per request thread.
+    config = _gunicorn_config(monkeypatch, workers=17, cpus=8)
+    assert config["PASSWORD_POOL_WORKERS"] == 0
+    assert config["PASSWORD_POOL_QUEUE_SIZE"] == 3
+
+
+def test_gunicorn_keeps_explicit_settings(monkeypatch):
+    config = _gunicorn_config(
+        monkeypatch,
+        workers=4,
+        cpus=8,
+        PASSWORD_POOL_WORKERS="3",
+        RESPONSE_CACHE_BACKEND="memory",
+    )
+    assert config["PASSWORD_POOL_WORKERS"] == 3
+    assert config["RESPONSE_CACHE_BACKEND"] == "memory"
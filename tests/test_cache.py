@@ -0,0 +1,91 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+from app import create_app
+from cache import CachedResponse, MemoryBackend, SQLiteBackend
+from extensions import db
+from projects.models import Project
+from users.models import User
+
+
+def _entry(body):
+    return CachedResponse(body, "etag", {"X-Next-Cursor": "abc"})
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path):
+    if request.param == "memory":
+        return MemoryBackend(maxsize=2, ttl=60)
+    return SQLiteBackend(str(tmp_path / "cache.db"), maxsize=2, ttl=60)
+
+
+def test_backend_invalidates_by_tag(backend):
+    """Test that invalidating a tag drops exactly the entries carrying it"""
+    backend.set("a", _entry(b"A"), ["user:1", "project:1"])
+    backend.set("b", _entry(b"B"), ["user:2"])
+
+    assert backend.get("a") == _entry(b"A")
+    backend.invalidate("project:1")
+    assert backend.get("a") is None
+    assert backend.get("b") == _entry(b"B")
+
+
+def test_sqlite_backend_is_shared_between_instances(tmp_path):
+    """Test that two workers see each other's entries and invalidations"""
+    path = str(tmp_path / "cache.db")
+    worker_a = SQLiteBackend(path, maxsize=10, ttl=60)
+    worker_b = SQLiteBackend(path, maxsize=10, ttl=60)
+
+    worker_a.set("key", _entry(b"body"), ["tag"])
+    assert worker_b.get("key") == _entry(b"body")
+
+    worker_b.invalidate("tag")
+    assert worker_a.get("key") is None
+
+
+def test_memory_backend_lru_and_ttl():
+    """Test LRU eviction order and TTL expiry"""
+    backend = MemoryBackend(maxsize=2, ttl=60)
+    backend.set("a", _entry(b"A"), [])
+    backend.set("b", _entry(b"B"), [])
+    backend.get("a")
+    backend.set("c", _entry(b"C"), [])
+    assert backend.get("b") is None
+    assert backend.get("a") is not None
+
+    expired = MemoryBackend(maxsize=2, ttl=-1)
+    expired.set("a", _entry(b"A"), ["tag"])
+    assert expired.get("a") is None
+
+
+def test_sqlite_backend_invalidates_across_app_instances(tmp_path):
+    """Test that a write served by one worker is seen by the other's next read"""
+    config = {
+        "TESTING": True,
+        "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/app.db",
+        "RESPONSE_CACHE_BACKEND": "sqlite",
+        "RESPONSE_CACHE_PATH": str(tmp_path / "cache.db"),
+        "JOB_WORKERS": 0,
+    }
+    workers = [create_app(config).test_client() for _ in range(2)]
+    app = workers[-1].application
+
+    def request(worker, url, **kwargs):
+        return workers[worker].open(url, headers=headers, **kwargs)
+
+    with app.app_context():
+        db.create_all()
+        user = User(username="owner", email="owner@example.com", password_hash="x")
+        project = Project(name="Old", creator=user)
+        db.session.add(project)
+        db.session.commit()
+        url = f"/projects/{project.id}"
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+    assert request(0, url).json["name"] == "Old"
+    assert request(1, url).json["name"] == "Old"
+    assert request(1, url, method="PUT", json={"name": "New"}).status_code == 200
+    assert request(0, url).json["name"] == "New"
+
+    assert request(0, url, method="DELETE").status_code == 204
+    assert request(1, url).status_code == 404
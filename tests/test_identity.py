@@ -0,0 +1,66 @@
+from sqlalchemy import event
+
+from extensions import db
+from users.identity import _RowCache
+from users.models import User
+
+
+def test_me_is_served_from_identity_cache(app, logged_in_client):
+    """Test that repeated requests resolve the user without a SELECT"""
+    assert logged_in_client.get("/me").status_code == 200
+
+    statements = []
+
+    def record(_conn, _cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = logged_in_client.get("/me")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200
+    assert response.json["user"]["username"] == "test_user"
+    assert not any('FROM "user"' in statement for statement in statements)
+
+
+def test_identity_cache_evicts_changed_user(logged_in_client, db_session):
+    """Test that a user update is visible on the next request"""
+    assert logged_in_client.get("/me").status_code == 200
+
+    user = db_session.get(User, 1)
+    user.username = "renamed_user"
+    db_session.commit()
+
+    response = logged_in_client.get("/me")
+    assert response.json["user"]["username"] == "renamed_user"
+
+
+def test_deleted_user_is_not_found(logged_in_client, db_session):
+    """Test that a token for a deleted user is rejected"""
+    assert logged_in_client.get("/me").status_code == 200
+
+    db_session.delete(db_session.get(User, 1))
+    db_session.commit()
+
+    response = logged_in_client.get("/me")
+    assert response.status_code == 404
+    assert response.json == {"error": "User not found"}
+
+
+def test_identity_cache_is_bounded_lru_with_ttl():
+    """Test LRU eviction order and TTL expiry"""
+    cache = _RowCache(maxsize=2, ttl=60)
+    cache.put(1, {"id": 1})
+    cache.put(2, {"id": 2})
+    cache.get(1)
+    cache.put(3, {"id": 3})
+
+    assert cache.get(1) == {"id": 1}
+    assert cache.get(2) is None
+    assert cache.get(3) == {"id": 3}
+
+    expired = _RowCache(maxsize=2, ttl=-1)
+    expired.put(1, {"id": 1})
+    assert expired.get(1) is None
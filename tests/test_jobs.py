@@ -0,0 +1,273 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from extensions import db
+from jobs.models import Job
+from jobs.runner import JobRunner, job_runner
+from projects.models import Project
+from users.models import User
+
+
+@pytest.fixture
+def runner(app, db_session):
+    """A runner of its own, so test handlers stay out of the app's registry."""
+    runner = JobRunner(app)
+    yield runner
+    runner.stop()
+
+
+def _job(db_session, job_id):
+    db_session.expire_all()
+    return db_session.get(Job, job_id)
+
+
+def test_enqueue_job_and_poll_status(logged_in_client):
+    """Test that a queued job is reported as queued, then as succeeded"""
+    r = logged_in_client.post("/jobs", json={"type": "projects.rebuild_stats"})
+    assert r.status_code == 202, r.json
+    assert r.json["status"] == "queued"
+    assert r.headers["Location"] == f"/jobs/{r.json['id']}"
+
+    assert logged_in_client.get(r.headers["Location"]).json["status"] == "queued"
+    assert job_runner.run_pending() == 1
+
+    status = logged_in_client.get(r.headers["Location"]).json
+    assert status["status"] == "succeeded"
+    assert status["attempts"] == 1
+    assert status["result"] == {"user_id": 1}
+    assert status["finished_at"] is not None
+
+
+def test_enqueue_job_invalid_request(logged_in_client):
+    """Test that unknown job types and invalid payloads are rejected"""
+    r = logged_in_client.post("/jobs", json={"payload": {}})
+    assert r.status_code == 400, r.json
+    r = logged_in_client.post("/jobs", json={"type": "no.such.job"})
+    assert r.status_code == 400, r.json
+    assert "Unknown job type" in r.json["error"]
+    r = logged_in_client.post(
+        "/jobs", json={"type": "projects.delete", "payload": {"project_id": "1"}}
+    )
+    assert r.status_code == 400, r.json
+    assert "project_id" in r.json["payload"]
+
+
+def test_get_job_of_another_user(logged_in_client, db_session):
+    """Test that users only see the jobs they queued"""
+    job = job_runner.enqueue("projects.rebuild_stats")
+    assert logged_in_client.get(f"/jobs/{job.id}").status_code == 404
+
+
+def test_delete_project_async(logged_in_client, db_session):
+    """Test that Prefer: respond-async deletes the project in a background job"""
+    members = [
+        User(username=f"m{i}", email=f"m{i}@example.com", password_hash="x")
+        for i in range(2)
+    ]
+    project = Project(
+        name="Big team", creator=db_session.get(User, 1), members=members
+    )
+    db_session.add(project)
+    db_session.commit()
+    url = f"/projects/{project.id}"
+
+    r = logged_in_client.delete(url, headers={"Prefer": "respond-async"})
+    assert r.status_code == 202, r.json
+    assert logged_in_client.get(url).status_code == 200
+
+    assert job_runner.run_pending() == 1
+    assert logged_in_client.get(url).status_code == 404
+    job = logged_in_client.get(r.headers["Location"]).json
+    assert job["result"] == {"deleted": True, "members_removed": 2}
+    assert logged_in_client.get("/projects/stats").json["total"] == 0
+
+
+def test_delete_job_for_another_users_project_is_not_retried(
+    logged_in_client, db_session
+):
+    """Test that a JobFailed failure is final"""
+    other_user = User(username="other", email="o@example.com", password_hash="x")
+    project = Project(name="Not yours", creator=other_user)
+    db_session.add(project)
+    db_session.commit()
+
+    r = logged_in_client.post(
+        "/jobs", json={"type": "projects.delete", "payload": {"project_id": project.id}}
+    )
+    assert job_runner.run_pending() == 1
+
+    job = logged_in_client.get(r.headers["Location"]).json
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+    assert "not authorized" in job["last_error"]
+    assert db_session.get(Project, project.id) is not None
+
+
+def test_failed_jobs_are_retried_with_backoff(app, runner, db_session, monkeypatch):
+    """Test that failures are retried after a growing delay, up to max_attempts"""
+    calls = []
+
+    @runner.handler("test.flaky", max_attempts=3)
+    def flaky(payload, user_id):
+        calls.append(payload)
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(app.config, "JOB_RETRY_BASE_SECONDS", 10)
+    monkeypatch.setitem(app.config, "JOB_RETRY_MAX_SECONDS", 25)
+    assert [runner.backoff(n) for n in (1, 2, 3, 4)] == [10, 20, 25, 25]
+
+    job_id = runner.enqueue("test.flaky", {"n": 1}).id
+    before = datetime.now(timezone.utc).replace(tzinfo=None)
+    assert runner.run_pending() == 1
+    job = _job(db_session, job_id)
+    assert job.status == "queued"
+    assert job.attempts == 1
+    assert job.last_error == "RuntimeError: boom"
+    assert job.run_at >= before + timedelta(seconds=10)
+
+    # Not due yet; without the delay the remaining attempts run at once.
+    assert runner.run_pending() == 0
+    monkeypatch.setitem(app.config, "JOB_RETRY_BASE_SECONDS", 0)
+    job.run_at = before
+    db_session.commit()
+    assert runner.run_pending() == 2
+
+    job = _job(db_session, job_id)
+    assert job.status == "failed"
+    assert job.attempts == 3
+    assert calls == [{"n": 1}] * 3
+
+
+def test_expired_lease_is_reclaimed(runner, db_session):
+    """Test that jobs abandoned by a dead worker run again, within max_attempts"""
+
+    @runner.handler("test.ok", max_attempts=2)
+    def ok(payload, user_id):
+        return "done"
+
+    past = datetime.now(timezone.utc) - timedelta(minutes=1)
+    abandoned = [
+        Job(
+            type="test.ok",
+            status="running",
+            attempts=attempts,
+            max_attempts=2,
+            run_at=past,
+            lease_expires_at=past,
+        )
+        for attempts in (1, 2)
+    ]
+    db_session.add_all(abandoned)
+    db_session.commit()
+
+    assert runner.run_pending() == 2
+    retried, exhausted = (_job(db_session, job.id) for job in abandoned)
+    assert (retried.status, retried.attempts, retried.result) == ("succeeded", 2, "done")
+    assert (exhausted.status, exhausted.attempts) == ("failed", 3)
+    assert exhausted.last_error == "Abandoned by its worker"
+
+
+def test_lease_is_renewed_while_the_handler_runs(app, runner, db_session, monkeypatch):
+    """Test that a job outliving its lease is not claimed a second time"""
+    monkeypatch.setitem(app.config, "JOB_LEASE_SECONDS", 0.3)
+    started = threading.Event()
+    calls = []
+
+    @runner.handler("test.slow")
+    def slow(payload, user_id):
+        calls.append(payload)
+        started.set()
+        time.sleep(1)
+        return "done"
+
+    job_id = runner.enqueue("test.slow").id
+
+    def work():
+        with app.app_context():
+            runner.run_pending()
+
+    worker = threading.Thread(target=work)
+    worker.start()
+    assert started.wait(5)
+    time.sleep(0.6)  # twice the lease
+    assert runner.run_pending() == 0
+    worker.join()
+
+    job = _job(db_session, job_id)
+    assert (job.status, job.attempts) == ("succeeded", 1)
+    assert len(calls) == 1
+
+
+def test_polling_an_idle_queue_only_reads(runner, db_session):
+    """Test that workers poll without taking SQLite's write lock"""
+
+    @runner.handler("test.ok")
+    def ok(payload, user_id):
+        return "done"
+
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    later = datetime.now(timezone.utc) + timedelta(hours=1)
+    runner.enqueue("test.ok", run_at=later)
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        assert runner.run_pending() == 0
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert statements
+    assert all(statement.lstrip().startswith("SELECT") for statement in statements)
+
+
+def test_dispatcher_limits_concurrency_per_type(app, runner, db_session, monkeypatch):
+    """Test that each type runs at most `concurrency` jobs at once"""
+    lock = threading.Lock()
+    active = {"serial": 0}
+    peak = {"serial": 0}
+    both_running = threading.Barrier(2, timeout=5)
+
+    @runner.handler("test.serial", concurrency=1)
+    def serial(payload, user_id):
+        with lock:
+            active["serial"] += 1
+            peak["serial"] = max(peak["serial"], active["serial"])
+        time.sleep(0.05)
+        with lock:
+            active["serial"] -= 1
+
+    @runner.handler("test.pair", concurrency=2)
+    def pair(payload, user_id):
+        # Only passes if both jobs of this type run at the same time.
+        both_running.wait()
+
+    monkeypatch.setitem(app.config, "JOB_WORKERS", 4)
+    monkeypatch.setitem(app.config, "JOB_POLL_INTERVAL", 0.01)
+    ids = [runner.enqueue("test.serial").id for _ in range(3)]
+    ids += [runner.enqueue("test.pair").id for _ in range(2)]
+    runner.start()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        statuses = {_job(db_session, job_id).status for job_id in ids}
+        if statuses <= {"succeeded", "failed"}:
+            break
+        time.sleep(0.05)
+    runner.stop()
+
+    assert statuses == {"succeeded"}
+    assert peak["serial"] == 1
+
+
+def test_work_command_runs_due_jobs(app, db_session):
+    """Test draining the queue from the CLI"""
+    job_runner.enqueue("projects.rebuild_stats")
+    result = app.test_cli_runner().invoke(args=["jobs", "work", "--once"])
+    assert result.exit_code == 0, result.output
+    assert "Ran 1 jobs" in result.output
@@ -0,0 +1,74 @@
+import io
+import json
+import logging
+import threading
+
+import pytest
+
+from logs import JSONFormatter, SamplingFilter, configure_logging
+
+
+@pytest.fixture
+def log_stream():
+    stream = io.StringIO()
+    yield stream
+    configure_logging()
+
+
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("solo.test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_json_formatter_includes_extras():
+    entry = json.loads(JSONFormatter().format(_record(event="user.me", user_id=3)))
+
+    assert entry["level"] == "INFO"
+    assert entry["logger"] == "solo.test"
+    assert entry["message"] == "hello world"
+    assert entry["event"] == "user.me"
+    assert entry["user_id"] == 3
+    assert entry["ts"].endswith("+00:00")
+
+
+def test_sampling_filter_only_samples_low_levels():
+    sampler = SamplingFilter({"user.me": 0.0})
+
+    assert not sampler.filter(_record(event="user.me"))
+    assert sampler.filter(_record(event="user.login"))
+    assert sampler.filter(_record())
+    assert sampler.filter(_record(level=logging.WARNING, event="user.me"))
+
+
+def test_records_are_formatted_off_the_calling_thread(log_stream):
+    formatted_on = []
+
+    class Probe:
+        def __str__(self):
+            formatted_on.append(threading.current_thread())
+            return "probe"
+
+    configure_logging(fmt="json", stream=log_stream)
+    logging.getLogger("solo.test").info("value: %s", Probe(), extra={"event": "t"})
+    configure_logging(fmt="json", stream=io.StringIO())  # drains the queue
+
+    (line,) = log_stream.getvalue().splitlines()
+    assert json.loads(line)["message"] == "value: probe"
+    assert json.loads(line)["event"] == "t"
+    # pytest's own capture handlers format on this thread; ours must not.
+    assert any(thread is not threading.current_thread() for thread in formatted_on)
+
+
+def test_sampled_events_are_dropped(log_stream):
+    configure_logging(fmt="text", sample_rates={"noisy": 0.0}, stream=log_stream)
+    logger = logging.getLogger("solo.test")
+    logger.info("dropped", extra={"event": "noisy"})
+    logger.info("kept", extra={"event": "other"})
+    logger.warning("always kept", extra={"event": "noisy"})
+    configure_logging(fmt="json", stream=io.StringIO())
+
+    output = log_stream.getvalue()
+    assert "dropped" not in output
+    assert "INFO in test_logs: kept" in output
+    assert "always kept" in output
@@ -0,0 +1,106 @@
+import os
+import re
+import threading
+
+from flask import Flask
+
+from extensions import metrics
+from metrics import Metrics
+
+
+def _samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    return samples
+
+
+def test_metrics_endpoint_records_requests(logged_in_client):
+    logged_in_client.post("/projects", json={"name": "P", "description": ""})
+    logged_in_client.get("/projects")
+    logged_in_client.get("/projects/999")
+
+    response = logged_in_client.get("/metrics")
+    assert response.status_code == 200
+    assert response.content_type.startswith("text/plain; version=0.0.4")
+
+    samples = _samples(response.get_data(as_text=True))
+    key = 'http_requests_total{endpoint="projects.%s",method="%s",status="%s"}'
+    assert samples[key % ("create_project", "POST", 201)] == 1
+    assert samples[key % ("get_projects", "GET", 200)] == 1
+    assert samples[key % ("get_project", "GET", 404)] == 1
+    assert samples['http_requests_total{endpoint="users.login",method="POST",status="200"}'] == 1
+    # The scrape itself is in flight while it renders.
+    assert samples["http_requests_in_flight"] == 1
+
+
+def test_histograms_are_cumulative(logged_in_client):
+    for _ in range(3):
+        logged_in_client.get("/projects")
+
+    samples = _samples(logged_in_client.get("/metrics").get_data(as_text=True))
+    for name in ("http_request_duration_seconds", "http_request_db_seconds"):
+        labels = 'endpoint="projects.get_projects",method="GET"'
+        buckets = [
+            value
+            for key, value in samples.items()
+            if re.fullmatch(rf'{name}_bucket\{{{labels},le="[^"]+"\}}', key)
+        ]
+        assert buckets == sorted(buckets)
+        assert buckets[-1] == samples[f"{name}_count{{{labels}}}"] == 3
+        assert samples[f"{name}_sum{{{labels}}}"] >= 0
+
+    db_sum = 'http_request_db_seconds_sum{endpoint="projects.get_projects",method="GET"}'
+    assert samples[db_sum] > 0
+
+
+def test_shards_of_finished_threads_are_kept(app, db_session):
+    def worker():
+        client = app.test_client()
+        for _ in range(5):
+            client.get("/")
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    samples = _samples(metrics.render())
+    assert samples['http_requests_total{endpoint="index",method="GET",status="200"}'] == 20
+    assert samples["http_requests_in_flight"] == 0
+    recorder = app.extensions["metrics"]
+    assert all(shard.thread.is_alive() for shard in recorder._shards)
+
+
+def _worker(directory):
+    """A Flask app with metrics of its own, standing in for one gunicorn worker."""
+    app = Flask(__name__)
+    app.config.update(METRICS_DIR=str(directory), METRICS_FLUSH_INTERVAL=3600)
+    app.add_url_rule("/", "index", lambda: "ok")
+    Metrics(app)
+    return app.test_client(), app.extensions["metrics"]
+
+
+def test_render_sums_the_shards_of_every_process(tmp_path):
+    key = 'http_requests_total{endpoint="index",method="GET",status="200"}'
+    workers = [_worker(tmp_path) for _ in range(3)]
+    for count, (client, worker_metrics) in enumerate(workers, start=1):
+        for _ in range(count):
+            client.get("/")
+        worker_metrics.flush()
+
+    # Whichever worker is scraped, it reports the requests all of them served.
+    for _, worker_metrics in workers:
+        assert _samples(worker_metrics.render())[key] == 6
+
+    # A worker that exits keeps its counts, folded into the archive.
+    _, exited = workers.pop()
+    os.rename(exited._path, tmp_path / "999999999-exited.json")
+    assert _samples(workers[0][1].render())[key] == 6
+    files = {os.path.basename(worker_metrics._path) for _, worker_metrics in workers}
+    assert set(os.listdir(tmp_path)) == {".lock", "archive.json", *files}
+    assert _samples(workers[1][1].render())[key] == 6
@@ -0,0 +1,24 @@
+from werkzeug.security import generate_password_hash
+
+from passwords import HashPolicy, verify_password
+
+
+def test_bcrypt_policy_round_trip():
+    """Test that a bcrypt policy hash verifies and matches its own policy"""
+    policy = HashPolicy("bcrypt:4")
+    password_hash = policy.hash("secret")
+
+    assert password_hash.startswith("$2b$04$")
+    assert verify_password(password_hash, "secret")
+    assert not verify_password(password_hash, "wrong")
+    assert not policy.needs_rehash(password_hash)
+    assert HashPolicy("bcrypt:5").needs_rehash(password_hash)
+
+
+def test_werkzeug_policy_uses_canonical_method():
+    """Test that werkzeug defaults don't trigger a rehash on every login"""
+    password_hash = generate_password_hash("secret", method="pbkdf2:sha256:1000")
+
+    assert not HashPolicy("pbkdf2:sha256:1000").needs_rehash(password_hash)
+    assert HashPolicy("pbkdf2:sha256:2000").needs_rehash(password_hash)
+    assert HashPolicy("bcrypt:4").needs_rehash(password_hash)
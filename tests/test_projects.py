@@ -1,4 +1,16 @@
-from projects.models import Project
+import csv
+import io
+import json
+
+import pytest
+from flask import jsonify
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db, response_cache
+from projects import queries
+from projects.models import Project, ProjectMember, ProjectStat
+from projects.schemas import ProjectSchema
 from users.models import User
 
 
@@ -182,3 +194,760 @@ def test_delete_project_not_found(logged_in_client):
     """Test deleting non-existing project"""
     r = logged_in_client.delete("/projects/999")
     assert r.status_code == 404, r.json
+
+
+def test_get_projects_paginates_with_cursor(logged_in_client):
+    """Test walking the project list page by page with the next cursor"""
+    for i in range(5):
+        r = logged_in_client.post(
+            "/projects",
+            json={"name": f"Project {i}", "description": ""},
+        )
+        assert r.status_code == 201, r.json
+
+    seen = []
+    response = logged_in_client.get("/projects?limit=2")
+    while True:
+        assert response.status_code == 200, response.json
+        assert len(response.json) <= 2
+        seen.extend(proj["name"] for proj in response.json)
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if not next_cursor:
+            break
+        assert 'rel="next"' in response.headers["Link"]
+        response = logged_in_client.get(f"/projects?limit=2&after={next_cursor}")
+
+    assert seen == [f"Project {i}" for i in range(5)]
+
+
+def test_get_projects_limit_is_capped(app, logged_in_client, monkeypatch):
+    """Test that the requested page size never exceeds MAX_PAGE_SIZE"""
+    monkeypatch.setitem(app.config, "MAX_PAGE_SIZE", 2)
+    for i in range(3):
+        logged_in_client.post(
+            "/projects",
+            json={"name": f"Project {i}", "description": ""},
+        )
+
+    response = logged_in_client.get("/projects?limit=1000")
+    assert response.status_code == 200, response.json
+    assert len(response.json) == 2
+    assert "X-Next-Cursor" in response.headers
+
+
+def test_get_projects_invalid_cursor(logged_in_client):
+    """Test that a cursor we did not issue is rejected"""
+    response = logged_in_client.get("/projects?after=not-a-cursor")
+    assert response.status_code == 400, response.json
+    assert "error" in response.json
+
+
+def test_create_projects_batch_success(logged_in_client):
+    """Test creating several projects in one request"""
+    batch = [{"name": f"Batch {i}", "description": "Imported"} for i in range(3)]
+    response = logged_in_client.post("/projects/batch", json=batch)
+
+    assert response.status_code == 201, response.json
+    assert response.json["created"] == 3
+    assert [result["status"] for result in response.json["results"]] == [201] * 3
+
+    names = [proj["name"] for proj in logged_in_client.get("/projects").json]
+    assert names == ["Batch 0", "Batch 1", "Batch 2"]
+
+
+def test_create_projects_batch_keeps_input_order(logged_in_client):
+    """Test that each returned id belongs to the item at its index"""
+    # Free the highest rowid, so the batch starts by reusing it.
+    logged_in_client.post("/projects/batch", json=[{"name": "Old"}] * 3)
+    newest = Project.query.order_by(Project.id.desc()).first()
+    Project.query.filter_by(id=newest.id).delete()
+    db.session.commit()
+
+    # More rows than one insertmanyvalues page, so several INSERTs run.
+    batch = [{"name": f"Batch {i}"} for i in range(2500)]
+    response = logged_in_client.post("/projects/batch", json=batch)
+
+    assert response.status_code == 201
+    names = dict(db.session.execute(select(Project.id, Project.name)).all())
+    for result in response.json["results"]:
+        assert names[result["id"]] == f"Batch {result['index']}"
+
+
+def test_create_projects_batch_partial_failure(logged_in_client):
+    """Test that invalid items are reported without rejecting the rest"""
+    batch = [
+        {"name": "Good project"},
+        {"description": "Project without a name"},
+    ]
+    response = logged_in_client.post("/projects/batch", json=batch)
+
+    assert response.status_code == 207, response.json
+    first, second = response.json["results"]
+    assert first["index"] == 0 and first["status"] == 201 and "id" in first
+    assert second["index"] == 1 and second["status"] == 400
+    assert "Missing data for required field." in second["errors"]["name"]
+
+
+def test_create_projects_batch_rejects_non_list(logged_in_client):
+    """Test that the batch endpoint only accepts a non-empty list"""
+    response = logged_in_client.post("/projects/batch", json={"name": "Single"})
+    assert response.status_code == 400, response.json
+
+
+def _count_queries(client, url):
+    statements = []
+
+    def record(_conn, _cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200, response.json
+    return len(statements)
+
+
+def _add_projects_with_members(db_session, start, stop):
+    creator = db_session.get(User, 1)
+    for i in range(start, stop):
+        member = User(
+            username=f"member{i}",
+            email=f"member{i}@example.com",
+            password_hash="hashedpassword",
+        )
+        db_session.add(Project(name=f"Project {i}", creator=creator, members=[member]))
+    db_session.commit()
+
+
+def test_get_projects_query_count_is_constant(logged_in_client, db_session):
+    """Test that listing N projects with creator and members avoids N+1"""
+    logged_in_client.get("/me")  # warm the identity cache
+    _add_projects_with_members(db_session, 0, 2)
+    few = _count_queries(logged_in_client, "/projects")
+
+    _add_projects_with_members(db_session, 2, 8)
+    response_cache.clear()
+    many = _count_queries(logged_in_client, "/projects")
+
+    response = logged_in_client.get("/projects")
+    assert len(response.json) == 8
+    assert all(len(proj["members"]) == 1 for proj in response.json)
+    assert many == few
+
+
+def test_get_project_loads_relationships_eagerly(logged_in_client, db_session):
+    """Test that the detail endpoint loads creator and members up front"""
+    _add_projects_with_members(db_session, 0, 1)
+    url = f"/projects/{Project.query.first().id}"
+    logged_in_client.get("/me")  # warm the identity cache
+
+    assert _count_queries(logged_in_client, url) == 2
+
+
+def test_get_projects_sparse_fieldset(logged_in_client, db_session):
+    """Test that ?fields= narrows both the response and the SQL"""
+    _add_projects_with_members(db_session, 0, 2)
+    logged_in_client.get("/me")  # warm the identity cache
+
+    statements = []
+
+    def record(_conn, _cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        response = logged_in_client.get("/projects?fields=id,name,status")
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert response.status_code == 200, response.json
+    assert all(set(proj) == {"id", "name", "status"} for proj in response.json)
+    assert len(statements) == 1
+    assert "description" not in statements[0]
+    assert "project_members" not in statements[0]
+
+
+def test_get_project_sparse_fieldset(logged_in_client, db_session):
+    """Test ?fields= on the detail endpoint"""
+    _add_projects_with_members(db_session, 0, 1)
+    project_id = Project.query.first().id
+
+    response = logged_in_client.get(f"/projects/{project_id}?fields=name,members")
+    assert response.status_code == 200, response.json
+    assert set(response.json) == {"name", "members"}
+    assert response.json["members"][0]["username"] == "member0"
+
+
+def test_get_projects_unknown_field(logged_in_client):
+    """Test that asking for a field the schema doesn't have is rejected"""
+    response = logged_in_client.get("/projects?fields=id,secret")
+    assert response.status_code == 400, response.json
+    assert "secret" in response.json["error"]
+
+
+def test_get_projects_fast_path_matches_schema(app, logged_in_client, db_session):
+    """Test that the ORM-free listing is byte-identical to the schema dump"""
+    _add_projects_with_members(db_session, 0, 3)
+
+    response = logged_in_client.get("/projects")
+    projects = Project.query.order_by(Project.id).all()
+    with app.test_request_context():
+        expected = jsonify(ProjectSchema(many=True).dump(projects)).get_data()
+
+    assert response.get_data() == expected
+
+
+def test_get_project_conditional_request(logged_in_client, assert_max_queries):
+    """Test ETag / If-None-Match on the project detail endpoint"""
+    r = logged_in_client.post("/projects", json={"name": "Cached", "description": ""})
+    url = f"/projects/{r.json['id']}"
+
+    response = logged_in_client.get(url)
+    etag = response.headers["ETag"]
+    assert response.status_code == 200
+
+    # Uncached, a 304 is answered before the members are queried.
+    response_cache.clear()
+    with assert_max_queries(1):
+        response = logged_in_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.get_data() == b""
+    assert response.headers["ETag"] == etag
+
+    logged_in_client.put(url, json={"name": "Renamed"})
+    response = logged_in_client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json["name"] == "Renamed"
+    assert response.headers["ETag"] != etag
+
+
+def test_get_projects_conditional_request(logged_in_client):
+    """Test the collection ETag changes when the listing does"""
+    logged_in_client.post("/projects", json={"name": "First", "description": ""})
+
+    etag = logged_in_client.get("/projects").headers["ETag"]
+    response = logged_in_client.get("/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    response = logged_in_client.get(
+        "/projects?fields=id", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+    logged_in_client.post("/projects", json={"name": "Second", "description": ""})
+    response = logged_in_client.get("/projects", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json) == 2
+
+
+def test_project_timestamps_set_per_write(logged_in_client, db_session):
+    """Test created_at/updated_at defaults are evaluated on every write"""
+    first = Project(name="First")
+    db_session.add(first)
+    db_session.commit()
+    second = Project(name="Second")
+    db_session.add(second)
+    db_session.commit()
+    assert second.created_at > first.created_at
+
+    created = first.updated_at
+    first.name = "First renamed"
+    db_session.commit()
+    assert first.updated_at > created
+
+
+def test_project_reads_are_cached_and_invalidated(app, logged_in_client):
+    """Test cache hits for repeated reads and invalidation on writes"""
+    r = logged_in_client.post("/projects", json={"name": "Cached", "description": ""})
+    url = f"/projects/{r.json['id']}"
+
+    before = response_cache.stats()
+    first = logged_in_client.get(url)
+    second = logged_in_client.get(url)
+    after = response_cache.stats()
+
+    assert second.get_data() == first.get_data()
+    assert second.headers["ETag"] == first.headers["ETag"]
+    assert after["hits"] == before["hits"] + 1
+    assert after["misses"] == before["misses"] + 1
+
+    logged_in_client.get("/projects")
+    logged_in_client.put(url, json={"name": "Renamed"})
+    assert logged_in_client.get(url).json["name"] == "Renamed"
+    assert logged_in_client.get("/projects").json[0]["name"] == "Renamed"
+
+    logged_in_client.delete(url)
+    assert logged_in_client.get(url).status_code == 404
+    assert logged_in_client.get("/projects").json == []
+
+    stats = logged_in_client.get("/cache/stats").json
+    assert stats["backend"] == "MemoryBackend"
+    assert stats["hits"] >= 1
+
+
+def test_member_changes_invalidate_cached_reads(logged_in_client, db_session):
+    """Test that renaming a member refreshes the bodies and ETags embedding it"""
+    _add_projects_with_members(db_session, 0, 1)
+    url = f"/projects/{Project.query.first().id}"
+    detail = logged_in_client.get(url)
+    listing = logged_in_client.get("/projects")
+
+    member = User.query.filter_by(username="member0").first()
+    member.email = "renamed@example.com"
+    db_session.flush()
+    # Nothing is dropped until the rename commits.
+    assert logged_in_client.get(url).get_data() == detail.get_data()
+    db_session.commit()
+
+    response = logged_in_client.get(
+        url, headers={"If-None-Match": detail.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.json["members"][0]["email"] == "renamed@example.com"
+    response = logged_in_client.get(
+        "/projects", headers={"If-None-Match": listing.headers["ETag"]}
+    )
+    assert response.status_code == 200
+    assert response.json[0]["members"][0]["email"] == "renamed@example.com"
+
+
+def test_project_endpoints_query_budgets(
+    logged_in_client, db_session, assert_max_queries
+):
+    """Test that each endpoint stays within its query budget"""
+    _add_projects_with_members(db_session, 0, 5)
+    logged_in_client.get("/me")  # warm the identity cache
+    project_id = Project.query.first().id
+    url = f"/projects/{project_id}"
+
+    with assert_max_queries(2):
+        assert logged_in_client.get("/projects").status_code == 200
+    with assert_max_queries(0):
+        assert logged_in_client.get("/projects").status_code == 200
+    with assert_max_queries(2):
+        assert logged_in_client.get(url).status_code == 200
+    with assert_max_queries(0):
+        assert logged_in_client.get(url).status_code == 200
+    with assert_max_queries(2):
+        response = logged_in_client.get("/projects/search?q=project")
+        assert response.status_code == 200
+    with assert_max_queries(1):
+        assert logged_in_client.get("/projects/stats").status_code == 200
+
+    with assert_max_queries(4):
+        response = logged_in_client.post(
+            "/projects", json={"name": "New", "description": ""}
+        )
+        assert response.status_code == 201
+
+    batch = [{"name": f"Batch {i}", "description": ""} for i in range(50)]
+    with assert_max_queries(1) as profile:
+        assert logged_in_client.post("/projects/batch", json=batch).status_code == 201
+    assert not profile.repeated()
+
+    with assert_max_queries(6):
+        response = logged_in_client.put(url, json={"name": "Renamed"})
+        assert response.status_code == 200
+    with assert_max_queries(4):
+        assert logged_in_client.delete(url).status_code == 204
+
+
+def _search(client, q, **args):
+    response = client.get("/projects/search", query_string={"q": q, **args})
+    assert response.status_code == 200, response.json
+    return response
+
+
+def test_search_projects_ranks_and_follows_writes(logged_in_client):
+    """Test that search is ranked and kept in sync with creates, updates and deletes"""
+    in_description = logged_in_client.post(
+        "/projects", json={"name": "Website", "description": "Roadmap for Q3"}
+    ).json["id"]
+    in_name = logged_in_client.post(
+        "/projects", json={"name": "Roadmap", "description": "Planning"}
+    ).json["id"]
+    logged_in_client.post("/projects/batch", json=[{"name": "Road signs"}])
+
+    results = _search(logged_in_client, "roadmap").json
+    assert [item["id"] for item in results] == [in_name, in_description]
+    assert results[0]["creator"]["username"] == "test_user"
+    assert results[0]["members"] == []
+
+    # The last word matches as a prefix, everything else as a whole word.
+    assert len(_search(logged_in_client, "road").json) == 3
+    assert _search(logged_in_client, "roadmap q").json[0]["id"] == in_description
+
+    logged_in_client.put(f"/projects/{in_name}", json={"name": "Launch"})
+    assert _search(logged_in_client, "launch").json[0]["id"] == in_name
+    assert [item["id"] for item in _search(logged_in_client, "roadmap").json] == [
+        in_description
+    ]
+
+    logged_in_client.delete(f"/projects/{in_description}")
+    assert _search(logged_in_client, "roadmap").json == []
+
+
+def test_search_projects_only_returns_visible_projects(logged_in_client, db_session):
+    """Test that search finds own and joined projects but not other users'"""
+    current = db_session.get(User, 1)
+    other_user = User(
+        username="otheruser",
+        email="otheruser@example.com",
+        password_hash="hashedpassword",
+    )
+    db_session.add_all(
+        [
+            Project(name="Apollo mine", creator=current),
+            Project(name="Apollo joined", creator=other_user, members=[current]),
+            Project(name="Apollo hidden", creator=other_user),
+        ]
+    )
+    db_session.commit()
+
+    names = {item["name"] for item in _search(logged_in_client, "apollo").json}
+    assert names == {"Apollo mine", "Apollo joined"}
+
+
+def test_search_projects_paginates_with_cursor(logged_in_client):
+    """Test walking search results page by page with the next cursor"""
+    for i in range(5):
+        logged_in_client.post("/projects", json={"name": f"Search {i}", "description": ""})
+
+    seen = []
+    args = {"limit": 2, "fields": "id"}
+    while True:
+        response = _search(logged_in_client, "search", **args)
+        seen.extend(item["id"] for item in response.json)
+        if "X-Next-Cursor" not in response.headers:
+            break
+        args["after"] = response.headers["X-Next-Cursor"]
+
+    assert len(seen) == 5
+    assert len(set(seen)) == 5
+
+
+def test_search_projects_invalid_query(logged_in_client):
+    """Test that queries without words are rejected and FTS syntax is ignored"""
+    for q in ("", "  ", '"*()'):
+        response = logged_in_client.get("/projects/search", query_string={"q": q})
+        assert response.status_code == 400, response.json
+        assert "q must contain" in response.json["error"]
+
+    logged_in_client.post("/projects", json={"name": "Alpha", "description": ""})
+    assert len(_search(logged_in_client, 'alpha" OR NEAR(').json) == 0
+    assert len(_search(logged_in_client, '"alpha"').json) == 1
+
+
+def _add_users(db_session, count):
+    users = [
+        User(
+            username=f"teammate{i}",
+            email=f"teammate{i}@example.com",
+            password_hash="hashedpassword",
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(users)
+    db_session.commit()
+    return [user.id for user in users]
+
+
+def test_add_and_remove_project_members(logged_in_client, db_session):
+    """Test bulk adding and removing members, ignoring no-op ids"""
+    user_ids = _add_users(db_session, 3)
+    project_id = logged_in_client.post(
+        "/projects", json={"name": "Team", "description": ""}
+    ).json["id"]
+    url = f"/projects/{project_id}/members"
+    before = logged_in_client.get(f"/projects/{project_id}")
+
+    r = logged_in_client.post(url, json={"user_ids": [*user_ids, user_ids[0], 999]})
+    assert r.status_code == 200, r.json
+    assert r.json == {"added": user_ids, "ignored": [999]}
+
+    r = logged_in_client.post(url, json={"user_ids": user_ids[:1]})
+    assert r.json == {"added": [], "ignored": user_ids[:1]}
+
+    after = logged_in_client.get(f"/projects/{project_id}")
+    assert [member["id"] for member in after.json["members"]] == user_ids
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+    r = logged_in_client.delete(url, json={"user_ids": [user_ids[1], 999]})
+    assert r.status_code == 200, r.json
+    assert r.json == {"removed": [user_ids[1]], "ignored": [999]}
+
+    members = logged_in_client.get(f"/projects/{project_id}").json["members"]
+    assert [member["id"] for member in members] == [user_ids[0], user_ids[2]]
+
+
+def test_project_members_are_unique(logged_in_client, db_session):
+    """Test that the same membership cannot be stored twice"""
+    (user_id,) = _add_users(db_session, 1)
+    project = Project(name="Unique", creator_id=1)
+    db_session.add(project)
+    db_session.commit()
+
+    db_session.add_all(
+        [
+            ProjectMember(project_id=project.id, user_id=user_id),
+            ProjectMember(project_id=project.id, user_id=user_id),
+        ]
+    )
+    with pytest.raises(IntegrityError):
+        db_session.commit()
+    db_session.rollback()
+
+
+def test_change_project_members_errors(logged_in_client, db_session):
+    """Test membership changes on missing, foreign and malformed input"""
+    other_user = User(
+        username="otheruser",
+        email="otheruser@example.com",
+        password_hash="hashedpassword",
+    )
+    project = Project(name="Other user's project", creator=other_user)
+    db_session.add(project)
+    db_session.commit()
+
+    body = {"user_ids": [1]}
+    assert logged_in_client.post("/projects/999/members", json=body).status_code == 404
+    r = logged_in_client.post(f"/projects/{project.id}/members", json=body)
+    assert r.status_code == 403, r.json
+    r = logged_in_client.delete(f"/projects/{project.id}/members", json=body)
+    assert r.status_code == 403, r.json
+
+    own_id = logged_in_client.post(
+        "/projects", json={"name": "Mine", "description": ""}
+    ).json["id"]
+    for bad in ({}, {"user_ids": []}, {"user_ids": ["1"]}, [1]):
+        r = logged_in_client.post(f"/projects/{own_id}/members", json=bad)
+        assert r.status_code == 400, (bad, r.json)
+
+
+def test_change_project_members_limit(app, logged_in_client, monkeypatch):
+    """Test that oversized membership changes are rejected"""
+    monkeypatch.setitem(app.config, "MEMBERS_BATCH_MAX_SIZE", 2)
+    project_id = logged_in_client.post(
+        "/projects", json={"name": "Small", "description": ""}
+    ).json["id"]
+
+    r = logged_in_client.post(
+        f"/projects/{project_id}/members", json={"user_ids": [1, 2, 3]}
+    )
+    assert r.status_code == 413, r.json
+
+
+def test_get_joined_projects(logged_in_client, db_session):
+    """Test listing the projects the current user is a member of"""
+    current = db_session.get(User, 1)
+    other_user = User(
+        username="otheruser",
+        email="otheruser@example.com",
+        password_hash="hashedpassword",
+    )
+    db_session.add_all(
+        [
+            Project(name=f"Joined {i}", creator=other_user, members=[current])
+            for i in range(3)
+        ]
+        + [Project(name="Not joined", creator=other_user)]
+    )
+    db_session.add(Project(name="Own", creator=current))
+    db_session.commit()
+
+    seen = []
+    url = "/projects/joined?limit=2"
+    while url:
+        r = logged_in_client.get(url)
+        assert r.status_code == 200, r.json
+        seen.extend(r.json)
+        url = None
+        if "X-Next-Cursor" in r.headers:
+            url = f"/projects/joined?limit=2&after={r.headers['X-Next-Cursor']}"
+
+    assert [project["name"] for project in seen] == [f"Joined {i}" for i in range(3)]
+    assert seen[0]["creator"]["username"] == "otheruser"
+    assert [member["id"] for member in seen[0]["members"]] == [1]
+
+
+def test_project_members_query_budgets(
+    logged_in_client, db_session, assert_max_queries
+):
+    """Test that membership changes cost the same for one user or fifty"""
+    user_ids = _add_users(db_session, 50)
+    logged_in_client.get("/me")  # warm the identity cache
+    project_id = logged_in_client.post(
+        "/projects", json={"name": "Team", "description": ""}
+    ).json["id"]
+    url = f"/projects/{project_id}/members"
+
+    with assert_max_queries(3) as profile:
+        r = logged_in_client.post(url, json={"user_ids": user_ids})
+        assert len(r.json["added"]) == 50
+    assert not profile.repeated()
+    # +1: the test client shares one session, so the committed current
+    # user is refreshed.
+    with assert_max_queries(4):
+        r = logged_in_client.delete(url, json={"user_ids": user_ids})
+        assert len(r.json["removed"]) == 50
+    with assert_max_queries(2):
+        assert logged_in_client.get("/projects/joined").status_code == 200
+
+
+def test_project_stats_follow_writes(logged_in_client, db_session):
+    """Test that per-status counts track creates, status changes and deletes"""
+    def stats():
+        r = logged_in_client.get("/projects/stats")
+        assert r.status_code == 200, r.json
+        return r.json
+
+    assert stats() == {"total": 0, "by_status": {}}
+
+    ids = [
+        logged_in_client.post(
+            "/projects", json={"name": f"Stat {i}", "description": ""}
+        ).json["id"]
+        for i in range(3)
+    ]
+    logged_in_client.post("/projects/batch", json=[{"name": "Batch"}] * 2)
+    assert stats() == {"total": 5, "by_status": {"Active": 5}}
+
+    logged_in_client.put(f"/projects/{ids[0]}", json={"status": "Completed"})
+    logged_in_client.put(f"/projects/{ids[1]}", json={"name": "Renamed"})
+    assert stats() == {"total": 5, "by_status": {"Active": 4, "Completed": 1}}
+
+    logged_in_client.delete(f"/projects/{ids[0]}")
+    logged_in_client.delete(f"/projects/{ids[1]}")
+    assert stats() == {"total": 3, "by_status": {"Active": 3}}
+
+    # Other users' projects are counted separately.
+    other_user = User(
+        username="otheruser",
+        email="otheruser@example.com",
+        password_hash="hashedpassword",
+    )
+    db_session.add(Project(name="Other", creator=other_user))
+    db_session.commit()
+    assert stats()["total"] == 3
+
+
+def test_rebuild_project_stats_command(app, logged_in_client, db_session):
+    """Test that the CLI recounts the stats from the project table"""
+    logged_in_client.post("/projects/batch", json=[{"name": "Batch"}] * 3)
+    db_session.execute(
+        ProjectStat.__table__.update().values(count=ProjectStat.count + 10)
+    )
+    db_session.commit()
+    assert logged_in_client.get("/projects/stats").json["total"] == 13
+
+    result = app.test_cli_runner().invoke(args=["projects", "rebuild-stats"])
+    assert result.exit_code == 0, result.output
+    assert "Rebuilt 1 project counters" in result.output
+
+    db_session.expire_all()
+    assert logged_in_client.get("/projects/stats").json["by_status"] == {"Active": 3}
+
+
+def test_export_projects_streams_ndjson_in_batches(
+    app, logged_in_client, db_session, monkeypatch
+):
+    """Test that the export streams only the user's projects, a batch per chunk"""
+    monkeypatch.setitem(app.config, "EXPORT_BATCH_SIZE", 2)
+    logged_in_client.post(
+        "/projects/batch", json=[{"name": f"Export {i}"} for i in range(5)]
+    )
+    other_user = User(
+        username="otheruser",
+        email="otheruser@example.com",
+        password_hash="hashedpassword",
+    )
+    db_session.add(Project(name="Other", creator=other_user))
+    db_session.commit()
+
+    response = logged_in_client.get("/projects/export", buffered=False)
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert response.mimetype == "application/x-ndjson"
+    chunks = list(response.response)
+    response.close()
+
+    assert len(chunks) == 3
+    rows = [json.loads(line) for line in b"".join(chunks).splitlines()]
+    assert [row["name"] for row in rows] == [f"Export {i}" for i in range(5)]
+    assert rows[0]["creator_id"] == 1
+    assert rows[0]["status"] == "Active"
+    assert set(rows[0]) == {
+        "id",
+        "name",
+        "description",
+        "status",
+        "created_at",
+        "updated_at",
+        "creator_id",
+    }
+
+
+def test_export_projects_csv(logged_in_client):
+    """Test exporting projects as CSV with a header row"""
+    logged_in_client.post(
+        "/projects", json={"name": "Comma, quoted", "description": 'say "hi"'}
+    )
+
+    response = logged_in_client.get("/projects/export?format=csv")
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert 'filename="projects.csv"' in response.headers["Content-Disposition"]
+    (row,) = csv.DictReader(io.StringIO(response.get_data(as_text=True)))
+    assert row["name"] == "Comma, quoted"
+    assert row["description"] == 'say "hi"'
+
+
+def test_export_projects_unknown_format(logged_in_client):
+    """Test that unsupported export formats are rejected"""
+    response = logged_in_client.get("/projects/export?format=xml")
+    assert response.status_code == 400, response.json
+
+
+def test_export_projects_command(
+    app, logged_in_client, db_session, tmp_path, monkeypatch
+):
+    """Test exporting every project, or one user's, from the CLI"""
+    logged_in_client.post("/projects/batch", json=[{"name": "Mine"}] * 2)
+    other_user = User(
+        username="otheruser",
+        email="otheruser@example.com",
+        password_hash="hashedpassword",
+    )
+    db_session.add(Project(name="Other", creator=other_user))
+    db_session.commit()
+    runner = app.test_cli_runner()
+
+    destination = tmp_path / "projects.csv"
+    result = runner.invoke(
+        args=["projects", "export", str(destination), "--batch-size", "1"]
+    )
+    assert result.exit_code == 0, result.output
+    with open(destination, newline="") as f:
+        assert [row["name"] for row in csv.DictReader(f)] == ["Mine", "Mine", "Other"]
+
+    result = runner.invoke(args=["projects", "export", "--user", str(other_user.id)])
+    assert result.exit_code == 0, result.output
+    assert [json.loads(line)["name"] for line in result.output.splitlines()] == [
+        "Other"
+    ]
+
+    # Without --batch-size, the app's EXPORT_BATCH_SIZE applies.
+    batch_sizes = []
+    export_rows = queries.export_rows
+
+    def record_batch_size(batch_size, user_id=None):
+        batch_sizes.append(batch_size)
+        return export_rows(batch_size, user_id)
+
+    monkeypatch.setattr(queries, "export_rows", record_batch_size)
+    monkeypatch.setitem(app.config, "EXPORT_BATCH_SIZE", 7)
+    assert runner.invoke(args=["projects", "export"]).exit_code == 0
+    assert batch_sizes == [7]
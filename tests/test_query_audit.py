@@ -0,0 +1,29 @@
+from query_audit import full_scans
+
+
+def test_audit_queries_passes_on_current_schema(app, db_session):
+    """Test that no query issued by the blueprints scans a whole table"""
+    result = app.test_cli_runner().invoke(args=["audit-queries"])
+    assert result.exit_code == 0, result.output
+    assert "[FAIL]" not in result.output
+
+
+def test_full_scans_detects_table_scan():
+    """Test that only plain table scans are reported"""
+    plan = [
+        "SCAN project",
+        "SCAN project USING INDEX ix_project_creator_id",
+        "SEARCH user USING INTEGER PRIMARY KEY (rowid=?)",
+    ]
+    assert full_scans(plan) == ["SCAN project"]
+
+
+def test_full_scans_reads_pre_3_36_plans():
+    """Test that the older "SCAN TABLE" plan format is understood"""
+    plan = [
+        "SCAN TABLE project",
+        "SCAN TABLE project AS p",
+        "SCAN TABLE project USING INDEX ix_project_creator_id",
+        "SEARCH TABLE user USING INTEGER PRIMARY KEY (rowid=?)",
+    ]
+    assert full_scans(plan) == ["SCAN TABLE project", "SCAN TABLE project AS p"]
@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pytest
+from flask import jsonify
+from marshmallow import Schema
+from marshmallow.fields import Float
+
+from fieldsets import schema_for
+from projects.models import Project
+from projects.schemas import ProjectSchema
+from serializers import UnsupportedField, compile_serializer
+from users.models import User
+
+
+@pytest.fixture
+def projects_with_members(db_session):
+    creator = User(username="créateur", email="c@example.com", password_hash="x")
+    member = User(username='quote"member', email="m@example.com", password_hash="x")
+    db_session.add_all(
+        [
+            Project(
+                name="Ünïcode ✓ project",
+                description="line\nbreak\\slash",
+                creator=creator,
+                members=[member, creator],
+                created_at=datetime(2025, 1, 2, 3, 4, 5, 678901),
+                updated_at=datetime(2025, 1, 2, 3, 4, 5),
+            ),
+            Project(name="No description", creator=creator),
+            Project(name="Orphan"),
+        ]
+    )
+    db_session.commit()
+    return Project.query.order_by(Project.id).all()
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [None, frozenset({"id", "name", "status"}), frozenset({"members", "creator"})],
+)
+def test_compiled_serializer_matches_jsonify(app, projects_with_members, fields):
+    """Test byte-identical output to jsonify(schema.dump(...))"""
+    schema = schema_for(ProjectSchema, fields, many=True)
+    expected = jsonify(schema.dump(projects_with_members)).get_data()
+
+    columns = Project.__table__.columns.keys()
+    rows = [
+        {
+            **{name: getattr(project, name) for name in columns},
+            "creator": project.creator and {
+                "id": project.creator.id,
+                "username": project.creator.username,
+                "email": project.creator.email,
+            },
+            "members": [
+                {"id": m.id, "username": m.username, "email": m.email}
+                for m in project.members
+            ],
+        }
+        for project in projects_with_members
+    ]
+    assert compile_serializer(schema).dumps(rows) == expected
+
+
+def test_compiled_serializer_rejects_unsupported_fields():
+    """Test that unknown field types are refused instead of guessed"""
+
+    class PriceSchema(Schema):
+        price = Float()
+
+    with pytest.raises(UnsupportedField):
+        compile_serializer(PriceSchema())
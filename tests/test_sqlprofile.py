@@ -0,0 +1,67 @@
+import logging
+
+from extensions import sql_profiler
+from projects.models import Project
+from sqlprofile import QueryProfile, statement_shape
+from users.models import User
+
+
+def test_statement_shape_collapses_placeholder_lists():
+    a = "SELECT *\n  FROM user WHERE id IN (?, ?, ?)"
+    b = "SELECT * FROM user WHERE id IN (?,?)"
+    assert statement_shape(a) == statement_shape(b)
+    assert statement_shape(a) == "SELECT * FROM user WHERE id IN (?)"
+
+
+def test_profile_reports_repeated_shapes():
+    profile = QueryProfile()
+    profile.statements = [
+        ("SELECT * FROM user WHERE id = ?", 0.001),
+        ("SELECT * FROM user WHERE id = ?", 0.002),
+        ("SELECT * FROM project", 0.003),
+    ]
+    assert profile.count == 3
+    assert profile.repeated() == {"SELECT * FROM user WHERE id = ?": 2}
+    assert profile.report().splitlines()[:2] == [
+        "3 queries, 6.0ms SQL",
+        "  2x SELECT * FROM user WHERE id = ?",
+    ]
+
+
+def test_profile_collects_statements(app, db_session):
+    with sql_profiler.profile() as outer:
+        db_session.query(User).all()
+        with sql_profiler.profile() as inner:
+            db_session.query(Project).all()
+    assert outer.count == 2
+    assert inner.count == 1
+
+
+def test_repeated_queries_are_logged(app, db_session, caplog, monkeypatch):
+    monkeypatch.setitem(app.config, "SQL_PROFILE_REPEAT_THRESHOLD", 3)
+    creator = User(username="creator", email="c@example.com", password_hash="x")
+    db_session.add_all(Project(name=f"P{i}", creator=creator) for i in range(3))
+    db_session.commit()
+    project_ids = [project.id for project in Project.query.all()]
+
+    with caplog.at_level(logging.WARNING, logger="sqlprofile"):
+        with app.test_request_context("/projects"):
+            app.preprocess_request()
+            for project_id in project_ids:
+                db_session.expunge_all()
+                db_session.get(Project, project_id)
+            app.do_teardown_request()
+
+    (record,) = [r for r in caplog.records if "[SQL]" in r.getMessage()]
+    assert "[Repeated queries] GET /projects" in record.getMessage()
+    assert "3x SELECT project.id" in record.getMessage()
+
+
+def test_slow_requests_are_logged(app, logged_in_client, caplog, monkeypatch):
+    monkeypatch.setitem(app.config, "SQL_PROFILE_SLOW_MS", 0)
+    with caplog.at_level(logging.WARNING, logger="sqlprofile"):
+        logged_in_client.get("/projects")
+
+    (record,) = [r for r in caplog.records if "[SQL]" in r.getMessage()]
+    assert "[Slow request] GET /projects" in record.getMessage()
+    assert "queries" in record.getMessage()
@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from storage import PRODUCTION_PRAGMAS, listen_sqlite_pragmas, sqlite_pragmas_from_env
+
+
+def test_production_pragmas_applied_to_new_connections(tmp_path):
+    """Test that every pooled connection gets the production PRAGMAs"""
+    engine = create_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    listen_sqlite_pragmas(engine, PRODUCTION_PRAGMAS)
+
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA temp_store")).scalar() == 2  # MEMORY
+    engine.dispose()
+
+
+def test_sqlite_pragmas_from_env():
+    """Test profile selection and per-PRAGMA overrides"""
+    assert sqlite_pragmas_from_env({}) == PRODUCTION_PRAGMAS
+    assert sqlite_pragmas_from_env({"SQLITE_PROFILE": "default"}) == {}
+
+    pragmas = sqlite_pragmas_from_env({"SQLITE_BUSY_TIMEOUT": "100"})
+    assert pragmas["busy_timeout"] == "100"
+
+    with pytest.raises(ValueError):
+        sqlite_pragmas_from_env({"SQLITE_PROFILE": "turbo"})
@@ -1,5 +1,9 @@
+import threading
+
 import pytest
+from werkzeug.security import check_password_hash, generate_password_hash
 
+from passwords import HashPolicy
 from users.models import User
 
 
@@ -132,3 +136,150 @@ def test_get_current_user_unauthorized(test_client):
 
     assert response.status_code == 401
     assert "Missing Authorization Header" in response.json["msg"]
+
+
+def test_register_fails_fast_when_hashing_queue_full(app, test_client, monkeypatch):
+    """Test that registration sheds load with 503 when no hashing slot is free"""
+    pool = app.extensions["password_pool"]
+    monkeypatch.setattr(pool, "slots", threading.BoundedSemaphore(1))
+    pool.slots.acquire()
+
+    response = test_client.post(
+        "/register",
+        json={
+            "username": "busyuser",
+            "password": "busypass",
+            "email": "busyuser@example.com",
+        },
+    )
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(pool.retry_after)
+    assert User.query.filter_by(username="busyuser").first() is None
+
+
+def test_login_rehashes_outdated_password(app, test_client, db_session, monkeypatch):
+    """Test that login upgrades a hash made with an outdated policy"""
+    user = User(
+        username="legacyuser",
+        email="legacyuser@example.com",
+        password_hash=generate_password_hash(
+            "legacypass", method="pbkdf2:sha256:1000"
+        ),
+    )
+    db_session.add(user)
+    db_session.commit()
+    monkeypatch.setattr(
+        app.extensions["password_pool"], "policy", HashPolicy("bcrypt:4")
+    )
+
+    response = test_client.post(
+        "/login",
+        json={"username": "legacyuser", "password": "legacypass"},
+    )
+    assert response.status_code == 200
+
+    db_session.refresh(user)
+    assert user.password_hash.startswith("$2b$04$")
+
+    response = test_client.post(
+        "/login",
+        json={"username": "legacyuser", "password": "legacypass"},
+    )
+    assert response.status_code == 200
+
+
+def test_hash_benchmark_command(app):
+    """Test that the benchmark reports one line per policy"""
+    result = app.test_cli_runner().invoke(
+        args=["users", "hash-benchmark", "--policy", "bcrypt:4", "--iterations", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "bcrypt:4" in result.output
+
+
+def test_import_users_command(app, db_session, tmp_path):
+    """Test importing users from CSV, skipping invalid and duplicate rows"""
+    db_session.add(
+        User(username="existing", email="existing@example.com", password_hash="x")
+    )
+    db_session.commit()
+
+    source = tmp_path / "users.csv"
+    source.write_text(
+        "username,email,password\n"
+        "alice,alice@example.com,alicepass\n"
+        "existing,other@example.com,pass\n"
+        "bob,not-an-email,bobpass\n"
+        "carol,carol@example.com,carolpass\n"
+        "alice,alice2@example.com,alicepass\n"
+    )
+
+    result = app.test_cli_runner().invoke(
+        args=["users", "import", str(source), "--workers", "0", "--batch-size", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    assert "2 imported, 3 skipped" in result.output
+    assert "duplicate username 'existing'" in result.output
+
+    alice = User.query.filter_by(username="alice").first()
+    assert alice.email == "alice@example.com"
+    assert check_password_hash(alice.password_hash, "alicepass")
+    assert User.query.filter_by(username="carol").first() is not None
+    assert User.query.filter_by(username="bob").first() is None
+
+
+def test_import_users_command_ndjson(app, db_session, tmp_path):
+    """Test importing users from NDJSON with parallel hashing"""
+    source = tmp_path / "users.ndjson"
+    source.write_text(
+        '{"username": "dave", "email": "dave@example.com", "password": "p1"}\n'
+        "\n"
+        '{"username": "erin", "email": "erin@example.com", "password": "p2"}\n'
+    )
+
+    result = app.test_cli_runner().invoke(
+        args=["users", "import", str(source), "--workers", "2"]
+    )
+    assert result.exit_code == 0, result.output
+    assert User.query.filter(User.username.in_(["dave", "erin"])).count() == 2
+
+
+def test_import_users_command_skips_malformed_lines(app, db_session, tmp_path):
+    """Test that lines which are not JSON objects are reported, not fatal"""
+    source = tmp_path / "users.ndjson"
+    source.write_text(
+        "5\n"
+        '"x_error"\n'
+        "{not json\n"
+        '{"username": "fay", "email": "fay@example.com", "password": "p1"}\n'
+    )
+
+    result = app.test_cli_runner().invoke(args=["users", "import", str(source)])
+    assert result.exit_code == 0, result.output
+    assert "record 1: expected an object, got int" in result.output
+    assert "record 2: expected an object, got str" in result.output
+    assert "record 3: invalid JSON" in result.output
+    assert User.query.filter_by(username="fay").count() == 1
+
+
+def test_get_current_user_sparse_fieldset(logged_in_client):
+    """Test narrowing /me with ?fields="""
+    response = logged_in_client.get("/me?fields=username")
+    assert response.status_code == 200
+    assert response.json["user"] == {"username": "test_user"}
+
+    response = logged_in_client.get("/me?fields=password")
+    assert response.status_code == 400
+
+
+def test_user_endpoints_query_budgets(logged_in_client, assert_max_queries):
+    """Test that login and /me stay within their query budgets"""
+    with assert_max_queries(1):
+        response = logged_in_client.post(
+            "/login", json={"username": "test_user", "password": "password123"}
+        )
+        assert response.status_code == 200
+    with assert_max_queries(2):
+        assert logged_in_client.get("/me").status_code == 200
+    with assert_max_queries(1):
+        assert logged_in_client.get("/me").status_code == 200
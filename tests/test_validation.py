@@ -0,0 +1,58 @@
+import pytest
+from marshmallow import INCLUDE, ValidationError
+
+from projects.schemas import ProjectSchema
+from users.schemas import UserLoginSchema, UserSchema
+from validation import compile_validator
+
+
+def _outcome(load, payload):
+    try:
+        return "ok", load(payload)
+    except ValidationError as err:
+        return "error", err.messages
+
+
+USER_PAYLOADS = [
+    {"username": "alice", "email": "alice@example.com", "password": "secret"},
+    {"username": "alice"},
+    {"username": 42, "email": "alice@example.com", "password": "secret"},
+    {"username": "alice", "email": "not-an-email", "password": "secret"},
+    {"username": "alice", "email": "alice@example.com", "password": None},
+    {"username": "a", "email": "a@example.com", "password": "p", "admin": True},
+    {"username": "a", "email": "a@example.com", "password": "p", "id": 1},
+    ["not", "a", "dict"],
+    "string",
+]
+
+PROJECT_PAYLOADS = [
+    {"name": "Project", "description": "Description"},
+    {"name": "Project"},
+    {"description": "No name"},
+    {"name": 3},
+    {"name": "Project", "status": "Completed"},
+    {"status": "Completed"},
+    {},
+]
+
+
+@pytest.mark.parametrize("payload", USER_PAYLOADS)
+@pytest.mark.parametrize("schema_class", [UserSchema, UserLoginSchema])
+def test_compiled_validator_matches_user_schema(schema_class, payload):
+    """Test identical results and error payloads for user schemas"""
+    schema = schema_class()
+    assert _outcome(compile_validator(schema).load, payload) == _outcome(
+        schema.load, payload
+    )
+
+
+@pytest.mark.parametrize("payload", PROJECT_PAYLOADS)
+@pytest.mark.parametrize(
+    "options", [{}, {"partial": True, "unknown": INCLUDE}], ids=["create", "update"]
+)
+def test_compiled_validator_matches_project_schema(options, payload):
+    """Test identical results and error payloads for project create/update"""
+    schema = ProjectSchema()
+    assert _outcome(compile_validator(schema, **options).load, payload) == _outcome(
+        lambda data: schema.load(data, **options), payload
+    )
@@ -1,3 +1,5 @@
 from .routes import users
+from . import commands  # noqa: F401  registers `flask users ...` commands
+from . import identity  # noqa: F401  registers the JWT user lookup
 
 __all__ = ["users"]
@@ -0,0 +1,220 @@
+import csv
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice, repeat
+
+import click
+from flask import current_app
+from marshmallow import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+
+from extensions import db
+from passwords import HashPolicy, hash_password, verify_password
+from users.models import User
+from users.routes import users
+from users.schemas import UserSchema
+
+_BENCHMARK_PASSWORD = "benchmark-password"
+
+
+@users.cli.command("hash-benchmark")
+@click.option(
+    "--policy",
+    "methods",
+    multiple=True,
+    help="Hash method to measure, e.g. bcrypt:12. Repeatable.",
+)
+@click.option("--iterations", default=20, show_default=True)
+def hash_benchmark_command(methods, iterations):
+    """Report the cost of verifying one password under each hashing policy."""
+    methods = methods or (current_app.config["PASSWORD_HASH_METHOD"],)
+    workers = current_app.config["PASSWORD_POOL_WORKERS"] or os.cpu_count() or 1
+
+    click.echo(
+        f"{'policy':<24} {'ms/verify':>10} {'verifies/s/core':>16} {'logins/s':>10}"
+    )
+    for method in methods:
+        password_hash = HashPolicy(method).hash(_BENCHMARK_PASSWORD)
+
+        start = time.perf_counter()
+        for _ in range(iterations):
+            verify_password(password_hash, _BENCHMARK_PASSWORD)
+        per_verify = (time.perf_counter() - start) / iterations
+
+        click.echo(
+            f"{method:<24} {per_verify * 1000:>10.1f} {1 / per_verify:>16.1f} "
+            f"{workers / per_verify:>10.1f}"
+        )
+    click.echo(f"logins/s assumes {workers} hashing workers (PASSWORD_POOL_WORKERS).")
+
+
+def _read_records(source, fmt):
+    """Yield (record number, record) pairs from a CSV or NDJSON stream.
+
+    An NDJSON line that does not parse is yielded as its ValueError.
+    """
+    if fmt == "csv":
+        yield from enumerate(csv.DictReader(source), start=1)
+        return
+
+    number = 0
+    for line in source:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except ValueError as err:
+            yield number, err
+
+
+class _UserImporter:
+    """Validates, de-duplicates, hashes and inserts one batch at a time."""
+
+    def __init__(self, executor, method):
+        self.executor = executor
+        self.method = method
+        self.schema = UserSchema()
+        self.imported = 0
+        self.skipped = 0
+
+    def _skip(self, number, reason):
+        self.skipped += 1
+        click.echo(f"record {number}: {reason}", err=True)
+
+    def _validate(self, batch):
+        valid = []
+        for number, record in batch:
+            if isinstance(record, ValueError):
+                self._skip(number, f"invalid JSON: {record}")
+                continue
+            if not isinstance(record, dict):
+                self._skip(number, f"expected an object, got {type(record).__name__}")
+                continue
+            try:
+                valid.append((number, self.schema.load(record)))
+            except ValidationError as err:
+                self._skip(number, f"invalid: {err.messages}")
+        return valid
+
+    def _drop_duplicates(self, records):
+        usernames = {data["username"] for _, data in records}
+        emails = {data["email"] for _, data in records}
+        existing = db.session.execute(
+            select(User.username, User.email).where(
+                or_(User.username.in_(usernames), User.email.in_(emails))
+            )
+        ).all()
+        taken_usernames = {row.username for row in existing}
+        taken_emails = {row.email for row in existing}
+
+        unique = []
+        for number, data in records:
+            if data["username"] in taken_usernames:
+                self._skip(number, f"duplicate username {data['username']!r}")
+            elif data["email"] in taken_emails:
+                self._skip(number, f"duplicate email {data['email']!r}")
+            else:
+                taken_usernames.add(data["username"])
+                taken_emails.add(data["email"])
+                unique.append((number, data))
+        return unique
+
+    def _hash(self, passwords):
+        if self.executor is None:
+            return [hash_password(self.method, password) for password in passwords]
+        return list(
+            self.executor.map(
+                hash_password, repeat(self.method), passwords, chunksize=16
+            )
+        )
+
+    def import_batch(self, batch):
+        records = self._drop_duplicates(self._validate(batch))
+        if not records:
+            return
+
+        hashes = self._hash([data["password"] for _, data in records])
+        rows = [
+            {
+                "username": data["username"],
+                "email": data["email"],
+                "password_hash": password_hash,
+            }
+            for (_, data), password_hash in zip(records, hashes)
+        ]
+
+        try:
+            db.session.execute(insert(User), rows)
+            db.session.commit()
+            self.imported += len(rows)
+        except IntegrityError:
+            # Someone registered one of these users meanwhile; go row by row.
+            db.session.rollback()
+            for (number, _), row in zip(records, rows):
+                try:
+                    db.session.execute(insert(User), row)
+                    db.session.commit()
+                    self.imported += 1
+                except IntegrityError:
+                    db.session.rollback()
+                    self._skip(number, f"duplicate user {row['username']!r}")
+
+
+@users.cli.command("import")
+@click.argument("source", type=click.File("r", encoding="utf-8"))
+@click.option(
+    "--format",
+    "fmt",
+    type=click.Choice(["csv", "ndjson"]),
+    help="Input format. Defaults to the file extension.",
+)
+@click.option("--batch-size", default=1000, show_default=True)
+@click.option(
+    "--workers",
+    type=int,
+    help="Hashing processes; 0 hashes inline. Defaults to the CPU count.",
+)
+def import_users_command(source, fmt, batch_size, workers):
+    """Stream users with username, email and password from a CSV or NDJSON file.
+
+    Use - as SOURCE to read from stdin. Duplicate or invalid records are
+    reported on stderr and skipped; the import carries on.
+    """
+    if fmt is None:
+        fmt = "csv" if source.name.endswith(".csv") else "ndjson"
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    executor = None
+    if workers:
+        executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    importer = _UserImporter(executor, current_app.config["PASSWORD_HASH_METHOD"])
+    records = _read_records(source, fmt)
+    processed = 0
+    start = time.perf_counter()
+    try:
+        while batch := list(islice(records, batch_size)):
+            importer.import_batch(batch)
+            processed += len(batch)
+            elapsed = time.perf_counter() - start
+            click.echo(
+                f"{processed} records, {importer.imported} imported, "
+                f"{importer.skipped} skipped, {processed / elapsed:.0f} records/s"
+            )
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    click.echo(
+        f"Done: {importer.imported} imported, {importer.skipped} skipped "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
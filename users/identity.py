@@ -0,0 +1,138 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app, jsonify
+from sqlalchemy import event
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.util import identity_key
+
+from extensions import db, jwt
+from users.models import User
+
+_logger = logging.getLogger(__name__)
+
+
+class _RowCache:
+    """Bounded LRU of user rows keyed by user id, with a per-entry TTL."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                return None
+
+            expires_at, row = entry
+            if expires_at < time.monotonic():
+                del self._entries[user_id]
+                return None
+
+            self._entries.move_to_end(user_id)
+            return row
+
+    def put(self, user_id, row):
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + self.ttl, row)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def evict(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class IdentityCache:
+    """Cache of the user rows behind access tokens, one per app.
+
+    The cache is per process. Changes made through the ORM evict the entry
+    here straight away; other worker processes pick them up once their own
+    entry expires after IDENTITY_CACHE_TTL seconds. Each app keeps its rows
+    in `app.extensions`.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault("IDENTITY_CACHE_SIZE", 1024)
+        app.config.setdefault("IDENTITY_CACHE_TTL", 60)
+
+        app.extensions["identity_cache"] = _RowCache(
+            app.config["IDENTITY_CACHE_SIZE"], app.config["IDENTITY_CACHE_TTL"]
+        )
+
+    @staticmethod
+    def _rows():
+        return current_app.extensions["identity_cache"]
+
+    def get(self, user_id):
+        return self._rows().get(user_id)
+
+    def put(self, user_id, row):
+        self._rows().put(user_id, row)
+
+    def evict(self, user_id):
+        self._rows().evict(user_id)
+
+    def clear(self):
+        self._rows().clear()
+
+
+identity_cache = IdentityCache()
+
+
+def _snapshot(user):
+    return {column.key: getattr(user, column.key) for column in User.__table__.columns}
+
+
+@jwt.user_lookup_loader
+def load_user(_jwt_header, jwt_data):
+    """Resolve the token identity to a `User` attached to this request's session."""
+    user_id = int(jwt_data[current_app.config["JWT_IDENTITY_CLAIM"]])
+
+    user = db.session.identity_map.get(identity_key(User, user_id))
+    if user is not None:
+        return user
+
+    row = identity_cache.get(user_id)
+    if row is None:
+        user = db.session.get(User, user_id)
+        if user is not None:
+            identity_cache.put(user_id, _snapshot(user))
+        return user
+
+    # Rebuild the row as if it had been loaded, without a round trip.
+    user = User(**row)
+    make_transient_to_detached(user)
+    db.session.add(user)
+    return user
+
+
+@jwt.user_lookup_error_loader
+def user_not_found(_jwt_header, jwt_data):
+    identity = jwt_data[current_app.config["JWT_IDENTITY_CLAIM"]]
+    _logger.warning("[API] [Identity] User not found: %s", identity)
+    return jsonify({"error": "User not found"}), 404
+
+
+@event.listens_for(User, "after_insert")
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _evict_changed_user(_mapper, _connection, target):
+    identity_cache.evict(target.id)
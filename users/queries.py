@@ -0,0 +1,16 @@
+from sqlalchemy import select
+
+from query_audit import audited
+from users.models import User
+
+
+@audited({"username": "test_user"})
+def user_by_username(username):
+    """The user with the given username."""
+    return select(User).where(User.username == username)
+
+
+@audited({"user_id": 1})
+def user_by_id(user_id):
+    """The user with the given id, as loaded by the JWT identity lookup."""
+    return select(User).where(User.id == user_id)
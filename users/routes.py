@@ -1,24 +1,40 @@
 import logging
 from flask import Blueprint, jsonify, request
 from marshmallow import ValidationError
-from werkzeug.security import generate_password_hash, check_password_hash
-from extensions import db
+from extensions import db, password_pool
+from fieldsets import FieldsetError, requested_fields, schema_for
+from passwords import PasswordPoolFull
+from users import queries
 from users.models import User
 from sqlalchemy.exc import IntegrityError
-from flask_jwt_extended import create_access_token, get_jwt_identity, jwt_required
+from flask_jwt_extended import create_access_token, current_user, jwt_required
 from users.schemas import UserSchema, UserLoginSchema, UserLoginOutputSchema
+from validation import compile_validator
 
 _logger = logging.getLogger(__name__)
 users = Blueprint("users", __name__)
+_user_output_schema = UserSchema()
+_register_validator = compile_validator(UserSchema())
+_login_validator = compile_validator(UserLoginSchema())
+
+
+@users.errorhandler(PasswordPoolFull)
+def password_pool_full(err):
+    _logger.warning("[API] [Passwords] Hashing queue full on %s", request.path)
+    response = jsonify({"message": "Server busy, try again later", "error": str(err)})
+    response.headers["Retry-After"] = str(err.retry_after)
+    return response, 503
 
 
 @users.route("/register", methods=["POST"])
 def register_user():
     try:
-        validated_data = UserSchema().load(request.json)
+        validated_data = _register_validator.load(request.json)
     except ValidationError as err:
-        msg = f"[API] [Register] Validation error during registration: {err.messages}"
-        _logger.error(msg)
+        _logger.error(
+            "[API] [Register] Validation error during registration: %s",
+            err.messages,
+        )
         return (
             jsonify({"message": "Missing required fields", "error": err.messages}),
             400,
@@ -28,7 +44,7 @@ def register_user():
     email = validated_data.get("email")
     password = validated_data.get("password")
 
-    hashed_password = generate_password_hash(password)
+    hashed_password = password_pool.hash(password)
     new_user = User(
         username=username,
         email=email,
@@ -38,11 +54,18 @@ def register_user():
     try:
         db.session.add(new_user)
         db.session.commit()
-        _logger.info(f"[API] [Register] New user registered: {username}")
+        _logger.info(
+            "[API] [Register] New user registered: %s",
+            username,
+            extra={"event": "user.register"},
+        )
     except IntegrityError as e:
         db.session.rollback()
-        msg = f"[API] [Register] Integrity error during registration for user {username}: {str(e)}"
-        _logger.error(msg)
+        _logger.error(
+            "[API] [Register] Integrity error during registration for user %s: %s",
+            username,
+            e,
+        )
         return jsonify({"message": "User already exists", "error": str(e)}), 409
 
     return (
@@ -59,27 +82,32 @@ def registration_page():
 @users.route("/login", methods=["POST"])
 def login():
     try:
-        validated_data = UserLoginSchema().load(request.json)
+        validated_data = _login_validator.load(request.json)
     except ValidationError as err:
-        msg = f"[API] [Login] Validation error during login: {err.messages}"
-        _logger.error(msg)
+        _logger.error("[API] [Login] Validation error during login: %s", err.messages)
         return jsonify({"error": err.messages}), 400
 
     username = validated_data.get("username")
     password = validated_data.get("password")
 
-    user = User.query.filter_by(username=username).first()
-    if user and check_password_hash(user.password_hash, password):
+    user = db.session.scalars(queries.user_by_username(username)).first()
+    if user and password_pool.verify(user.password_hash, password):
+        if password_pool.needs_rehash(user.password_hash):
+            _rehash_password(user, password)
+
         access_token = create_access_token(identity=str(user.id))
         user_login_output = UserLoginOutputSchema().dump({"access_token": access_token})
-        _logger.info(f"[API] [Login] User logged in: {username}")
+        _logger.info(
+            "[API] [Login] User logged in: %s",
+            username,
+            extra={"event": "user.login"},
+        )
         return (
             jsonify({"message": "Login successful", "data": user_login_output}),
             200,
         )
 
-    msg = f"[API] [Login] Invalid credentials for user: {username}"
-    _logger.warning(msg)
+    _logger.warning("[API] [Login] Invalid credentials for user: %s", username)
     return (
         jsonify(
             {
@@ -91,6 +119,22 @@ def login():
     )
 
 
+def _rehash_password(user, password):
+    """Upgrade a stored hash made with an outdated policy, best effort."""
+    try:
+        user.password_hash = password_pool.hash(password)
+    except PasswordPoolFull:
+        # The login itself succeeded; retry the upgrade on a later login.
+        return
+
+    db.session.commit()
+    _logger.info(
+        "[API] [Login] Rehashed password for user: %s",
+        user.username,
+        extra={"event": "user.rehash"},
+    )
+
+
 @users.route("/login", methods=["GET"])
 def login_page():
     return "User login page"
@@ -99,15 +143,20 @@ def login_page():
 @users.route("/me", methods=["GET"])
 @jwt_required()
 def me():
-    current_user_id = get_jwt_identity()
-    user = db.session.get(User, current_user_id)
-    if not user:
-        _logger.warning(f"[API] [Me] User not found: {current_user_id}")
-        return jsonify({"error": "User not found"}), 404
+    user = current_user
+    try:
+        fields = requested_fields(_user_output_schema)
+    except FieldsetError as err:
+        _logger.warning("[API] [Me] Invalid query arguments: %s", err)
+        return jsonify({"error": str(err)}), 400
 
-    user_schema = UserSchema().dump(user)
+    user_schema = schema_for(UserSchema, fields).dump(user)
 
-    _logger.info(f"[API] [Me] Retrieved user info for user: {user.username}")
+    _logger.info(
+        "[API] [Me] Retrieved user info for user: %s",
+        user.username,
+        extra={"event": "user.me"},
+    )
     return (
         jsonify(
             {
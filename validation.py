@@ -0,0 +1,105 @@
+from marshmallow import EXCLUDE, INCLUDE, ValidationError, missing
+from marshmallow.fields import Integer, String
+
+
+def _is_string(value):
+    return type(value) is str
+
+
+def _is_integer(value):
+    return type(value) is int
+
+
+class CompiledValidator:
+    """`schema.load` specialised once for a schema and its load options.
+
+    The hot path handles the common case of well-formed input with plain
+    type checks. Anything it can't vouch for (wrong types, missing required
+    fields, unknown keys, failed validators) is handed to `schema.load`, so
+    accepted data and error payloads are exactly what marshmallow returns.
+    Schemas with hooks or field types we don't specialise always use the
+    generic path.
+    """
+
+    def __init__(self, schema, partial=False, unknown=None):
+        self.schema = schema
+        self.partial = partial
+        self.unknown = unknown or schema.unknown
+        self._fields = self._compile(schema)
+
+    def _compile(self, schema):
+        if any(schema._hooks.values()) or not isinstance(self.partial, bool):
+            return None
+
+        fields = []
+        for name, field in schema.load_fields.items():
+            if isinstance(field, String):
+                check = _is_string
+            elif isinstance(field, Integer):
+                check = _is_integer
+            else:
+                return None
+
+            fields.append(
+                (
+                    field.data_key or name,
+                    field.attribute or name,
+                    check,
+                    field.required and not self.partial,
+                    field.allow_none,
+                    field.load_default,
+                    tuple(field.validators),
+                )
+            )
+        return fields
+
+    def _fast_load(self, data):
+        if self._fields is None or type(data) is not dict:
+            return None
+
+        result = {}
+        seen = 0
+        for field in self._fields:
+            key, attribute, check, required, allow_none, default, validators = field
+            if key not in data:
+                if required:
+                    return None
+                if default is not missing and not self.partial:
+                    result[attribute] = default() if callable(default) else default
+                continue
+
+            seen += 1
+            value = data[key]
+            if value is None:
+                if not allow_none:
+                    return None
+            elif not check(value):
+                return None
+            else:
+                for validator in validators:
+                    try:
+                        if validator(value) is False:
+                            return None
+                    except ValidationError:
+                        return None
+            result[attribute] = value
+
+        if seen != len(data):
+            if self.unknown == INCLUDE:
+                known = {field[0] for field in self._fields}
+                result.update((k, v) for k, v in data.items() if k not in known)
+            elif self.unknown != EXCLUDE:
+                return None
+        return result
+
+    def load(self, data):
+        """Deserialize and validate `data`, raising ValidationError like marshmallow."""
+        result = self._fast_load(data)
+        if result is None:
+            return self.schema.load(data, partial=self.partial, unknown=self.unknown)
+        return result
+
+
+def compile_validator(schema, partial=False, unknown=None):
+    """Compile `schema` with fixed load options into a `CompiledValidator`."""
+    return CompiledValidator(schema, partial=partial, unknown=unknown)